@@ -15,8 +15,12 @@ Exceções:
     LexicalException: Exceção personalizada para erros durante a análise léxica.
 """
 
+import mmap
 import re
+from array import array
+from bisect import bisect_left
 from app.compilador.analisador_lexico.classes_auxiliares import Token, LexicalException
+from app.compilador.analisador_lexico.buffer_tokens import TokenBuffer, TOKEN_KINDS, KIND_CODES, EOF, TXT
 
 class AnalisadorLexico:
     """
@@ -31,12 +35,19 @@ class AnalisadorLexico:
                              tipos de tokens.
     """
 
-    # Expressões regulares para os padrões léxicos
+    # Expressões regulares para os padrões léxicos. A ordem importa: todas são unidas em
+    # uma única alternância e a primeira alternativa que casar em uma posição vence.
     PATTERNS = {
+        'LINE_COMMENT': r'//[^\n]*',
+        'BLOCK_COMMENT': r'/\*[\s\S]*?(?:\*/|\Z)',
+        'WHITESPACE': r'[ \t\r\n]+',
+        'STRING': r'"[^"]*(?:(?<=\\)"[^"]*)*(?<!\\)"',
+        'UNTERMINATED_STRING': r'"',
+        'OPERATOR': r'>=|<=|<>',
+        'ID': r'[^\W\d]\w*',
         'NUMBER': r'[0-9]+',
-        'ID': r'[a-zA-Z][_a-zA-Z0-9]*',
-        'WHITESPACE': r'[ \t\n\r]',
-        'STRING_CONTENT': r'[^"]*'
+        'SYMBOL': r'[:(){},+\-*/^=<>]',
+        'INVALID': r'[\s\S]'
     }
 
     # Tabela de símbolos completa
@@ -114,120 +125,170 @@ class AnalisadorLexico:
         'PARE_CRONOMETRO': 'FUNC_OUT'
     }
 
-    def __init__(self, sourceCode):
+    # Expressão regular mestre: todos os padrões em um único autômato, percorrido uma só vez
+    TOKEN_REGEX = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in PATTERNS.items()))
+
+    # Tabela de símbolos com os tipos já convertidos para os códigos inteiros do TokenBuffer
+    SYMBOL_CODES = {symbol: KIND_CODES[kind] for symbol, kind in SYMBOL_TABLE.items()}
+
+    # Versões em bytes, usadas ao analisar arquivos ASCII mapeados em memória. Em padrões
+    # bytes, \w e \d são ASCII, então ID equivale a [A-Za-z_][A-Za-z0-9_]*
+    BYTES_TOKEN_REGEX = re.compile(TOKEN_REGEX.pattern.encode('ascii'))
+    BYTES_SYMBOL_CODES = {symbol.encode('ascii'): code for symbol, code in SYMBOL_CODES.items()}
+    NON_ASCII_REGEX = re.compile(rb'[\x80-\xff]')
+
+    def __init__(self, sourceCode, recover=False):
         """
         Inicializa o analisador léxico com o código-fonte a ser analisado.
 
         Args:
-            sourceCode (str): Código-fonte da linguagem a ser analisado.
+            sourceCode (str | bytes | mmap.mmap): Código-fonte da linguagem a ser analisado.
+                Fontes binárias devem ser ASCII (veja `from_file`).
+            recover (bool): Modo de diagnóstico. Em vez de interromper a análise no
+                primeiro erro, cada erro é registrado em `errors` e a análise continua:
+                símbolos inválidos são descartados e uma string não terminada descarta
+                o restante da linha.
         """
         self.code = sourceCode
-        self.code = self.removeComments()
-        self.current_pos = 0
-        self.current_line = 1
-        self.length = len(self.code)
+        self.recover = recover
+        self.errors = []
 
-    def removeComments(self):
+    @classmethod
+    def from_file(cls, path):
         """
-        Remove comentários do código-fonte.
+        Cria um analisador que lê o código-fonte diretamente de um arquivo.
 
-        Suporta tanto comentários de linha (`//`) quanto de bloco (`/* */`).
+        Arquivos ASCII são mapeados em memória (`mmap`) e analisados como bytes, sem
+        criar uma cópia decodificada do conteúdo; os valores dos tokens só são
+        decodificados quando acessados. Arquivos com caracteres não ASCII são
+        decodificados como UTF-8 e analisados normalmente.
+
+        Args:
+            path (str | os.PathLike): Caminho do arquivo com o código-fonte.
 
         Returns:
-            str: Código-fonte sem comentários.
+            AnalisadorLexico: Analisador para o conteúdo do arquivo.
         """
-        code_without_comments = []
-        i = 0
-        while i < len(self.code):
-            if self.code[i:i+2] == '//':
-                while i < len(self.code) and self.code[i] != '\n':
-                    i += 1
-            elif self.code[i:i+2] == '/*':
-                i += 2
-                while i < len(self.code) - 1 and self.code[i:i+2] != '*/':
-                    if self.code[i] == '\n':
-                        code_without_comments.append('\n')
-                    i += 1
-                i += 2
-            else:
-                code_without_comments.append(self.code[i])
-                i += 1
-                
-        return ''.join(code_without_comments)
-
-    def skipWhitespace(self):
+        with open(path, 'rb') as file:
+            if file.seek(0, 2) == 0:
+                return cls('')
+            code = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if cls.NON_ASCII_REGEX.search(code):
+            with code:
+                return cls(bytes(code).decode('utf-8'))
+        return cls(code)
+
+    def _scan(self, pos=0, line=1):
         """
-        Avança no código-fonte ignorando espaços em branco.
+        Percorre o código-fonte com a expressão regular mestre.
 
-        Incrementa a posição atual no código e atualiza a contagem de linhas.
-        """
-        while self.current_pos < self.length:
-            char = self.code[self.current_pos]
-            if char in ' \t\r':
-                self.current_pos += 1
-            elif char == '\n':
-                self.current_pos += 1
-                self.current_line += 1
-            else:
-                break
+        Comentários e espaços em branco são descartados no mesmo passo em que os tokens
+        são reconhecidos, e a contagem de linhas é feita a partir das quebras de linha de
+        cada trecho casado.
 
-    def processString(self):
-        """
-        Processa uma string literal e gera tokens para o conteúdo da string.
+        Args:
+            pos (int): Posição do código-fonte onde a varredura começa. Deve ser uma
+                       fronteira entre tokens (fora de strings e comentários).
+            line (int): Número da linha na posição `pos`.
 
-        Returns:
-            list[Token]: Lista contendo os tokens da string.
+        Yields:
+            tuple[int, int, int, int]: (código do tipo, início, fim, linha) de cada token;
+            o último é sempre EOF.
         Raises:
-            LexicalException: Caso a string não seja encerrada corretamente.
+            LexicalException: Caso encontre símbolos inválidos ou strings não terminadas
+                (fora do modo de diagnóstico).
         """
-        tokens = []
-        tokens.append(Token("DQUOTE", '"', self.current_line))
-        self.current_pos += 1
-
-        start_line = self.current_line
-        string_content = ""
-
-        while self.current_pos < self.length:
-            if self.code[self.current_pos] == '"' and self.code[self.current_pos - 1] != '\\':
+        code = self.code
+        unicode = isinstance(code, str)
+        errors = self.errors if self.recover else None
+        if unicode:
+            regex, symbols, newline = self.TOKEN_REGEX, self.SYMBOL_CODES, '\n'
+        else:
+            regex, symbols, newline = self.BYTES_TOKEN_REGEX, self.BYTES_SYMBOL_CODES, b'\n'
+        id_code = KIND_CODES['ID']
+        number_code = KIND_CODES['NUMBER']
+        dquote_code = KIND_CODES['DQUOTE']
+        txt_code = KIND_CODES['TXT']
+
+        # A varredura só é reiniciada (em uma nova posição) na recuperação de erros
+        while True:
+            for match in regex.finditer(code, pos):
+                kind = match.lastgroup
+                start, end = match.span()
+
+                if kind == 'WHITESPACE' or kind == 'BLOCK_COMMENT':
+                    line += match.group().count(newline)
+
+                elif kind == 'ID':
+                    value = match.group()
+                    # \w aceita dígitos não decimais (ex.: '²') no início; isalpha() não
+                    if unicode and not (value[0].isalpha() or value[0] == '_'):
+                        self._error(errors, f"Símbolo inválido na linha {line}: {value[0]}", line)
+                        pos = start + 1
+                        break
+                    yield symbols.get(value, id_code), start, end, line
+
+                elif kind == 'SYMBOL' or kind == 'OPERATOR':
+                    yield symbols[match.group()], start, end, line
+
+                elif kind == 'NUMBER':
+                    yield number_code, start, end, line
+
+                elif kind == 'STRING':
+                    yield dquote_code, start, start + 1, line
+                    yield txt_code, start + 1, end - 1, line
+                    line += match.group().count(newline)
+                    yield dquote_code, end - 1, end, line
+
+                elif kind == 'UNTERMINATED_STRING':
+                    self._error(errors, f"String não terminada na linha {line}", line)
+                    pos = code.find(newline, start)
+                    if pos == -1:
+                        pos = len(code)
+                    break
+
+                elif kind == 'INVALID':
+                    char = match.group() if unicode else match.group().decode('ascii')
+                    self._error(errors, f"Símbolo inválido na linha {line}: {char}", line)
+
+                # LINE_COMMENT: descartado; a quebra de linha fica para o WHITESPACE seguinte
+            else:
                 break
-            if self.code[self.current_pos] == '\n':
-                self.current_line += 1
-            string_content += self.code[self.current_pos]
-            self.current_pos += 1
-
-        if self.current_pos >= self.length:
-            raise LexicalException(f"String não terminada na linha {start_line}")
-
-        tokens.append(Token('TXT', string_content, start_line))
-        tokens.append(Token("DQUOTE", '"', self.current_line))
-        self.current_pos += 1
 
-        return tokens
+        yield EOF, len(code), len(code), line
 
-    def getIdentifierOrKeyword(self):
+    @staticmethod
+    def _error(errors, message, line):
         """
-        Processa um identificador ou palavra-chave, dando prioridade para palavras reservadas.
-
-        Returns:
-            Token: Um token correspondente à palavra-chave ou identificador.
+        Levanta o erro léxico ou, no modo de diagnóstico, apenas o registra em `errors`.
         """
-        start = self.current_pos
+        error = LexicalException(message, line)
+        if errors is None:
+            raise error
+        errors.append(error)
 
-        # Continua lendo enquanto encontrar caracteres válidos para identificadores
-        while self.current_pos < self.length and (
-            self.code[self.current_pos].isalnum() or 
-            self.code[self.current_pos] == '_'
-        ):
-            self.current_pos += 1
+    def iter_tokens(self):
+        """
+        Gera os tokens do código-fonte sob demanda.
 
-        token_value = self.code[start:self.current_pos]
+        Nenhuma lista intermediária é montada, de modo que o consumidor (analisador
+        sintático, resposta HTTP) pode começar a trabalhar antes do fim da análise.
 
-        # Verifica primeiro se é uma palavra reservada
-        if token_value in self.SYMBOL_TABLE:
-            return Token(self.SYMBOL_TABLE[token_value], token_value, self.current_line)
-        
-        # Se não for palavra reservada, é um identificador
-        return Token('ID', token_value, self.current_line)
+        Yields:
+            Token: O próximo token do código-fonte; o último é sempre EOF.
+        Raises:
+            LexicalException: Caso encontre símbolos inválidos ou strings não terminadas.
+        """
+        code = self.code
+        unicode = isinstance(code, str)
+        for kind, start, end, line in self._scan():
+            if kind == EOF:
+                value = "EOF"
+            elif unicode:
+                value = code[start:end]
+            else:
+                value = code[start:end].decode('ascii')
+            yield Token(TOKEN_KINDS[kind], value, line)
 
     def getTokens(self):
         """
@@ -236,53 +297,113 @@ class AnalisadorLexico:
         Returns:
             list[Token]: Lista de tokens gerados.
         Raises:
-            LexicalException: Caso encontre símbolos inválidos no código-fonte.
+            LexicalException: Caso encontre símbolos inválidos ou strings não terminadas.
         """
-        tokens = []
-        self.current_pos = 0
-        self.current_line = 1
+        return list(self.iter_tokens())
 
-        while self.current_pos < self.length:
-            self.skipWhitespace()
+    def getTokenBuffer(self):
+        """
+        Analisa o código-fonte e gera a representação compacta dos tokens.
 
-            if self.current_pos >= self.length:
-                break
+        Returns:
+            TokenBuffer: Tokens em colunas (tipo, início, fim, linha), indexável como uma
+            lista de tokens.
+        Raises:
+            LexicalException: Caso encontre símbolos inválidos ou strings não terminadas.
+        """
+        buffer = TokenBuffer(self.code)
+        append_kind = buffer.kinds.append
+        append_start = buffer.starts.append
+        append_end = buffer.ends.append
+        append_line = buffer.lines.append
+        for kind, start, end, line in self._scan():
+            append_kind(kind)
+            append_start(start)
+            append_end(end)
+            append_line(line)
+        return buffer
+
+    @classmethod
+    def relex(cls, buffer, offset, removed, inserted):
+        """
+        Reanalisa um código-fonte editado aproveitando os tokens da análise anterior.
 
-            char = self.code[self.current_pos]
-            # Processa strings
-            if char == '"':
-                tokens.extend(self.processString())
-                continue
-
-            # Processa identificadores e palavras reservadas primeiro
-            if char.isalpha() or char == '_':
-                token = self.getIdentifierOrKeyword()
-                tokens.append(token)
-                continue
-            # Verifica operadores compostos
-            if self.current_pos + 1 < self.length:
-                two_char = char + self.code[self.current_pos + 1]
-                if two_char in self.SYMBOL_TABLE:
-                    tokens.append(Token(self.SYMBOL_TABLE[two_char], two_char, self.current_line))
-                    self.current_pos += 2
-                    continue
-            # Verifica símbolos simples
-            if char in self.SYMBOL_TABLE:
-                tokens.append(Token(self.SYMBOL_TABLE[char], char, self.current_line))
-                self.current_pos += 1
-                continue
-
-            # Processa números
-            if char.isdigit():
-                match = re.match(self.PATTERNS['NUMBER'], self.code[self.current_pos:])
-                if match:
-                    value = match.group(0)
-                    tokens.append(Token('NUMBER', value, self.current_line))
-                    self.current_pos += len(value)
-                    continue
-
-            # Se chegou aqui, encontrou um caractere inválido
-            raise LexicalException(f"Símbolo inválido na linha {self.current_line}: {char}")
-
-        tokens.append(Token("EOF", "EOF", self.current_line))
-        return tokens
\ No newline at end of file
+        Apenas a região danificada é varrida novamente: a varredura recomeça no fim do
+        último token seguro antes da edição e para no primeiro token, depois da edição,
+        que começa em uma fronteira já conhecida do fluxo antigo. Daí em diante os tokens
+        antigos são reaproveitados, com deslocamentos e linhas corrigidos.
+
+        Args:
+            buffer (TokenBuffer): Tokens do código-fonte antes da edição.
+            offset (int): Posição da edição no código-fonte antigo.
+            removed (int): Quantidade de caracteres removidos a partir de `offset`.
+            inserted (str): Texto inserido em `offset`.
+
+        Returns:
+            TokenBuffer: Tokens do código-fonte editado.
+        Raises:
+            ValueError: Caso a edição esteja fora dos limites do código-fonte.
+            LexicalException: Caso a região reanalisada contenha erros léxicos.
+        """
+        old_code = buffer.source
+        if not isinstance(old_code, str):
+            # Buffers de arquivos mapeados em memória são ASCII: os deslocamentos coincidem
+            old_code = bytes(old_code).decode('ascii')
+        if offset < 0 or removed < 0 or offset + removed > len(old_code):
+            raise ValueError("Edição fora dos limites do código-fonte")
+
+        code = old_code[:offset] + inserted + old_code[offset + removed:]
+        delta = len(inserted) - removed
+        edit_end = offset + len(inserted)
+        kinds, starts, ends, lines = buffer.kinds, buffer.starts, buffer.ends, buffer.lines
+        dquote_code = KIND_CODES['DQUOTE']
+        count = len(kinds)
+
+        def starts_match(index):
+            # TXT e o DQUOTE de fechamento vêm do mesmo casamento que abriu a string
+            kind = kinds[index]
+            return kind != TXT and not (kind == dquote_code and index > 0 and kinds[index - 1] == TXT)
+
+        def ends_match(index):
+            # Um DQUOTE de abertura e o TXT terminam no meio do casamento da string
+            kind = kinds[index]
+            return kind != TXT and not (kind == dquote_code and index + 1 < count and kinds[index + 1] == TXT)
+
+        # Tokens mantidos: até o último que termina antes da edição em uma fronteira de casamento
+        keep = bisect_left(ends, offset)
+        while keep > 0 and not ends_match(keep - 1):
+            keep -= 1
+        pos = ends[keep - 1] if keep else 0
+        line = lines[keep - 1] if keep else 1
+
+        result = TokenBuffer(code)
+        result.kinds = kinds[:keep]
+        result.starts = starts[:keep]
+        result.ends = ends[:keep]
+        result.lines = lines[:keep]
+
+        previous = None
+        for kind, start, end, line in cls(code)._scan(pos, line):
+            at_boundary = kind != TXT and previous != TXT
+            previous = kind
+            if at_boundary and start >= edit_end:
+                old_start = start - delta
+                resync = bisect_left(starts, old_start, keep)
+                if resync < count and starts[resync] == old_start and kinds[resync] == kind \
+                        and starts_match(resync):
+                    line_delta = line - lines[resync]
+                    result.kinds += kinds[resync:]
+                    if delta:
+                        result.starts += array('I', map(delta.__add__, starts[resync:]))
+                        result.ends += array('I', map(delta.__add__, ends[resync:]))
+                    else:
+                        result.starts += starts[resync:]
+                        result.ends += ends[resync:]
+                    if line_delta:
+                        result.lines += array('I', map(line_delta.__add__, lines[resync:]))
+                    else:
+                        result.lines += lines[resync:]
+                    return result
+            result.append(kind, start, end, line)
+
+        return result
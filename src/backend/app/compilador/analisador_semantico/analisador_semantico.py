@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+from app.compilador.analisador_semantico.classes_auxiliares import SemanticException, TabelaSimbolos, NUM, ALT, TXT
+from app.compilador.analisador_sintatico.classes_auxiliares import NoFolha
+from app.compilador.analisador_sintatico.gramatica import COMANDOS
+from app.compilador.analisador_sintatico.visitante import Visitante, PULAR, pre_ordem, pos_ordem
+
+# Tipo de cada folha que não é uma variável
+FOLHAS = {"num": NUM, "alt": ALT, "string": TXT}
+
+# (op do nó, operador) -> (tipo exigido dos operandos, tipo do resultado). Tipo exigido
+# None: operandos de qualquer tipo, desde que iguais. Operador None: qualquer operador.
+OPERACOES = {
+    ("sum", "+"): (NUM, NUM),
+    ("sum", "-"): (NUM, NUM),
+    ("sum", "OU"): (ALT, ALT),
+    ("mult", "*"): (NUM, NUM),
+    ("mult", "/"): (NUM, NUM),
+    ("mult", "MOD"): (NUM, NUM),
+    ("mult", "E"): (ALT, ALT),
+    ("power", None): (NUM, NUM),
+    ("not", None): (ALT, ALT),
+    ("expression", "="): (None, ALT),
+    ("expression", "<>"): (None, ALT),
+    ("expression", None): (NUM, ALT),
+}
+
+# Tipo exigido de cada não-terminal usado como argumento de comando (None: qualquer tipo)
+TIPOS_ARGUMENTO = {"str": TXT, "sum_expression": NUM, "valor": None}
+
+# op do comando -> (nome do comando, ((campo, tipo exigido), ...))
+ARGUMENTOS = {
+    op: (nome, tuple((campo, TIPOS_ARGUMENTO[argumento]) for campo, argumento in argumentos))
+    for nome, (_, op, argumentos) in COMANDOS.items()
+}
+
+
+class AnalisadorSemantico(Visitante):
+    """
+    Analisador semântico: percorre a árvore sintática uma única vez, sem recursão,
+    verificando que toda variável usada foi definida antes (em um escopo visível) e que
+    os tipos (NUM, ALT, TXT) de operandos, condições, contagens do REPITA e argumentos
+    dos comandos são os esperados.
+
+    Uma variável é declarada na sua primeira atribuição, no escopo corrente: o programa
+    ou o bloco de SE, SENAO, ENQUANTO ou REPITA em que ela está; ela deixa de existir
+    ao fim do bloco. Atribuições seguintes mantêm o tipo da primeira.
+
+    A árvore é anotada no lugar: cada expressão recebe o seu tipo em tipoDado e cada
+    folha "id" recebe também o Simbolo da variável (simbolo), para que as etapas
+    seguintes não repitam as buscas. Os símbolos declarados ficam em tabela.simbolos.
+
+    No modo de diagnóstico (recuperar=True), os erros são registrados em `erros` e a
+    análise continua; caso contrário, o primeiro erro é levantado.
+    """
+
+    def __init__(self, arvore, recuperar=False):
+        """
+        Inicializa os atributos da classe.
+        """
+        self.arvore = arvore                # atributo arvore: raiz da árvore sintática (NoInterno "program")
+        self.recuperar = recuperar          # atributo recuperar: modo de diagnóstico (registra os erros e continua a análise)
+        self.erros = []                     # atributo erros: SemanticException registradas no modo de diagnóstico
+        self.tabela = TabelaSimbolos()      # atributo tabela: tabela de símbolos com os escopos abertos
+
+    def analisar(self):
+        """
+        Analisa e anota a árvore.
+
+        Returns:
+            NoInterno: A própria árvore, anotada.
+        Raises:
+            SemanticException: Caso encontre um erro semântico (fora do modo de diagnóstico).
+        """
+        self.visitar(self.arvore)
+        return self.arvore
+
+    def erro(self, mensagem, linha):
+        """
+        Registra (no modo de diagnóstico) ou levanta uma SemanticException.
+        """
+        erro = SemanticException(f"{mensagem}, na linha {linha}", linha)
+        if not self.recuperar:
+            raise erro
+        self.erros.append(erro)
+
+    @staticmethod
+    def linhaDe(no):
+        """
+        Linha da primeira folha de `no` (None se não houver).
+        """
+        for folha in pre_ordem(no):
+            if folha.__class__ is NoFolha:
+                return folha.linha
+        return None
+
+    def tipar(self, expressao):
+        """
+        Infere e anota (tipoDado) o tipo de `expressao` e das suas subexpressões.
+
+        Returns:
+            str | None: NUM, ALT, TXT ou None, se indeterminado por causa de um erro.
+        """
+        for no in pos_ordem(expressao):
+            if no.__class__ is NoFolha:
+                if no.op == "id":
+                    simbolo = self.tabela.buscar(no.valor)
+                    if simbolo is None:
+                        self.erro(f'A variável "{no.valor}" não foi definida', no.linha)
+                        continue
+                    simbolo.leituras += 1
+                    no.simbolo = simbolo
+                    no.tipoDado = simbolo.tipo
+                else:
+                    no.tipoDado = FOLHAS.get(no.op)
+                continue
+
+            operador = no.get("operator")
+            exigido, resultado = OPERACOES.get((no.op, operador)) or OPERACOES[(no.op, None)]
+            tipos = [getattr(no, campo).tipoDado for campo in no.campos if campo != "operator"]
+            if exigido is not None:
+                for tipo in tipos:
+                    if tipo is not None and tipo != exigido:
+                        self.erro(f'O operador "{operador}" exige operandos do tipo {exigido}, mas recebeu {tipo}',
+                                  self.linhaDe(no))
+                        break
+            elif None not in tipos and tipos[0] != tipos[1]:
+                self.erro(f'O operador "{operador}" compara valores de tipos diferentes ({tipos[0]} e {tipos[1]})',
+                          self.linhaDe(no))
+            no.tipoDado = resultado
+        return expressao.tipoDado
+
+    def exigir(self, expressao, tipo, descricao):
+        """
+        Infere o tipo de `expressao` e verifica se é `tipo`.
+        """
+        encontrado = self.tipar(expressao)
+        if encontrado is not None and encontrado != tipo:
+            self.erro(f"{descricao} deve ser do tipo {tipo}, mas é do tipo {encontrado}", self.linhaDe(expressao))
+
+    # Estrutura do programa: escopos
+
+    def entrar_program(self, no):
+        self.tabela.abrirEscopo()
+        no.descricao.tipoDado = TXT
+
+    def sair_program(self, no):
+        self.tabela.fecharEscopo()
+
+    def entrar_block(self, no):
+        self.tabela.abrirEscopo()
+
+    def sair_block(self, no):
+        self.tabela.fecharEscopo()
+
+    def entrar_statementList(self, no):
+        pass
+
+    # Declarações
+
+    def entrar_assign(self, no):
+        alvo = no.id
+        tipo = self.tipar(no.value)
+        simbolo = self.tabela.buscar(alvo.valor)
+        if simbolo is None:
+            simbolo = self.tabela.declarar(alvo.valor, tipo, alvo.linha)
+        elif simbolo.tipo is None:
+            simbolo.tipo = tipo
+        elif tipo is not None and tipo != simbolo.tipo:
+            self.erro(f'A variável "{alvo.valor}" é do tipo {simbolo.tipo} e não pode receber um valor do tipo {tipo}',
+                      alvo.linha)
+        simbolo.escritas += 1
+        alvo.simbolo = simbolo
+        alvo.tipoDado = simbolo.tipo
+        return PULAR
+
+    def entrar_if(self, no):
+        self.exigir(no.condition, ALT, "A condição do SE")
+
+    def entrar_while(self, no):
+        self.exigir(no.condition, ALT, "A condição do ENQUANTO")
+
+    def entrar_repeat(self, no):
+        self.exigir(no.times, NUM, "A quantidade de repetições do REPITA")
+
+    def entrar_padrao(self, no):
+        # Comandos (verifica os argumentos); expressões e folhas já foram tipadas por
+        # quem as contém
+        comando = ARGUMENTOS.get(no.op)
+        if comando is not None:
+            nome, argumentos = comando
+            for campo, tipo in argumentos:
+                if tipo is None:
+                    self.tipar(getattr(no, campo))
+                else:
+                    self.exigir(getattr(no, campo), tipo, f'O argumento "{campo}" de {nome}')
+        return PULAR
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+Classes auxiliares do analisador semântico.
+
+Classes:
+    SemanticException: Erro semântico.
+    Simbolo: Entrada da tabela de símbolos (uma variável).
+    TabelaSimbolos: Tabela de símbolos com escopos aninhados.
+"""
+
+# Tipos de dados da linguagem
+NUM, ALT, TXT = "NUM", "ALT", "TXT"
+
+
+class SemanticException(Exception):
+    """
+    Define uma classe que representa um erro semântico.
+    Herda da classe Exception; o atributo linha guarda a linha do erro (None se desconhecida).
+    """
+
+    def __init__(self, mensagem, linha=None):
+        super().__init__(mensagem)
+        self.linha = linha
+
+    def __reduce__(self):
+        return self.__class__, (str(self), self.linha)
+
+
+class Simbolo:
+    """
+    Variável declarada no programa (na sua primeira atribuição).
+
+    Atributos:
+        nome (str): Nome da variável.
+        tipo (str | None): NUM, ALT ou TXT (None se o valor atribuído tem tipo indeterminado).
+        linha (int): Linha da declaração.
+        nivel (int): Profundidade do escopo da declaração (0 para o escopo do programa).
+        leituras (int): Quantidade de usos da variável em expressões.
+        escritas (int): Quantidade de atribuições à variável.
+    """
+
+    __slots__ = ('nome', 'tipo', 'linha', 'nivel', 'leituras', 'escritas')
+
+    def __init__(self, nome, tipo, linha, nivel):
+        self.nome = nome
+        self.tipo = tipo
+        self.linha = linha
+        self.nivel = nivel
+        self.leituras = 0
+        self.escritas = 0
+
+    def __repr__(self):
+        return f'Simbolo(nome="{self.nome}", tipo={self.tipo}, linha={self.linha}, nivel={self.nivel})'
+
+
+class TabelaSimbolos:
+    """
+    Tabela de símbolos com escopos aninhados (o programa e cada bloco de SE, SENAO,
+    ENQUANTO e REPITA).
+
+    Os símbolos visíveis ficam em um único dicionário (nome -> Simbolo), de modo que a
+    busca é uma consulta de hash, independente da profundidade dos escopos. Cada escopo
+    aberto guarda os nomes declarados nele, que deixam de ser visíveis ao fechá-lo.
+    Como uma atribuição a uma variável visível não cria outra, um nome nunca está
+    declarado em dois escopos abertos ao mesmo tempo.
+    """
+
+    def __init__(self):
+        self.visiveis = {}   # nome -> Simbolo, para os escopos abertos
+        self.escopos = []    # nomes declarados em cada escopo aberto, do externo ao interno
+        self.simbolos = []   # todos os símbolos declarados, na ordem de declaração
+
+    @property
+    def nivel(self):
+        """Profundidade do escopo corrente (0 para o escopo do programa)."""
+        return len(self.escopos) - 1
+
+    def abrirEscopo(self):
+        self.escopos.append([])
+
+    def fecharEscopo(self):
+        visiveis = self.visiveis
+        for nome in self.escopos.pop():
+            del visiveis[nome]
+
+    def buscar(self, nome):
+        """
+        Retorna o Simbolo visível com o nome `nome` (None se não houver).
+        """
+        return self.visiveis.get(nome)
+
+    def declarar(self, nome, tipo, linha):
+        """
+        Declara a variável `nome` no escopo corrente e retorna o seu Simbolo.
+        """
+        simbolo = Simbolo(nome, tipo, linha, self.nivel)
+        self.visiveis[nome] = simbolo
+        self.escopos[-1].append(nome)
+        self.simbolos.append(simbolo)
+        return simbolo
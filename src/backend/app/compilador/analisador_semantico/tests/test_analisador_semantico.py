@@ -0,0 +1,52 @@
+import pytest
+
+from app.compilador.analisador_lexico.analisador_lexico import AnalisadorLexico
+from app.compilador.analisador_sintatico.analisador_sintatico import AnalisadorSintatico
+from app.compilador.analisador_semantico.analisador_semantico import AnalisadorSemantico
+from app.compilador.analisador_semantico.classes_auxiliares import SemanticException, NUM, ALT, TXT
+
+
+def analisador(codigo, **kwargs):
+    return AnalisadorSemantico(AnalisadorSintatico(AnalisadorLexico(codigo).getTokenBuffer()).analisar(), **kwargs)
+
+
+def test_simbolos_e_tipos():
+    semantico = analisador('"p"\nn : 1\nb : n > 0\nt : "texto"\nn : n + 1\nESCREVA(t)\n')
+    arvore = semantico.analisar()
+    assert [(s.nome, s.tipo, s.linha, s.nivel, s.leituras, s.escritas) for s in semantico.tabela.simbolos] == [
+        ("n", NUM, 2, 0, 2, 2), ("b", ALT, 3, 0, 0, 1), ("t", TXT, 4, 0, 1, 1)]
+    declaracoes = arvore.statements.statements
+    assert declaracoes[1].value.tipoDado == ALT
+    # As folhas "id" apontam para o símbolo da variável
+    assert declaracoes[3].value.esq.simbolo is semantico.tabela.simbolos[0]
+
+@pytest.mark.parametrize("codigo, linha, mensagem", [
+    ('"p"\nx : 1\nESCREVA(y)\n', 3, 'A variável "y" não foi definida'),
+    ('"p"\nb : verdadeiro\nx : 1 + b\n', 3, 'O operador "+" exige operandos do tipo NUM, mas recebeu ALT'),
+    ('"p"\nt : "a"\nx : t + t\n', 3, 'O operador "+" exige operandos do tipo NUM, mas recebeu TXT'),
+    ('"p"\nt : "a"\nx : 1 = t\n', 3, 'O operador "=" compara valores de tipos diferentes (NUM e TXT)'),
+    ('"p"\nx : 1\n\nx : falso\n', 4, 'A variável "x" é do tipo NUM e não pode receber um valor do tipo ALT'),
+    ('"p"\nSE (1) {\n}\n', 2, "A condição do SE deve ser do tipo ALT, mas é do tipo NUM"),
+    ('"p"\nREPITA (verdadeiro) {\n}\n', 2, "A quantidade de repetições do REPITA deve ser do tipo NUM"),
+    ('"p"\nt : "a"\nMOVA(1, t, 2)\n', 3, "deve ser do tipo NUM, mas é do tipo TXT"),
+])
+def test_erros(codigo, linha, mensagem):
+    with pytest.raises(SemanticException) as erro:
+        analisador(codigo).analisar()
+    assert mensagem in str(erro.value)
+    assert erro.value.linha == linha
+
+def test_escopos_de_bloco():
+    semantico = analisador('"p"\nSE (verdadeiro) {\n  x : 1\n  REPITA (2) {\n    x : x + 1\n  }\n}\nx : "outra"\n')
+    semantico.analisar()
+    # x do bloco deixa de existir ao fim do SE; a atribuição seguinte declara outra variável
+    assert [(s.nome, s.tipo, s.nivel, s.escritas) for s in semantico.tabela.simbolos] == [
+        ("x", NUM, 1, 2), ("x", TXT, 0, 1)]
+    with pytest.raises(SemanticException) as erro:
+        analisador('"p"\nENQUANTO (falso) {\n  y : 1\n}\nESCREVA(y)\n').analisar()
+    assert erro.value.linha == 5
+
+def test_recuperacao_coleta_varios_erros():
+    semantico = analisador('"p"\nx : y + 1\nSE (x) {\n}\nt : "a"\nz : t * 2\nESCREVA(w)\n', recuperar=True)
+    semantico.analisar()
+    assert [erro.linha for erro in semantico.erros] == [2, 3, 6, 7]
@@ -1,38 +1,110 @@
 # -*- coding: utf-8 -*-
 
+from bisect import bisect_left
+from collections import deque
+from operator import attrgetter
+
 from app.compilador.analisador_sintatico.classes_auxiliares import NoInterno, NoFolha, SyntaxException, Token
+from app.compilador.analisador_sintatico.gramatica import (TABELA, VAZIAS, ESPERADO, ESPERADO_FATOR, FUNCOES, SINCRONIZACAO, Producao, Repeticao, Laco, Anexar,
+                                                         EXPRESSOES, OPERADORES, UNARIOS, ATOMOS, NIVEL_RELACAO)
+
+_INICIO = attrgetter('inicio')
+
 
 class AnalisadorSintatico:
+    """
+    Analisador sintático LL(1) dirigido por tabela.
+
+    A gramática, os conjuntos FIRST/FOLLOW e a tabela de análise ficam no módulo
+    gramatica. A análise usa uma pilha explícita de símbolos e uma pilha de valores, de
+    modo que a profundidade de aninhamento do programa não consome a pilha de chamadas
+    do Python e a escolha da produção é uma consulta O(1) por token. As expressões são
+    reconhecidas à parte, por precedência de operadores (método expressao).
+
+    Os tokens podem vir de qualquer iterável (por exemplo, AnalisadorLexico.iter_tokens()):
+    eles são lidos sob demanda, com uma pequena janela de tokens à frente (espiar), e os
+    já consumidos não ficam retidos pelo analisador. Só a reanálise incremental exige uma
+    sequência indexável (lista ou TokenBuffer).
+
+    No modo de diagnóstico (recuperar=True), um erro não interrompe a análise: ele é
+    registrado em `erros`, a declaração em que ocorreu é descartada e a análise continua
+    no próximo ponto de sincronização (início de declaração, RBLOCK ou EOF).
+    """
 
-    def __init__(self, listaTokens):
+    def __init__(self, listaTokens, recuperar=False):
         """
         Inicializa os atributos da classe.
         """
-        self.tokens = listaTokens   # atributo tokens: contém a lista de objetos do tipo Token;
+        indexavel = hasattr(listaTokens, '__getitem__') and hasattr(listaTokens, '__len__')
+        self.tokens = listaTokens if indexavel else None  # atributo tokens: a sequência de tokens, se indexável (usada na reanálise); None para iteradores
+        self.fluxo = iter(listaTokens)  # atributo fluxo: iterador de onde os próximos tokens são lidos
+        self.adiante = deque()      # atributo adiante: tokens já lidos do fluxo mas ainda não consumidos (janela de espiar)
         self.tokenCorrente = None   # atributo tokenCorrente: contém o objeto Token que representa o token corrente;
-        self.posicao = -1           # atributo posicao: inteiro que guarda o índice do token corrente (um dos tokens da lista de tokens)
+        self.chaveCorrente = None   # atributo chaveCorrente: terminal do token corrente (o tipo ou, para FUNC_IN/FUNC_OUT, o nome do comando)
+        self.posicao = -1           # atributo posicao: inteiro que guarda o índice do token corrente no fluxo de tokens
+        self.recuperar = recuperar  # atributo recuperar: modo de diagnóstico (registra os erros e continua a análise)
+        self.erros = []             # atributo erros: SyntaxException registradas no modo de diagnóstico
         self.proximoToken()
     
 
     def proximoToken(self):
         """
-        Avança o próximo token da lista de tokens.
+        Avança o próximo token do fluxo de tokens.
         O token corrente ficará disponível no atributo tokenCorrente.
+        Quando o fluxo termina, o último token (EOF) permanece como token corrente.
+        """
+        if self.adiante:
+            token = self.adiante.popleft()
+        else:
+            token = next(self.fluxo, None)
+            if token is None:
+                return
+        self.posicao += 1
+        self.tokenCorrente = token
+        tipo = token.tipo
+        self.chaveCorrente = token.valor if tipo in FUNCOES else tipo
+
+    def espiar(self, k=1):
         """
-        if self.posicao <= len(self.tokens)-2:  # Garante que vai estar sempre em uma faixa válida, caso contrário sempre retorna o último token (EOF)
-            self.posicao += 1
-            self.tokenCorrente = self.tokens[self.posicao]
+        Retorna o k-ésimo token depois do token corrente, sem consumi-lo (None se o fluxo
+        terminar antes). Só os k tokens espiados ficam guardados.
+        """
+        while len(self.adiante) < k:
+            token = next(self.fluxo, None)
+            if token is None:
+                return None
+            self.adiante.append(token)
+        return self.adiante[k - 1]
+
+    def irPara(self, posicao):
+        """
+        Torna corrente o token de índice `posicao` da sequência de tokens.
+        Exige uma sequência indexável (lista ou TokenBuffer).
+        """
+        if self.tokens is None:
+            raise TypeError("reposicionar a análise exige uma sequência de tokens indexável")
+        self.fluxo = map(self.tokens.__getitem__, range(posicao, len(self.tokens)))
+        self.adiante.clear()
+        self.posicao = posicao - 1
+        self.proximoToken()
+        return self
     
 
+    def erroSintatico(self, tipoEsperado=None):
+        """
+        Monta a SyntaxException para o token corrente.
+        """
+        token = self.tokenCorrente
+        if tipoEsperado:
+            return SyntaxException(f"Token inesperado: \"{token.tipo}\" ({token.valor}), tipo esperado: \"{tipoEsperado}\", na linha {token.linha}", token.linha)
+        return SyntaxException(f"Token inesperado: \"{token.tipo}\" ({token.valor}) na linha {token.linha}", token.linha)
+
     def lancarErro(self, tipoEsperado=None):
         """
         Método que lança uma exceção do tipo SyntaxException.
         Ele será chamado pelo método comparar() quando o token esperado for diferente do token corrente.
         """
-        if tipoEsperado:
-            raise SyntaxException(f"Token inesperado: \"{self.tokenCorrente.tipo}\" ({self.tokenCorrente.valor}), tipo esperado: \"{tipoEsperado}\", na linha {self.tokenCorrente.linha}")
-        else:
-            raise SyntaxException(f"Token inesperado: \"{self.tokenCorrente.tipo}\" ({self.tokenCorrente.valor}) na linha {self.tokenCorrente.linha}")
+        raise self.erroSintatico(tipoEsperado)
     
 
     def comparar(self, tipoEsperado):
@@ -43,514 +115,331 @@ class AnalisadorSintatico:
         """
         # print(f'  comparar: {self.tokenCorrente.tipo} {self.tokenCorrente.valor} {tipoEsperado}')  # remova o comentário se desejar visualizar as chamadas deste método. Pode ajudar na depuração
         tokenRetorno = self.tokenCorrente
-        if self.tokenCorrente.tipo == tipoEsperado.upper():
+        if self.tokenCorrente.tipo == tipoEsperado:
             self.proximoToken()
         else:
             self.lancarErro(tipoEsperado)
         return tokenRetorno
 
-    # Método inicial que começa a análise
+    # Método inicial que começa a análise. No modo de diagnóstico retorna a árvore parcial
+    # (ou None, se nem a descrição do programa foi reconhecida) e os erros ficam em self.erros
     def analisar(self):
-        programa = self.program()
-        self.comparar('EOF')
+        try:
+            programa = self.derivar('program')
+            self.comparar('EOF')
+        except SyntaxException as erro:
+            if not self.recuperar:
+                raise
+            self.erros.append(erro)
+            return None
         return programa
 
-    # <program> ::= <str> <statement_list> EOF
-    def program(self):
-        descricao = self.str()
-        stmts = self.statement_list()
-        return NoInterno("program", descricao=descricao, statements=stmts)
-    
-    # <str> ::= DQUOTE TXT DQUOTE
-    def str(self):
-        self.comparar('DQUOTE')
-        txt = self.comparar('TXT')
-        self.comparar('DQUOTE')
-        return NoFolha("string", txt.valor, txt.linha)
-    
-    # <statement_list> ::= <statement> <statement_list> | ε
-    def statement_list(self):
+    def sincronizar(self, laco, descartar=False):
+        """
+        Recuperação de erros: descarta tokens até o início de uma nova ocorrência da
+        repetição `laco` (uma declaração) ou um terminal de SINCRONIZACAO. Com
+        `descartar`, o token corrente é descartado antes.
+        """
+        if descartar:
+            self.proximoToken()
+        while self.chaveCorrente not in laco.primeiros and self.chaveCorrente not in SINCRONIZACAO:
+            posicao = self.posicao
+            self.proximoToken()
+            if self.posicao == posicao:  # fluxo terminou sem EOF
+                break
+
+    def reanalisar(self, arvore, tokensAntigos, inicio, removidos, inseridos):
+        """
+        Análise incremental depois de uma edição.
+
+        `arvore` é a árvore obtida de `tokensAntigos`; a lista de tokens deste analisador
+        é a mesma, exceto pelos tokens antigos [inicio, inicio + removidos), trocados por
+        `inseridos` tokens novos (por exemplo, o resultado de AnalisadorLexico.relex).
+
+        Só é reanalisada a menor declaração ou bloco que contém a edição e que, reanalisado
+        a partir do mesmo token inicial, termina exatamente onde o trecho antigo terminava;
+        se nenhum servir, o programa inteiro é reanalisado. A subárvore nova substitui a
+        antiga no lugar e as demais são reaproveitadas por referência. Nos nós depois da
+        edição, os intervalos de tokens e as linhas das folhas são deslocados (nada é
+        percorrido se a edição não mudar a quantidade de tokens nem de linhas).
+
+        Returns:
+            NoInterno: A árvore atualizada (a própria `arvore`, alterada no lugar, ou uma
+            nova, caso o programa inteiro tenha sido reanalisado).
+        Raises:
+            SyntaxException: O mesmo erro que a análise completa levantaria.
+            TypeError: Caso os tokens deste analisador não sejam uma sequência indexável.
+        """
+        fimEdicao = inicio + removidos  # no fluxo antigo
+        delta = inseridos - removidos
+        if self.recuperar or arvore is None or arvore.inicio is None:
+            return self.reiniciar().analisar()
+
+        # Caminho da raiz até a menor unidade (declaração ou bloco) que contém a edição.
+        # O primeiro token da unidade não pode ter mudado: a declaração anterior o usou
+        # para decidir onde terminava.
+        caminho = []    # (pai, campo, índice na lista de declarações ou None, unidade)
+        no = arvore
+        while True:
+            passo = self._unidadeQueContem(no, inicio, fimEdicao)
+            if passo is None:
+                break
+            caminho.append(passo)
+            no = passo[3]
+
+        for nivel in range(len(caminho) - 1, -1, -1):
+            pai, campo, indice, antiga = caminho[nivel]
+            self.irPara(antiga.inicio)
+            nova = self.derivar('statement' if indice is not None else 'block')
+            if self.posicao != antiga.fim + delta:
+                continue
+            if indice is not None:
+                getattr(pai, campo).statements[indice] = nova
+            else:
+                pai.set(campo, nova)
+            linhas = 0
+            if fimEdicao < len(tokensAntigos) and fimEdicao + delta < len(self.tokens):
+                linhas = self.tokens[fimEdicao + delta].linha - tokensAntigos[fimEdicao].linha
+            if delta or linhas:
+                self._deslocar(caminho[:nivel + 1], delta, linhas)
+            self.irPara(len(self.tokens) - 1)
+            return arvore
+
+        return self.reiniciar().analisar()
+
+    def reiniciar(self):
         """
-        Processa uma lista de declarações, incluindo tanto <statement> quanto <input_statement>.
+        Volta ao primeiro token da sequência.
         """
-        if self.tokenCorrente.tipo in ['ID', 'SE', 'ENQUANTO', 'REPITA'] or \
-        self.tokenCorrente.valor in ['ESCREVA', 'ESCREVA_LINHA', 'LIMPE', 'INICIE_COM_COR', 'INICIE_COM_IMAGEM',
-                                        'REDEFINA_FIGURA', 'REDEFINA_IMAGEM', 'MOVA', 'DESTAQUE', 'REVERTA_DESTAQUE', 'TOQUE',
-                                        'ESPERE', 'ESPERE_SENTAR', 'ESPERE_LEVANTAR', 'INICIE_CRONOMETRO', 'PARE_CRONOMETRO']:
-            stmt = self.statement()
-            stmtList = self.statement_list()
-            return NoInterno("statementList", statement=stmt, prox=stmtList)
-
-        # Verifica se é um <input_statement>
-        elif self.tokenCorrente.valor in ['LEIA_NUM', 'LEIA_ALT', 'ESTA_SENTADO', 'CRIE_FIGURA', 'CRIE_IMAGEM', 'COLIDIU',
-                                        'ALEATORIO', 'CONSULTE_CRONOMETRO', 'ESTA_BIPEDAL', 'ESTA_UNIPEDAL', 'ESTA_SEM_CARGA',
-                                        'POSSUI_RECURSO', 'CONSULTE_RECURSO']:
-            input_stmt = self.input_statement()
-            stmtList = self.statement_list()
-            return NoInterno("statementList", statement=input_stmt, prox=stmtList)
+        return self.irPara(0)
 
+    @staticmethod
+    def _unidadeQueContem(no, inicio, fimEdicao):
+        """
+        Procura, entre os filhos diretos de `no`, a declaração (item de uma lista de
+        declarações) ou o bloco que contém a edição [inicio, fimEdicao) depois do seu
+        primeiro token.
+        """
+        for campo in no.campos:
+            filho = getattr(no, campo)
+            if not isinstance(filho, NoInterno):
+                continue
+            if filho.op == "statementList" and isinstance(filho.get("statements"), list):
+                declaracoes = filho.statements
+                indice = bisect_left(declaracoes, inicio, key=_INICIO) - 1
+                if indice >= 0:
+                    unidade = declaracoes[indice]
+                    if unidade.fim is not None and fimEdicao <= unidade.fim:
+                        return no, campo, indice, unidade
+            elif filho.op == "block" and filho.inicio is not None \
+                    and filho.inicio < inicio and fimEdicao <= filho.fim:
+                return no, campo, None, filho
         return None
 
+    @staticmethod
+    def _deslocar(caminho, delta, linhas):
+        """
+        Desloca em `delta` os intervalos de tokens e em `linhas` as linhas das folhas de
+        tudo o que fica depois da unidade reanalisada (a última do caminho); os ancestrais
+        só têm o fim deslocado.
+        """
+        pendentes = []
+        for pai, campo, indice, _ in caminho:
+            pai.fim += delta
+            campos = pai.campos
+            pendentes.extend(getattr(pai, c) for c in campos[campos.index(campo) + 1:])
+            if indice is not None:
+                pendentes.extend(getattr(pai, campo).statements[indice + 1:])
+
+        while pendentes:
+            no = pendentes.pop()
+            if isinstance(no, NoInterno):
+                if no.inicio is not None:
+                    no.inicio += delta
+                    no.fim += delta
+                for campo in no.campos:
+                    pendentes.append(getattr(no, campo))
+            elif isinstance(no, NoFolha):
+                no.linha += linhas
+            elif isinstance(no, list):
+                pendentes.extend(no)
+
+    def derivar(self, simbolo):
+        """
+        Reconhece o não-terminal `simbolo` a partir do token corrente e retorna o nó
+        montado pelas ações das produções.
+
+        Cada não-terminal no topo da pilha é trocado pelo corpo da produção escolhida na
+        tabela (ou pela produção vazia, se for anulável), seguido de um marcador que, ao
+        ser desempilhado, aplica a ação da produção aos valores do corpo. Sob o marcador
+        fica a posição do primeiro token da produção, usada para registrar o intervalo de
+        tokens (inicio, fim) do nó montado.
+        """
+        pilha = [simbolo]
+        valores = []
+        alturas = []    # altura da pilha de valores no início de cada ocorrência de repetição em andamento
+        empilhar, desempilhar = pilha.append, pilha.pop
+        guardar = valores.append
+        producoesDe, vazia, nivelDe = TABELA.get, VAZIAS.get, EXPRESSOES.get
+        while pilha:
+            topo = desempilhar()
+            classe = topo.__class__
+            try:
+                if classe is str:
+                    producoes = producoesDe(topo)
+                    if producoes is None:
+                        nivel = nivelDe(topo)
+                        if nivel is not None:  # expressão
+                            guardar(self.expressao(nivel))
+                            continue
+                        # terminal
+                        if self.chaveCorrente != topo:
+                            self.lancarErro(topo)
+                        guardar(self.tokenCorrente)
+                        self.proximoToken()
+                        continue
+                    producao = producoes.get(self.chaveCorrente) or vazia(topo)
+                    if producao is None:
+                        self.lancarErro(ESPERADO[topo])
+                    empilhar(self.posicao)
+                    empilhar(producao)
+                    pilha.extend(producao.reverso)
+
+                elif classe is Producao:
+                    inicio = desempilhar()
+                    n = len(topo.corpo)
+                    if n:
+                        argumentos = valores[-n:]
+                        del valores[-n:]
+                    else:
+                        argumentos = []
+                    no = topo.acao(argumentos)
+                    if isinstance(no, NoInterno) and no.inicio is None:
+                        no.inicio = inicio
+                        no.fim = self.posicao
+                    guardar(no)
+
+                elif classe is Laco:
+                    chave = self.chaveCorrente
+                    if chave in topo.primeiros:
+                        alturas.append(len(valores))
+                        empilhar(topo)
+                        empilhar(Anexar)
+                        empilhar(topo.simbolo)
+                    elif self.recuperar and chave not in topo.seguintes and chave != 'EOF':
+                        # Token que não inicia uma ocorrência nem encerra a repetição: o mesmo
+                        # erro que o terminal seguinte à repetição daria, sem o modo de diagnóstico
+                        esperado = next(iter(topo.seguintes)) if len(topo.seguintes) == 1 else None
+                        self.erros.append(self.erroSintatico(esperado))
+                        self.sincronizar(topo, descartar=True)
+                        empilhar(topo)
+
+                elif topo is Anexar:
+                    alturas.pop()
+                    valor = valores.pop()
+                    valores[-1].append(valor)
+
+                else:  # Repeticao
+                    guardar([])
+                    empilhar(topo.laco)
+
+            except SyntaxException as erro:
+                if not self.recuperar:
+                    raise
+                # Modo pânico: abandona a ocorrência de repetição (declaração) mais interna
+                # em andamento e recomeça no próximo ponto de sincronização
+                i = len(pilha) - 1
+                while i > 0 and not (pilha[i] is Anexar and pilha[i - 1].__class__ is Laco):
+                    i -= 1
+                if i <= 0:
+                    raise
+                del pilha[i:]
+                del valores[alturas.pop():]
+                self.erros.append(erro)
+                self.sincronizar(pilha[-1])
+
+        return valores[0]
+
+    def expressao(self, nivelMinimo):
+        """
+        Reconhece uma expressão por precedência de operadores e retorna o seu nó.
 
-    
-    # <statement> ::= <assign_statement> | <if_statement> | <while_statement> | <repeat_statement> | <command_statement>
-    def statement(self):
-        if self.tokenCorrente.tipo == 'ID':
-            return self.assign_statement()
-        elif self.tokenCorrente.tipo == 'SE':
-            return self.if_statement()
-        elif self.tokenCorrente.tipo == 'ENQUANTO':
-            return self.while_statement()
-        elif self.tokenCorrente.tipo == 'REPITA':
-            return self.repeat_statement()
-        elif self.tokenCorrente.valor in ['ESCREVA', 'ESCREVA_LINHA', 'LIMPE', 'INICIE_COM_COR', 'INICIE_COM_IMAGEM',
-                                        'REDEFINA_FIGURA', 'REDEFINA_IMAGEM', 'MOVA', 'DESTAQUE', 'REVERTA_DESTAQUE', 'TOQUE',
-                                        'ESPERE', 'ESPERE_SENTAR', 'ESPERE_LEVANTAR', 'INICIE_CRONOMETRO', 'PARE_CRONOMETRO']:
-            return self.command_statement()
-        else:
-            self.lancarErro()
+        Operandos e operadores pendentes ficam em duas pilhas; cada operador lido reduz os
+        de nível maior (ou igual, se associativo à esquerda) já empilhados, de modo que
+        há uma iteração por operador e nenhuma recursão. Parênteses abrem um grupo que
+        aceita qualquer operador, e NAO se aplica ao fator que o segue.
 
-    
-    # <assign_statement> ::= ID ASSIGN (<str> | <expression>)
-    def assign_statement(self):
-        id_token = self.comparar('ID')
-        self.comparar('ASSIGN')
-        if self.tokenCorrente.tipo == 'DQUOTE':
-            valor = self.str()
-        else:
-            valor = self.expression()
-        return NoInterno("assign", id=NoFolha("id", id_token.valor, id_token.linha), value=valor)
-    
-    # <block> ::= LBLOCK <statement_list> RBLOCK
-    def block(self):
-        self.comparar('LBLOCK')
-        stmts = self.statement_list()
-        self.comparar('RBLOCK')
-        return NoInterno("block", statements=stmts)
-    
-    # <if_statement> ::= SE LPAR <expression> RPAR <block> [SENAO <block>]
-    def if_statement(self):
-        self.comparar('SE')
-        self.comparar('LPAR')
-        cond = self.expression()
-        self.comparar('RPAR')
-        then_block = self.block()
-        else_block = None
-        if self.tokenCorrente.tipo == 'SENAO':
-            self.comparar('SENAO')
-            else_block = self.block()
-        return NoInterno("if", condition=cond, then_block=then_block, else_block=else_block)
-    
-    # <while_statement> ::= ENQUANTO LPAR <expression> RPAR <block>
-    def while_statement(self):
-        self.comparar('ENQUANTO')
-        self.comparar('LPAR')
-        cond = self.expression()
-        self.comparar('RPAR')
-        block = self.block()
-        return NoInterno("while", condition=cond, block=block)
-    
-    # <repeat_statement> ::= REPITA LPAR <sum_expression> RPAR <block>
-    def repeat_statement(self):
-        self.comparar('REPITA')
-        self.comparar('LPAR')
-        times = self.sum_expression()
-        self.comparar('RPAR')
-        block = self.block()
-        return NoInterno("repeat", times=times, block=block)
-
-    # <command_statement> ::= ...
-    def command_statement(self):
-        if self.tokenCorrente.valor == 'ESCREVA':
-            return self.escreva_statement()
-        elif self.tokenCorrente.valor == 'ESCREVA_LINHA':
-            return self.escreva_linha_statement()
-        elif self.tokenCorrente.valor == 'LIMPE':
-            return self.limpe_statement()
-        elif self.tokenCorrente.valor == 'INICIE_COM_COR':
-            return self.inicie_com_cor_statement()
-        elif self.tokenCorrente.valor == 'INICIE_COM_IMAGEM':
-            return self.inicie_com_imagem_statement()
-        elif self.tokenCorrente.valor == 'REDEFINA_IMAGEM':
-            return self.redefina_imagem_statement()
-        elif self.tokenCorrente.valor == 'DESTAQUE':
-            return self.destaque_statement()
-        elif self.tokenCorrente.valor == 'REVERTA_DESTAQUE':
-            return self.reverta_destaque_statement()
-        elif self.tokenCorrente.valor == 'TOQUE':
-            return self.toque_statement()
-        elif self.tokenCorrente.valor == 'ESPERE':
-            return self.espere_statement()
-        elif self.tokenCorrente.valor == 'ESPERE_SENTAR':
-            return self.espere_sentar_statement()
-        elif self.tokenCorrente.valor == 'ESPERE_LEVANTAR':
-            return self.espere_levantar_statement()
-        elif self.tokenCorrente.valor == 'PARE_CRONOMETRO':
-            return self.pare_cronometro_statement()
-        elif self.tokenCorrente.valor == 'INICIE_CRONOMETRO':
-            return self.inicie_cronometro_statement()
-        elif self.tokenCorrente.valor == 'REDEFINA_FIGURA':
-            return self.redefina_figura_statement()
-        elif self.tokenCorrente.valor == 'MOVA':
-            return self.mova_statement()
-        else:
-            self.lancarErro()
-
-    def input_statement(self):
-        if self.tokenCorrente.valor == 'LEIA_NUM':
-            return self.leia_num_statement()
-        elif self.tokenCorrente.valor == 'LEIA_ALT':
-            return self.leia_alt_statement()
-        elif self.tokenCorrente.valor == 'ESTA_SENTADO':
-            return self.esta_sentado_statement()
-        elif self.tokenCorrente.valor == 'CRIE_FIGURA':
-            return self.crie_figura_statement()
-        elif self.tokenCorrente.valor == 'CRIE_IMAGEM':
-            return self.crie_imagem_statement()
-        elif self.tokenCorrente.valor == 'COLIDIU':
-            return self.colidiu_statement()
-        elif self.tokenCorrente.valor == 'ALEATORIO':
-            return self.aleatorio_statement()
-        elif self.tokenCorrente.valor == 'CONSULTE_CRONOMETRO':
-            return self.consulte_cronometro_statement()
-        elif self.tokenCorrente.valor == 'ESTA_BIPEDAL':
-            return self.esta_bipedal_statement()
-        elif self.tokenCorrente.valor == 'ESTA_UNIPEDAL':
-            return self.esta_unipedal_statement()
-        elif self.tokenCorrente.valor == 'ESTA_SEM_CARGA':
-            return self.esta_sem_carga_statement()
-        elif self.tokenCorrente.valor == 'POSSUI_RECURSO':
-            return self.possui_recurso_statement()
-        elif self.tokenCorrente.valor == 'CONSULTE_RECURSO':
-            return self.consulte_recurso_statement()
-        else:
-            self.lancarErro()
+        Args:
+            nivelMinimo (int): Menor nível de operador aceito fora de parênteses
+                (NIVEL_RELACAO para <expression>, NIVEL_SOMA para <sum_expression>).
+        """
+        operandos = []
+        operadores = [None]     # None marca o início de um grupo (a expressão ou um parêntese)
+        pisos = [nivelMinimo]   # menor nível aceito em cada grupo aberto
+        guardar, empilhar = operandos.append, operadores.append
+
+        def reduzir():
+            _, _, montar, operador = operadores.pop()
+            dir = operandos.pop()
+            operandos[-1] = montar(operador, operandos[-1], dir)
+
+        while True:
+            # Operando: NAO* (átomo | LPAR)
+            token = self.tokenCorrente
+            tipo = token.tipo
+            if tipo in UNARIOS:
+                empilhar((None, False, UNARIOS[tipo], token.valor))
+                self.proximoToken()
+                continue
+            if tipo == 'LPAR':
+                empilhar(None)
+                pisos.append(NIVEL_RELACAO)
+                self.proximoToken()
+                continue
+            op = ATOMOS.get(tipo)
+            if op is None:
+                self.lancarErro(ESPERADO_FATOR)
+            guardar(NoFolha(op, token.valor, token.linha))
+            self.proximoToken()
 
-    def escreva_linha_statement(self):
-        self.comparar('FUNC_OUT')  # ESCREVA_LINHA
-        self.comparar('LPAR')
-        if self.tokenCorrente.tipo == 'DQUOTE':
-            valor = self.str()
-        else:
-            valor = self.expression()
-        self.comparar('RPAR')
-        return NoInterno("escrevaLinha", value=valor)
+            # Unários pendentes e fechamento de parênteses
+            while True:
+                topo = operadores[-1]
+                while topo is not None and topo[0] is None:
+                    operadores.pop()
+                    operandos[-1] = topo[2](topo[3], operandos[-1])
+                    topo = operadores[-1]
+                token = self.tokenCorrente
+                tipo = token.tipo
+                if tipo != 'RPAR' or len(pisos) == 1:
+                    break
+                while operadores[-1] is not None:
+                    reduzir()
+                operadores.pop()
+                pisos.pop()
+                self.proximoToken()
+
+            # Operador binário
+            info = OPERADORES.get(tipo)
+            if info is None or info[0] < pisos[-1]:
+                break
+            nivel, associativo, montar = info
+            while operadores[-1] is not None and operadores[-1][0] > nivel:
+                reduzir()
+            if operadores[-1] is not None and operadores[-1][0] == nivel:
+                if not associativo:
+                    break
+                reduzir()
+            empilhar((nivel, associativo, montar, token.valor))
+            self.proximoToken()
+
+        if len(pisos) > 1:
+            self.lancarErro('RPAR')
+        while operadores[-1] is not None:
+            reduzir()
+        return operandos[0]
 
-    
-    def escreva_statement(self):
-        self.comparar('FUNC_OUT')  # ESCREVA
-        self.comparar('LPAR')
-        if self.tokenCorrente.tipo == 'DQUOTE':
-            valor = self.str()
-        else:
-            valor = self.expression()
-        self.comparar('RPAR')
-        return NoInterno("escreva", value=valor)
-    
-    # <expression> ::= <sum_expression> [OPREL <sum_expression>]
-    def expression(self):
-        esq = self.sum_expression()
-        if self.tokenCorrente.tipo == 'OPREL':  # Operadores relacionais
-            op = self.comparar('OPREL')
-            dir = self.sum_expression()
-            return NoInterno("expression", operator=op.valor, esq=esq, dir=dir)
-        return esq
-
-    # <sum_expression> ::= <mult_term> [OPSUM <mult_term> ...]
-    def sum_expression(self):
-        termo = self.mult_term()
-        return self.sum_expression2(termo)
-
-    def sum_expression2(self, esq):
-        if self.tokenCorrente.tipo == 'OPSUM' or self.tokenCorrente.valor in ['OU', 'E']:  # Inclui operadores lógicos
-            op = self.comparar(self.tokenCorrente.tipo)  # Pode ser OPSUM ou lógico
-            dir = self.mult_term()
-            novo_esq = NoInterno("sum", operator=op.valor, esq=esq, dir=dir)
-            return self.sum_expression2(novo_esq)
-        return esq
 
-    
-    # <mult_term> ::= <power_term> <mult_term2>
-    def mult_term(self):
-        termo = self.power_term()
-        return self.mult_term2(termo)
-
-    # <mult_term2> ::= (OPMUL | MOD) <power_term> <mult_term2> | ε
-    def mult_term2(self, esq):
-        if self.tokenCorrente.tipo in ['OPMUL', 'MOD']:
-            op = self.comparar(self.tokenCorrente.tipo)
-            dir = self.power_term()
-            novo_esq = NoInterno("mult", operator=op.valor, esq=esq, dir=dir)
-            return self.mult_term2(novo_esq)
-        return esq
-
-    # <power_term> ::= <factor> [OPPWR <factor>]
-    def power_term(self):
-        base = self.factor()
-        if self.tokenCorrente.tipo == 'OPPWR':
-            op = self.comparar('OPPWR')
-            expoente = self.factor()
-            return NoInterno("power", base=base, operator=op.valor, expoente=expoente)
-        return base
-
-    # <factor> ::= NUM | ID | LPAR <expression> RPAR | NAO <factor>
-    def factor(self):
-        if self.tokenCorrente.tipo == 'NAO':  # Operador lógico unário
-            op = self.comparar('NAO')
-            fator = self.factor()
-            return NoInterno("not", operator=op.valor, operand=fator)
-        elif self.tokenCorrente.tipo == 'NUM':
-            num_token = self.comparar('NUM')
-            return NoFolha("num", num_token.valor, num_token.linha)
-        elif self.tokenCorrente.tipo == 'ID':
-            id_token = self.comparar('ID')
-            return NoFolha("id", id_token.valor, id_token.linha)
-        elif self.tokenCorrente.tipo == 'LPAR':
-            self.comparar('LPAR')
-            expr = self.expression()
-            self.comparar('RPAR')
-            return expr
-        else:
-            self.lancarErro("NUM, ID, 'NAO' ou '('")
-
-
-    # <limpe_statement> ::= FUNC_OUT LPAR RPAR
-    def limpe_statement(self):
-        self.comparar('FUNC_OUT') 
-        self.comparar('LPAR')
-        self.comparar('RPAR')
-        return NoInterno("LIMPE")
-
-    # <inicie_com_cor_statement> ::= FUNC_OUT LPAR <str> RPAR
-    def inicie_com_cor_statement(self):
-        self.comparar('FUNC_OUT') 
-        self.comparar('LPAR')
-        cor = self.str()  
-        self.comparar('RPAR')
-        return NoInterno("INICIE_COM_COR", cor=cor)
-    
-    # <inicie_com_imagem_statement> ::= FUNC_OUT LPAR <str> RPAR
-    def inicie_com_imagem_statement(self):
-        self.comparar('FUNC_OUT')  # INICIE_COM_IMAGEM
-        self.comparar('LPAR')
-        arq = self.str()  # Deve ser um <str>
-        self.comparar('RPAR')
-        return NoInterno("INICIE_COM_IMAGEM", arq=arq)
-
-    # <redefina_imagem_statement> ::= FUNC_OUT LPAR <sum_expression>, <str>, <sum_expression>, <sum_expression> RPAR
-    def redefina_imagem_statement(self):
-        self.comparar('FUNC_OUT')  # REDEFINA_IMAGEM
-        self.comparar('LPAR')
-        ref = self.sum_expression()  # Número ou expressão
-        self.comparar('COMMA')
-        arq = self.str()  # Deve ser um <str>
-        self.comparar('COMMA')
-        x = self.sum_expression()
-        self.comparar('COMMA')
-        y = self.sum_expression()
-        self.comparar('RPAR')
-        return NoInterno("REDEFINA_IMAGEM", ref=ref, arq=arq, x=x, y=y)
-
-    # <destaque_statement> ::= FUNC_OUT LPAR <sum_expression> RPAR
-    def destaque_statement(self):
-        self.comparar('FUNC_OUT')  # DESTAQUE
-        self.comparar('LPAR')
-        ref = self.sum_expression()  # Deve ser um número ou expressão
-        self.comparar('RPAR')
-        return NoInterno("DESTAQUE", ref=ref)
-
-    # <reverta_destaque_statement> ::= FUNC_OUT LPAR RPAR
-    def reverta_destaque_statement(self):
-        self.comparar('FUNC_OUT')  # REVERTA_DESTAQUE
-        self.comparar('LPAR')
-        self.comparar('RPAR')
-        return NoInterno("REVERTA_DESTAQUE")
-
-    # <toque_statement> ::= FUNC_OUT LPAR <str> RPAR
-    def toque_statement(self):
-        self.comparar('FUNC_OUT')  # TOQUE
-        self.comparar('LPAR')
-        arq = self.str()
-        self.comparar('RPAR')
-        return NoInterno("TOQUE", arq=arq)
-
-    # <espere_statement> ::= FUNC_OUT LPAR <sum_expression> RPAR
-    def espere_statement(self):
-        self.comparar('FUNC_OUT')  # ESPERE
-        self.comparar('LPAR')
-        t = self.sum_expression()  # Deve ser um número ou expressão
-        self.comparar('RPAR')
-        return NoInterno("ESPERE", t=t)
-
-    # <espere_sentar_statement> ::= FUNC_OUT LPAR RPAR
-    def espere_sentar_statement(self):
-        self.comparar('FUNC_OUT')  # ESPERE_SENTAR
-        self.comparar('LPAR')
-        self.comparar('RPAR')
-        return NoInterno("ESPERE_SENTAR")
-
-    # <espere_levantar_statement> ::= FUNC_OUT LPAR RPAR
-    def espere_levantar_statement(self):
-        self.comparar('FUNC_OUT')  # ESPERE_LEVANTAR
-        self.comparar('LPAR')
-        self.comparar('RPAR')
-        return NoInterno("ESPERE_LEVANTAR")
-
-    # <inicie_cronometro_statement> ::= FUNC_OUT LPAR RPAR
-    def inicie_cronometro_statement(self):
-        self.comparar('FUNC_OUT')  # INICIE_CRONOMETRO
-        self.comparar('LPAR')
-        self.comparar('RPAR')
-        return NoInterno("INICIE_CRONOMETRO")
-
-    # <leia_num_statement> ::= FUNC_IN LPAR <str> RPAR
-    def leia_num_statement(self):
-        self.comparar('FUNC_IN')  # LEIA_NUM
-        self.comparar('LPAR')
-        msg = self.str()  # Argumento deve ser uma string
-        self.comparar('RPAR')
-        return NoInterno("LEIA_NUM", msg=msg)
-
-    # <leia_alt_statement> ::= FUNC_IN LPAR <str> RPAR
-    def leia_alt_statement(self):
-        self.comparar('FUNC_IN')  # LEIA_ALT
-        self.comparar('LPAR')
-        msg = self.str()  # Argumento deve ser uma string
-        self.comparar('RPAR')
-        return NoInterno("LEIA_ALT", msg=msg)
-
-    # <esta_sentado_statement> ::= FUNC_IN LPAR RPAR
-    def esta_sentado_statement(self):
-        self.comparar('FUNC_IN')  # ESTA_SENTADO
-        self.comparar('LPAR')
-        self.comparar('RPAR')
-        return NoInterno("ESTA_SENTADO")
-
-    # <esta_bipedal_statement> ::= FUNC_IN LPAR RPAR
-    def esta_bipedal_statement(self):
-        self.comparar('FUNC_IN')  # ESTA_BIPEDAL
-        self.comparar('LPAR')
-        self.comparar('RPAR')
-        return NoInterno("ESTA_BIPEDAL")
-
-    # <esta_unipedal_statement> ::= FUNC_IN LPAR <str> RPAR
-    def esta_unipedal_statement(self):
-        self.comparar('FUNC_IN')  # ESTA_UNIPEDAL
-        self.comparar('LPAR')
-        lado = self.str()  # Argumento deve ser uma string 
-        self.comparar('RPAR')
-        return NoInterno("ESTA_UNIPEDAL", lado=lado)
-
-    # <esta_sem_carga_statement> ::= FUNC_IN LPAR RPAR
-    def esta_sem_carga_statement(self):
-        self.comparar('FUNC_IN')  # ESTA_SEM_CARGA
-        self.comparar('LPAR')
-        self.comparar('RPAR')
-        return NoInterno("ESTA_SEM_CARGA")
-
-    # <possui_recurso_statement> ::= FUNC_IN LPAR <str> RPAR
-    def possui_recurso_statement(self):
-        self.comparar('FUNC_IN')  # POSSUI_RECURSO
-        self.comparar('LPAR')
-        nome_recurso = self.str()  # Argumento deve ser uma string
-        self.comparar('RPAR')
-        return NoInterno("POSSUI_RECURSO", nome_recurso=nome_recurso)
-
-    # <consulte_recurso_statement> ::= FUNC_IN LPAR <str> COMMA <sum_expression> RPAR
-    def consulte_recurso_statement(self):
-        self.comparar('FUNC_IN')  # CONSULTE_RECURSO
-        self.comparar('LPAR')
-        nome_recurso = self.str()  # Primeiro argumento deve ser uma string
-        self.comparar('COMMA')
-        id_valor = self.sum_expression()  # Segundo argumento pode ser uma expressão numérica
-        self.comparar('RPAR')
-        return NoInterno("CONSULTE_RECURSO", nome_recurso=nome_recurso, id_valor=id_valor)
-
-    # <crie_figura_statement> ::= FUNC_IN LPAR <str> COMMA <sum_expression> COMMA <sum_expression> COMMA <str> COMMA <sum_expression> RPAR
-    def crie_figura_statement(self):
-        self.comparar('FUNC_IN')  # CRIE_FIGURA
-        self.comparar('LPAR')
-        tipo = self.str()
-        self.comparar('COMMA')
-        x = self.sum_expression()
-        self.comparar('COMMA')
-        y = self.sum_expression()
-        self.comparar('COMMA')
-        cor = self.str()
-        self.comparar('COMMA')
-        tamanho = self.sum_expression()
-        self.comparar('RPAR')
-        return NoInterno("CRIE_FIGURA", tipo=tipo, x=x, y=y, cor=cor, tamanho=tamanho)
-
-    # <crie_imagem_statement> ::= FUNC_IN LPAR <str> COMMA <sum_expression> COMMA <sum_expression> RPAR
-    def crie_imagem_statement(self):
-        self.comparar('FUNC_IN')  # CRIE_IMAGEM
-        self.comparar('LPAR')
-        arq = self.str()
-        self.comparar('COMMA')
-        x = self.sum_expression()
-        self.comparar('COMMA')
-        y = self.sum_expression()
-        self.comparar('RPAR')
-        return NoInterno("CRIE_IMAGEM", arq=arq, x=x, y=y)
-
-    # <colidiu_statement> ::= FUNC_IN LPAR <sum_expression> COMMA <sum_expression> RPAR
-    def colidiu_statement(self):
-        self.comparar('FUNC_IN')  # COLIDIU
-        self.comparar('LPAR')
-        ref1 = self.sum_expression()
-        self.comparar('COMMA')
-        ref2 = self.sum_expression()
-        self.comparar('RPAR')
-        return NoInterno("COLIDIU", ref1=ref1, ref2=ref2)
-
-    # <aleatorio_statement> ::= FUNC_IN LPAR <sum_expression> COMMA <sum_expression> RPAR
-    def aleatorio_statement(self):
-        self.comparar('FUNC_IN')  # ALEATORIO
-        self.comparar('LPAR')
-        min_val = self.sum_expression()
-        self.comparar('COMMA')
-        max_val = self.sum_expression()
-        self.comparar('RPAR')
-        return NoInterno("ALEATORIO", min=min_val, max=max_val)
-
-    # <consulte_cronometro_statement> ::= FUNC_IN LPAR RPAR
-    def consulte_cronometro_statement(self):
-        self.comparar('FUNC_IN')  # CONSULTE_CRONOMETRO
-        self.comparar('LPAR')
-        self.comparar('RPAR')
-        return NoInterno("CONSULTE_CRONOMETRO")
-
-    # <redefina_figura_statement> ::= FUNC_OUT LPAR <sum_expression> COMMA <str> COMMA <sum_expression> COMMA <sum_expression> COMMA <str> COMMA <sum_expression> RPAR
-    def redefina_figura_statement(self):
-        self.comparar('FUNC_OUT')  # REDEFINA_FIGURA
-        self.comparar('LPAR')
-        ref = self.sum_expression()
-        self.comparar('COMMA')
-        tipo = self.str()
-        self.comparar('COMMA')
-        x = self.sum_expression()
-        self.comparar('COMMA')
-        y = self.sum_expression()
-        self.comparar('COMMA')
-        cor = self.str()
-        self.comparar('COMMA')
-        tamanho = self.sum_expression()
-        self.comparar('RPAR')
-        return NoInterno("REDEFINA_FIGURA", ref=ref, tipo=tipo, x=x, y=y, cor=cor, tamanho=tamanho)
-
-    # <mova_statement> ::= FUNC_OUT LPAR <sum_expression> COMMA <sum_expression> COMMA <sum_expression> RPAR
-    def mova_statement(self):
-        self.comparar('FUNC_OUT')  # MOVA
-        self.comparar('LPAR')
-        ref = self.sum_expression()
-        self.comparar('COMMA')
-        dx = self.sum_expression()
-        self.comparar('COMMA')
-        dy = self.sum_expression()
-        self.comparar('RPAR')
-        return NoInterno("MOVA", ref=ref, dx=dx, dy=dy)
-     
 
 if __name__ == "__main__":
     """
@@ -642,7 +531,7 @@ if __name__ == "__main__":
         if not statements or not isinstance(statements, NoInterno):
             return False
         # Verifica se dentro do if tem um while
-        if_stmt = statements.d.get('statement')
+        if_stmt = statements.d.get('statements')[0]
         if not if_stmt or not isinstance(if_stmt, NoInterno) or if_stmt.op != "if":
             return False
         return True
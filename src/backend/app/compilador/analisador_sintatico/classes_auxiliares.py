@@ -1,39 +1,94 @@
 # -*- coding: utf-8 -*-
 
+import io
+import keyword
+from collections.abc import MutableMapping
+
 class LexicalException(Exception):
-	"""
-	Define uma classe (vazia) que representa um erro léxico.
-	Herda da classe Exception.
-	"""
-	pass
+    """
+    Define uma classe que representa um erro léxico.
+    Herda da classe Exception; o atributo linha guarda a linha do erro (None se desconhecida).
+    """
+
+    def __init__(self, mensagem, linha=None):
+        super().__init__(mensagem)
+        self.linha = linha
+
+    def __reduce__(self):
+        return self.__class__, (str(self), self.linha)
 
 
 class SyntaxException(Exception):
-	"""
-	Define uma classe (vazia) que representa um erro sintático.
-	Herda da classe Exception.
-	"""
-	pass
+    """
+    Define uma classe que representa um erro sintático.
+    Herda da classe Exception; o atributo linha guarda a linha do erro (None se desconhecida).
+    """
+
+    def __init__(self, mensagem, linha=None):
+        super().__init__(mensagem)
+        self.linha = linha
+
+    def __reduce__(self):
+        return self.__class__, (str(self), self.linha)
 
 
 class Token:
-	"""
-	Classe que representa um token.
-	Por simplicidade, mantenha os atributos públicos.
-	"""
-
-	def __init__(self, tipo, valor, linha):
-		self.tipo = tipo
-		self.valor = valor
-		self.linha = linha
-	
-	
-	def __repr__(self):
-		"""
-		Método auxiliar que é chamado automaticamente quando desejamos converter
-		um objeto token em string. Exemplo: print(token)
-		"""
-		return f"({self.tipo} {self.valor} {self.linha})"
+    """
+    Classe que representa um token.
+    Por simplicidade, mantenha os atributos públicos.
+    """
+
+    def __init__(self, tipo, valor, linha):
+        self.tipo = tipo
+        self.valor = valor
+        self.linha = linha
+
+
+    def __repr__(self):
+        """
+        Método auxiliar que é chamado automaticamente quando desejamos converter
+        um objeto token em string. Exemplo: print(token)
+        """
+        return f"({self.tipo} {self.valor} {self.linha})"
+
+
+def _no_interno(op, campos, valores, inicio=None, fim=None, tipoDado=None):
+    """Reconstrói um NoInterno a partir de (op, campos, valores); usado por pickle e copy."""
+    no = NoInterno.classe(op, *campos)(op, *valores)
+    no.inicio, no.fim, no.tipoDado = inicio, fim, tipoDado
+    return no
+
+
+class Campos(MutableMapping):
+    """
+    Visão de dicionário dos campos de um NoInterno (atributo d), na ordem em que foram
+    definidos. Alterações são gravadas no nó; não é possível criar nem remover campos.
+    """
+
+    __slots__ = ('no',)
+
+    def __init__(self, no):
+        self.no = no
+
+    def __getitem__(self, k):
+        if k not in self.no.campos:
+            raise KeyError(k)
+        return getattr(self.no, k)
+
+    def __setitem__(self, k, v):
+        self.no.set(k, v)
+
+    def __delitem__(self, k):
+        raise TypeError(f'não é possível remover o campo "{k}" de um NoInterno')
+
+    def __iter__(self):
+        return iter(self.no.campos)
+
+    def __len__(self):
+        return len(self.no.campos)
+
+    def __repr__(self):
+        return repr(dict(self))
 
 
 class NoInterno:
@@ -41,65 +96,215 @@ class NoInterno:
     Classe que representa um nó interno na árvore sintática.
     Recebe como parâmetros:
         - uma string op (operador). Por padrão, use o nome do método que criou o objeto;
-        - **kwargs: um conjunto de parâmetros nomeados que serão armazenados como um dicionário (atributo d);
-    
+        - **kwargs: um conjunto de parâmetros nomeados que serão armazenados como campos do nó;
+
+    Cada combinação (op, nomes dos campos) tem a sua própria subclasse com __slots__,
+    criada na primeira vez que aparece: NoInterno("sum", operator=..., esq=..., dir=...)
+    devolve uma instância da subclasse de "sum", sem dicionário por nó. Os campos são
+    atributos (no.esq), acessíveis também por get(k) e pela visão de dicionário d.
+    A subclasse também aceita os campos por posição, na ordem de definição
+    (NoInterno.classe("sum", "operator", "esq", "dir")("sum", "+", esq, dir)).
+
+    Os atributos inicio e fim guardam o intervalo [inicio, fim) dos índices dos tokens
+    reconhecidos pelo nó, preenchido pelo analisador sintático (None se desconhecido).
+    O atributo tipoDado guarda o tipo ("NUM", "ALT" ou "TXT") inferido pelo analisador
+    semântico (None antes dele, nos comandos ou se indeterminado).
+
     Por simplicidade, mantém os atributos públicos.
     """
 
-    def __init__(self, op, **kwargs):
-        self.op = op
-        self.d = {}
-        for k, v in kwargs.items():
-            self.d[k] = v
+    __slots__ = ('op', 'inicio', 'fim', 'tipoDado')
+    campos = ()
+    _classes = {}
+
+    def __new__(cls, op, *valores, **kwargs):
+        if cls is NoInterno:
+            cls = NoInterno.classe(op, *kwargs)
+        return object.__new__(cls)
+
+    @staticmethod
+    def classe(op, *campos):
+        """
+        Retorna a subclasse com __slots__ dos nós `op` com os campos `campos`.
+
+        Raises:
+            ValueError: Se algum nome de campo é inválido ou repetido.
+        """
+        chave = (op, campos)
+        classe = NoInterno._classes.get(chave)
+        if classe is None:
+            for campo in campos:
+                if not campo.isidentifier() or keyword.iskeyword(campo) or campo.startswith('_') or hasattr(NoInterno, campo):
+                    raise ValueError(f'nome de campo inválido para NoInterno: "{campo}"')
+            if len(set(campos)) != len(campos):
+                raise ValueError(f'nomes de campo repetidos para NoInterno: {campos}')
+            parametros = "".join(", " + campo for campo in campos)
+            corpo = "".join(f"    self.{campo} = {campo}\n" for campo in campos)
+            namespace = {}
+            exec(f"def __init__(self, op{parametros}):\n    self.op = op\n    self.inicio = self.fim = self.tipoDado = None\n{corpo}", namespace)
+            classe = type(f"NoInterno_{op}", (NoInterno,), {
+                '__slots__': campos,
+                '__init__': namespace['__init__'],
+                'campos': campos,
+            })
+            NoInterno._classes[chave] = classe
+        return classe
+
+    @property
+    def d(self):
+        return Campos(self)
 
     def get(self, k):
-        return self.d.get(k)
+        if k in self.campos:
+            return getattr(self, k)
+        return None
+
+    def set(self, k, v):
+        if k not in self.campos:
+            raise KeyError(f'o nó "{self.op}" não tem o campo "{k}"')
+        setattr(self, k, v)
+
+    def __reduce__(self):
+        return _no_interno, (self.op, self.campos, tuple(getattr(self, k) for k in self.campos),
+                             self.inicio, self.fim, self.tipoDado)
 
     def __repr__(self):
-        listaParametros = []
-        # Os parâmetros nomeados aparecerão sempre ordenados para facilitar a comparação.
-        # Desta maneira, a ordem em que eles forem definidos não vai importar:
-        for k in sorted(self.d.keys()):
-            valor = self.d[k]
-            if isinstance(valor, str):
-                valor = f'"{valor}"'
-            listaParametros.append(f"{k}={valor}")
-        parametrosStr = ", ".join(listaParametros)
-        if len(parametrosStr) > 0:
-            parametrosStr = ", " + parametrosStr
-        return f'NoInterno(op="{self.op}"{parametrosStr})'
+        # Os parâmetros nomeados aparecem sempre ordenados para facilitar a comparação
+        return representar(self)
 
     def toString(self, nivel=0):
         """
         Função que imprime a árvore sintática formatada.
         """
-        s = f'NoInterno(op="{self.op}", \n'
-        for i, k in enumerate(self.d.keys()):
-            valor = self.d[k]
+        saida = io.StringIO()
+        imprimir(self, saida, nivel)
+        return saida.getvalue()
+
+    def toChain(self):
+        """
+        Retorna uma cópia da árvore no formato antigo das listas de declarações.
+
+        O analisador guarda cada lista de declarações como um único nó "statementList"
+        com uma lista Python (statements=[...]). Esta visão de compatibilidade converte
+        essas listas na cadeia NoInterno("statementList", statement=..., prox=...)
+        terminada em None, esperada por consumidores antigos.
+        """
+        if self.op == "statementList" and isinstance(self.get("statements"), list):
+            cadeia = None
+            for stmt in reversed(self.statements):
+                stmt = stmt.toChain() if isinstance(stmt, NoInterno) else stmt
+                cadeia = NoInterno("statementList", statement=stmt, prox=cadeia)
+            return cadeia
+        d = {}
+        for k in self.campos:
+            v = getattr(self, k)
+            d[k] = v.toChain() if isinstance(v, NoInterno) else v
+        return NoInterno(self.op, **d)
+
+
+def representar(valor):
+    """
+    Retorna repr(valor) para um valor da árvore sintática (nó, lista, str, None...),
+    montado com uma pilha explícita, sem recursão.
+
+    Nos campos de um NoInterno, strings aparecem entre aspas duplas e os campos em ordem
+    alfabética: NoInterno(op="sum", dir=..., esq=..., operator="+").
+    """
+    if isinstance(valor, str):
+        return repr(valor)
+    partes = []
+    escrever = partes.append
+    pilha = [valor]     # str: texto pronto; demais: valor a representar
+    empilhar = pilha.append
+    while pilha:
+        item = pilha.pop()
+        if isinstance(item, str):
+            escrever(item)
+        elif isinstance(item, NoInterno):
+            escrever(f'NoInterno(op="{item.op}"')
+            empilhar(")")
+            for k in sorted(item.campos, reverse=True):
+                v = getattr(item, k)
+                empilhar(f'"{v}"' if isinstance(v, str) else v)
+                empilhar(f", {k}=")
+        elif isinstance(item, list):
+            escrever("[")
+            empilhar("]")
+            for i in range(len(item) - 1, -1, -1):
+                v = item[i]
+                empilhar(repr(v) if isinstance(v, str) else v)
+                if i:
+                    empilhar(", ")
+        else:
+            escrever(repr(item))
+    return "".join(partes)
+
+
+def imprimir(arvore, saida, nivel=0):
+    """
+    Escreve a árvore sintática formatada (o mesmo texto de NoInterno.toString) em `saida`,
+    um arquivo de texto ou io.StringIO, à medida que a percorre, sem recursão.
+
+    Args:
+        arvore (NoInterno | NoFolha | list | str | None): Raiz da árvore.
+        saida: Objeto com o método write(str).
+        nivel (int): Nível de recuo da raiz.
+    """
+    escrever = saida.write
+    pilha = [(arvore, nivel)]   # str: texto pronto; (nó, nível): NoInterno a imprimir
+    empilhar = pilha.append
+    while pilha:
+        item = pilha.pop()
+        if isinstance(item, str):
+            escrever(item)
+            continue
+        no, nivel = item
+        if not isinstance(no, NoInterno):
+            escrever(representar(no))
+            continue
+        recuo = "    " * nivel
+        escrever(f'NoInterno(op="{no.op}", \n')
+        empilhar(recuo + ")")
+        ultimo = len(no.campos) - 1
+        for i in range(ultimo, -1, -1):
+            k = no.campos[i]
+            valor = getattr(no, k)
+            empilhar(",\n" if i < ultimo else "\n")
             if isinstance(valor, str):
-                valor = f'"{valor}"'
+                empilhar(f'"{valor}"')
             elif isinstance(valor, NoInterno):
-                valor = valor.toString(nivel+1)
-            s += "    " * nivel + f"{k}=\n{'    ' * (nivel + 1)}{valor}"
-            if i < len(self.d.keys()) - 1:
-                s += ",\n"
+                empilhar((valor, nivel + 1))
+            elif isinstance(valor, list):
+                recuoItem = "    " * (nivel + 2)
+                empilhar("\n" + recuo + "    ]")
+                for j in range(len(valor) - 1, -1, -1):
+                    v = valor[j]
+                    empilhar((v, nivel + 2) if isinstance(v, NoInterno) else representar(v))
+                    empilhar(("[\n" if j == 0 else ",\n") + recuoItem)
+                if not valor:
+                    empilhar("[\n")
             else:
-                s += "\n"
-        s += "    " * nivel + ")"
-        return s
+                empilhar(representar(valor))
+            empilhar(f"{recuo}{k}=\n{recuo}    ")
 
 
 class NoFolha:
     """
     Classe que representa um nó folha da árvore sintática.
     Um nó folha pode ser: um TYPE, ID, NUMBER, BOOLEAN.
+    Os atributos tipoDado ("NUM", "ALT" ou "TXT") e simbolo (o Simbolo da tabela de
+    símbolos a que um "id" se refere) são preenchidos pelo analisador semântico.
     Por simplicidade, mantém os atributos públicos.
     """
 
+    __slots__ = ('op', 'valor', 'linha', 'tipoDado', 'simbolo')
+
     def __init__(self, op, valor, linha):
         self.op = op
         self.valor = valor
         self.linha = linha
+        self.tipoDado = None
+        self.simbolo = None
 
     def __repr__(self):
-        return f'NoFolha(op="{self.op}", valor="{self.valor}", linha={self.linha})'
\ No newline at end of file
+        return f'NoFolha(op="{self.op}", valor="{self.valor}", linha={self.linha})'
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+
+"""
+Definição da gramática da linguagem e das tabelas do analisador sintático LL(1).
+
+A gramática é descrita como dados: cada produção tem uma cabeça (não-terminal), um
+corpo (sequência de terminais, não-terminais e repetições { X }) e uma ação que recebe
+os valores do corpo e monta o nó da árvore sintática. Na importação do módulo são
+calculados os conjuntos FIRST e FOLLOW e a tabela de análise usada pelo
+AnalisadorSintatico; conflitos LL(1) são detectados neste momento.
+
+Os terminais são os tipos de token (LPAR, ID, ...). Para os tokens FUNC_IN e FUNC_OUT o
+terminal é o próprio nome do comando (MOVA, LEIA_NUM, ...), de modo que cada comando
+tem a sua produção. Para criar um comando novo basta acrescentá-lo à tabela COMANDOS.
+
+As expressões (<expression> e <sum_expression>) ficam fora da tabela: são reconhecidas
+por precedência de operadores, a partir das tabelas OPERADORES, UNARIOS e ATOMOS.
+"""
+
+from app.compilador.analisador_sintatico.classes_auxiliares import NoInterno, NoFolha
+
+# Tipos de token cujo terminal é o valor (nome do comando), e não o tipo
+FUNCOES = frozenset(['FUNC_IN', 'FUNC_OUT'])
+
+EPSILON = ''
+
+
+class Repeticao:
+    """
+    Símbolo { X } do corpo de uma produção: zero ou mais ocorrências de X.
+    O valor produzido é a lista Python com os valores de cada ocorrência.
+    """
+
+    def __init__(self, simbolo):
+        self.simbolo = simbolo
+        self.laco = Laco(simbolo)
+
+    def __repr__(self):
+        return "{ " + self.simbolo + " }"
+
+
+class Laco:
+    """
+    Marcador de pilha de uma repetição em andamento: enquanto o token corrente estiver
+    em FIRST(simbolo), uma nova ocorrência é reconhecida e anexada à lista. Os terminais
+    que podem seguir a repetição ficam em `seguintes` (usados na recuperação de erros).
+    """
+
+    def __init__(self, simbolo):
+        self.simbolo = simbolo
+        self.primeiros = frozenset()
+        self.seguintes = frozenset()
+
+
+class Anexar:
+    """
+    Marcador de pilha que anexa o último valor reconhecido à lista da repetição.
+    """
+
+
+class Producao:
+    """
+    Produção cabeca ::= corpo, com a ação que monta o nó a partir dos valores do corpo.
+    """
+
+    def __init__(self, cabeca, corpo, acao):
+        self.cabeca = cabeca
+        self.corpo = corpo
+        self.reverso = tuple(reversed(corpo))
+        self.acao = acao
+
+    def __repr__(self):
+        return f"<{self.cabeca}> ::= " + (" ".join(map(str, self.corpo)) or "ε")
+
+
+# Classes (com __slots__) dos nós de op e campos fixos, montados por posição
+Programa = NoInterno.classe("program", "descricao", "statements")
+Lista = NoInterno.classe("statementList", "statements")
+Atribuicao = NoInterno.classe("assign", "id", "value")
+Se = NoInterno.classe("if", "condition", "then_block", "else_block")
+Enquanto = NoInterno.classe("while", "condition", "block")
+Repita = NoInterno.classe("repeat", "times", "block")
+Bloco = NoInterno.classe("block", "statements")
+
+
+def lista(stmts):
+    return Lista("statementList", stmts)
+
+
+def primeiro(v):
+    return v[0]
+
+
+def segundo(v):
+    return v[1]
+
+
+def nenhum(v):
+    return None
+
+
+# Comandos da linguagem: nome -> (tipo do token, op do nó, ((campo, argumento), ...)).
+# O argumento é o não-terminal que o reconhece: <str>, <sum_expression> ou <valor>
+# (<str> | <expression>).
+COMANDOS = {
+    # Funções de saída
+    'ESCREVA': ('FUNC_OUT', 'escreva', (('value', 'valor'),)),
+    'ESCREVA_LINHA': ('FUNC_OUT', 'escrevaLinha', (('value', 'valor'),)),
+    'LIMPE': ('FUNC_OUT', 'LIMPE', ()),
+    'INICIE_COM_COR': ('FUNC_OUT', 'INICIE_COM_COR', (('cor', 'str'),)),
+    'INICIE_COM_IMAGEM': ('FUNC_OUT', 'INICIE_COM_IMAGEM', (('arq', 'str'),)),
+    'REDEFINA_FIGURA': ('FUNC_OUT', 'REDEFINA_FIGURA', (('ref', 'sum_expression'), ('tipo', 'str'), ('x', 'sum_expression'),
+                                                        ('y', 'sum_expression'), ('cor', 'str'), ('tamanho', 'sum_expression'))),
+    'REDEFINA_IMAGEM': ('FUNC_OUT', 'REDEFINA_IMAGEM', (('ref', 'sum_expression'), ('arq', 'str'), ('x', 'sum_expression'),
+                                                        ('y', 'sum_expression'))),
+    'MOVA': ('FUNC_OUT', 'MOVA', (('ref', 'sum_expression'), ('dx', 'sum_expression'), ('dy', 'sum_expression'))),
+    'DESTAQUE': ('FUNC_OUT', 'DESTAQUE', (('ref', 'sum_expression'),)),
+    'REVERTA_DESTAQUE': ('FUNC_OUT', 'REVERTA_DESTAQUE', ()),
+    'TOQUE': ('FUNC_OUT', 'TOQUE', (('arq', 'str'),)),
+    'ESPERE': ('FUNC_OUT', 'ESPERE', (('t', 'sum_expression'),)),
+    'ESPERE_SENTAR': ('FUNC_OUT', 'ESPERE_SENTAR', ()),
+    'ESPERE_LEVANTAR': ('FUNC_OUT', 'ESPERE_LEVANTAR', ()),
+    'INICIE_CRONOMETRO': ('FUNC_OUT', 'INICIE_CRONOMETRO', ()),
+    'PARE_CRONOMETRO': ('FUNC_OUT', 'PARE_CRONOMETRO', ()),
+
+    # Funções de entrada
+    'LEIA_NUM': ('FUNC_IN', 'LEIA_NUM', (('msg', 'str'),)),
+    'LEIA_ALT': ('FUNC_IN', 'LEIA_ALT', (('msg', 'str'),)),
+    'ESTA_SENTADO': ('FUNC_IN', 'ESTA_SENTADO', ()),
+    'CRIE_FIGURA': ('FUNC_IN', 'CRIE_FIGURA', (('tipo', 'str'), ('x', 'sum_expression'), ('y', 'sum_expression'),
+                                               ('cor', 'str'), ('tamanho', 'sum_expression'))),
+    'CRIE_IMAGEM': ('FUNC_IN', 'CRIE_IMAGEM', (('arq', 'str'), ('x', 'sum_expression'), ('y', 'sum_expression'))),
+    'COLIDIU': ('FUNC_IN', 'COLIDIU', (('ref1', 'sum_expression'), ('ref2', 'sum_expression'))),
+    'ALEATORIO': ('FUNC_IN', 'ALEATORIO', (('min', 'sum_expression'), ('max', 'sum_expression'))),
+    'CONSULTE_CRONOMETRO': ('FUNC_IN', 'CONSULTE_CRONOMETRO', ()),
+    'ESTA_BIPEDAL': ('FUNC_IN', 'ESTA_BIPEDAL', ()),
+    'ESTA_UNIPEDAL': ('FUNC_IN', 'ESTA_UNIPEDAL', (('lado', 'str'),)),
+    'ESTA_SEM_CARGA': ('FUNC_IN', 'ESTA_SEM_CARGA', ()),
+    'POSSUI_RECURSO': ('FUNC_IN', 'POSSUI_RECURSO', (('nome_recurso', 'str'),)),
+    'CONSULTE_RECURSO': ('FUNC_IN', 'CONSULTE_RECURSO', (('nome_recurso', 'str'), ('id_valor', 'sum_expression'))),
+}
+
+
+def producao_comando(nome, op, argumentos):
+    """
+    <comando> ::= NOME LPAR [<arg> {COMMA <arg>}] RPAR
+    """
+    corpo = [nome, 'LPAR']
+    for i, (_, argumento) in enumerate(argumentos):
+        if i > 0:
+            corpo.append('COMMA')
+        corpo.append(argumento)
+    corpo.append('RPAR')
+    classe = NoInterno.classe(op, *(campo for campo, _ in argumentos))
+    posicoes = range(2, 2 * len(argumentos) + 2, 2)
+    return Producao('statement', tuple(corpo), lambda v: classe(op, *[v[i] for i in posicoes]))
+
+
+GRAMATICA = [
+    # <program> ::= <str> { <statement> }
+    Producao('program', ('str', Repeticao('statement')),
+             lambda v: Programa("program", v[0], lista(v[1]))),
+
+    # <str> ::= DQUOTE TXT DQUOTE
+    Producao('str', ('DQUOTE', 'TXT', 'DQUOTE'), lambda v: NoFolha("string", v[1].valor, v[1].linha)),
+
+    # <statement> ::= <assign_statement> | <if_statement> | <while_statement> | <repeat_statement>
+    #               | <command_statement> | <input_statement>
+    # <assign_statement> ::= ID ASSIGN <valor>
+    Producao('statement', ('ID', 'ASSIGN', 'valor'),
+             lambda v: Atribuicao("assign", NoFolha("id", v[0].valor, v[0].linha), v[2])),
+    # <if_statement> ::= SE LPAR <expression> RPAR <block> <senao>
+    Producao('statement', ('SE', 'LPAR', 'expression', 'RPAR', 'block', 'senao'),
+             lambda v: Se("if", v[2], v[4], v[5])),
+    # <while_statement> ::= ENQUANTO LPAR <expression> RPAR <block>
+    Producao('statement', ('ENQUANTO', 'LPAR', 'expression', 'RPAR', 'block'),
+             lambda v: Enquanto("while", v[2], v[4])),
+    # <repeat_statement> ::= REPITA LPAR <sum_expression> RPAR <block>
+    Producao('statement', ('REPITA', 'LPAR', 'sum_expression', 'RPAR', 'block'),
+             lambda v: Repita("repeat", v[2], v[4])),
+    # <command_statement> | <input_statement>: uma produção por entrada de COMANDOS
+    *(producao_comando(nome, op, argumentos) for nome, (_, op, argumentos) in COMANDOS.items()),
+
+    # <senao> ::= SENAO <block> | ε
+    Producao('senao', ('SENAO', 'block'), segundo),
+    Producao('senao', (), nenhum),
+
+    # <block> ::= LBLOCK { <statement> } RBLOCK
+    Producao('block', ('LBLOCK', Repeticao('statement'), 'RBLOCK'), lambda v: Bloco("block", lista(v[1]))),
+
+    # <valor> ::= <str> | <expression>
+    Producao('valor', ('str',), primeiro),
+    Producao('valor', ('expression',), primeiro),
+]
+
+# Tipo esperado informado nos erros de cada não-terminal quando nenhuma produção se aplica
+# (None: apenas "Token inesperado"). Os demais são calculados a partir de FIRST.
+ESPERADO_FATOR = "NUM, ID, 'NAO' ou '('"
+ESPERADO = {
+    'statement': None,
+    'valor': ESPERADO_FATOR,
+}
+
+# Terminais de sincronização da recuperação de erros (além do início de um <statement>)
+SINCRONIZACAO = frozenset(['RBLOCK', 'EOF'])
+
+# Expressões não fazem parte da tabela LL(1): são reconhecidas por precedência
+# (AnalisadorSintatico.expressao). Não-terminal -> menor nível de operador aceito.
+# <expression> ::= <sum_expression> [OPREL <sum_expression>]
+# <sum_expression> ::= <mult_term> { OPSUM <mult_term> }
+# <mult_term> ::= <power_term> { OPMUL <power_term> }
+# <power_term> ::= <factor> [OPPOW <factor>]
+# <factor> ::= NAO <factor> | NUM | ID | ALT | LPAR <expression> RPAR
+NIVEL_RELACAO, NIVEL_SOMA, NIVEL_PRODUTO, NIVEL_POTENCIA = 1, 2, 3, 4
+EXPRESSOES = {
+    'expression': NIVEL_RELACAO,
+    'sum_expression': NIVEL_SOMA,
+}
+
+def binario(op):
+    """Retorna o construtor (operador, esq, dir) -> nó de um operador binário."""
+    if op == "power":
+        classe = NoInterno.classe(op, "base", "operator", "expoente")
+        return lambda operador, esq, dir: classe(op, esq, operador, dir)
+    classe = NoInterno.classe(op, "operator", "esq", "dir")
+    return lambda operador, esq, dir: classe(op, operador, esq, dir)
+
+
+def unario(op):
+    """Retorna o construtor (operador, operando) -> nó de um operador unário."""
+    classe = NoInterno.classe(op, "operator", "operand")
+    return lambda operador, operando: classe(op, operador, operando)
+
+
+# Operadores binários: tipo do token -> (nível, associativo à esquerda, construtor do nó).
+# OPSUM inclui OU e OPMUL inclui E e MOD. Os não associativos aparecem no máximo uma
+# vez por nível: um segundo operador do mesmo nível encerra a expressão.
+OPERADORES = {
+    'OPREL': (NIVEL_RELACAO, False, binario("expression")),
+    'OPSUM': (NIVEL_SOMA, True, binario("sum")),
+    'OPMUL': (NIVEL_PRODUTO, True, binario("mult")),
+    'OPPOW': (NIVEL_POTENCIA, False, binario("power")),
+    'OPPWR': (NIVEL_POTENCIA, False, binario("power")),
+}
+
+# Operadores unários (aplicados a um <factor>): tipo do token -> construtor do nó
+UNARIOS = {'NAO': unario("not")}
+
+# Operandos: tipo do token -> op da folha
+ATOMOS = {'NUM': "num", 'NUMBER': "num", 'ID': "id", 'ALT': "alt"}
+
+FIRST_EXPRESSAO = frozenset(UNARIOS) | frozenset(ATOMOS) | {'LPAR'}
+
+
+def calcular_first(gramatica):
+    """
+    Calcula FIRST de cada não-terminal por ponto fixo. EPSILON indica que é anulável.
+    """
+    first = {p.cabeca: set() for p in gramatica}
+    first.update((nome, set(FIRST_EXPRESSAO)) for nome in EXPRESSOES)
+    mudou = True
+    while mudou:
+        mudou = False
+        for p in gramatica:
+            antes = len(first[p.cabeca])
+            first[p.cabeca] |= first_sequencia(p.corpo, first)
+            mudou = mudou or len(first[p.cabeca]) != antes
+    return first
+
+
+def first_sequencia(simbolos, first):
+    """
+    FIRST de uma sequência de símbolos, dados os FIRST dos não-terminais.
+    """
+    resultado = set()
+    for simbolo in simbolos:
+        if isinstance(simbolo, Repeticao):
+            resultado |= first[simbolo.simbolo] - {EPSILON}
+            continue
+        if simbolo not in first:
+            resultado.add(simbolo)
+            return resultado
+        resultado |= first[simbolo] - {EPSILON}
+        if EPSILON not in first[simbolo]:
+            return resultado
+    resultado.add(EPSILON)
+    return resultado
+
+
+def calcular_follow(gramatica, first, inicial):
+    """
+    Calcula FOLLOW de cada não-terminal (incluindo os repetidos em { X }) por ponto fixo.
+    """
+    follow = {cabeca: set() for cabeca in first}
+    follow[inicial].add('EOF')
+    mudou = True
+    while mudou:
+        mudou = False
+        for p in gramatica:
+            for i, simbolo in enumerate(p.corpo):
+                repetido = isinstance(simbolo, Repeticao)
+                nome = simbolo.simbolo if repetido else simbolo
+                if nome not in first:
+                    continue
+                resto = first_sequencia(p.corpo[i + 1:], first)
+                novos = resto - {EPSILON}
+                if repetido:
+                    novos |= first[nome] - {EPSILON}
+                if EPSILON in resto:
+                    novos |= follow[p.cabeca]
+                antes = len(follow[nome])
+                follow[nome] |= novos
+                mudou = mudou or len(follow[nome]) != antes
+    return follow
+
+
+def construir_tabela(gramatica, first, follow):
+    """
+    Monta a tabela LL(1): não-terminal -> {terminal: produção}, mais a produção vazia
+    de cada não-terminal anulável, usada sempre que nenhum terminal a seleciona (como
+    faziam os métodos recursivos). Levanta ValueError em caso de conflito.
+    """
+    tabela = {p.cabeca: {} for p in gramatica}
+    vazias = {}
+    for p in gramatica:
+        selecao = first_sequencia(p.corpo, first)
+        if EPSILON in selecao:
+            if p.cabeca in vazias:
+                raise ValueError(f"Conflito LL(1) em <{p.cabeca}>: mais de uma produção anulável")
+            vazias[p.cabeca] = p
+            if selecao & follow[p.cabeca] - {EPSILON}:
+                raise ValueError(f"Conflito LL(1) em <{p.cabeca}>: FIRST e FOLLOW se sobrepõem")
+        for terminal in selecao - {EPSILON}:
+            if terminal in tabela[p.cabeca]:
+                raise ValueError(f"Conflito LL(1) em <{p.cabeca}> com o terminal {terminal}")
+            tabela[p.cabeca][terminal] = p
+        for i, simbolo in enumerate(p.corpo):
+            if isinstance(simbolo, Repeticao):
+                simbolo.laco.primeiros = frozenset(first[simbolo.simbolo] - {EPSILON})
+                seguinte = first_sequencia(p.corpo[i + 1:], first)
+                if EPSILON in seguinte:
+                    seguinte |= follow[p.cabeca]
+                if simbolo.laco.primeiros & seguinte:
+                    raise ValueError(f"Conflito LL(1) na repetição {simbolo} de <{p.cabeca}>")
+                simbolo.laco.seguintes = frozenset(seguinte - {EPSILON})
+    return tabela, vazias
+
+
+FIRST = calcular_first(GRAMATICA)
+FOLLOW = calcular_follow(GRAMATICA, FIRST, 'program')
+TABELA, VAZIAS = construir_tabela(GRAMATICA, FIRST, FOLLOW)
+
+for _cabeca, _first in FIRST.items():
+    if _cabeca not in ESPERADO and _cabeca not in EXPRESSOES:
+        _terminais = _first - {EPSILON}
+        ESPERADO[_cabeca] = next(iter(_terminais)) if len(_terminais) == 1 else None
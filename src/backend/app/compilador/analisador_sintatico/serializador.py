@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+"""
+Serialização da árvore sintática (NoInterno/NoFolha) para envio pela API.
+
+Dois formatos, ambos escritos de forma iterativa (pilha explícita, sem recursão) em um
+único buffer:
+
+JSON estruturado (para_json):
+    nó interno -> {"op": op, "filhos": {campo: valor, ...}} (campos na ordem de definição)
+    nó folha   -> {"op": op, "valor": valor, "linha": linha}
+    lista -> [...], str -> "...", None -> null
+
+Binário compacto (para_binario / de_binario):
+    cabeçalho: ASSINATURA (4 bytes) + deslocamento da tabela final (uint32 little-endian,
+    preenchido ao final da escrita);
+    corpo: os valores em pré-ordem, cada um iniciado por um código varint:
+        0 None | 1 str (índice) | 2 folha (op, valor, linha) | 3 lista (tamanho)
+        4 + k nó interno com o formato k (seguido dos valores dos seus campos);
+    tabela final: as strings internadas (quantidade, e para cada uma o tamanho em bytes
+    e o UTF-8) e os formatos dos nós internos (quantidade, e para cada um o índice do op,
+    a quantidade de campos e o índice do nome de cada campo).
+Todos os inteiros do corpo e da tabela são varints (7 bits por byte).
+"""
+
+import struct
+from json.encoder import encode_basestring
+
+from app.compilador.analisador_sintatico.classes_auxiliares import NoInterno, NoFolha
+
+ASSINATURA = b'VCA\x01'
+
+NENHUM, TEXTO, FOLHA, LISTA, NO = 0, 1, 2, 3, 4
+
+_CABECALHO = struct.Struct('<4sI')
+
+
+def _json_de(valor):
+    """
+    Codifica valores escalares em JSON; nós e listas são devolvidos como estão, para
+    escrita posterior. Na pilha de para_json, toda str já é texto JSON.
+    """
+    if valor is None:
+        return 'null'
+    if valor.__class__ is str:
+        return encode_basestring(valor)
+    return valor
+
+
+def para_json(arvore):
+    """
+    Serializa a árvore em JSON estruturado.
+
+    Args:
+        arvore (NoInterno | NoFolha | list | str | None): Raiz da árvore.
+
+    Returns:
+        str: Documento JSON.
+    """
+    partes = []
+    escrever = partes.append
+    prefixos = {}   # classe do nó interno -> ((campo, '"campo":'), ...) em ordem inversa
+    pilha = [_json_de(arvore)]
+    empilhar = pilha.append
+    while pilha:
+        item = pilha.pop()
+        classe = item.__class__
+        if classe is str:
+            escrever(item)
+        elif classe is NoFolha:
+            escrever('{"op":%s,"valor":%s,"linha":%d}' % (
+                encode_basestring(item.op), encode_basestring(item.valor), item.linha))
+        elif classe is list:
+            escrever('[')
+            empilhar(']')
+            for i in range(len(item) - 1, -1, -1):
+                empilhar(_json_de(item[i]))
+                if i:
+                    empilhar(',')
+        elif isinstance(item, NoInterno):
+            campos = prefixos.get(classe)
+            if campos is None:
+                campos = prefixos[classe] = tuple(reversed([
+                    (campo, ("," if i else "") + encode_basestring(campo) + ":")
+                    for i, campo in enumerate(classe.campos)
+                ]))
+            escrever('{"op":%s,"filhos":{' % encode_basestring(item.op))
+            empilhar('}}')
+            for campo, prefixo in campos:
+                empilhar(_json_de(getattr(item, campo)))
+                empilhar(prefixo)
+        else:
+            raise TypeError(f"valor não serializável na árvore sintática: {item!r}")
+    return ''.join(partes)
+
+
+def _varint(buffer, valor):
+    """Acrescenta `valor` (inteiro não negativo) ao buffer como varint."""
+    while valor >= 0x80:
+        buffer.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    buffer.append(valor)
+
+
+def para_binario(arvore):
+    """
+    Serializa a árvore no formato binário compacto.
+
+    Args:
+        arvore (NoInterno | NoFolha | list | str | None): Raiz da árvore.
+
+    Returns:
+        bytes: Árvore serializada.
+    """
+    buffer = bytearray(_CABECALHO.size)
+    escrever = buffer.append
+    strings = {}    # string -> índice na tabela
+    formatos = {}   # (op, campos) -> índice do formato
+
+    def indice(texto):
+        i = strings.get(texto)
+        if i is None:
+            i = strings[texto] = len(strings)
+        return i
+
+    pilha = [arvore]
+    empilhar = pilha.append
+    while pilha:
+        item = pilha.pop()
+        if item is None:
+            escrever(NENHUM)
+        elif isinstance(item, str):
+            escrever(TEXTO)
+            _varint(buffer, indice(item))
+        elif isinstance(item, NoFolha):
+            escrever(FOLHA)
+            _varint(buffer, indice(item.op))
+            _varint(buffer, indice(item.valor))
+            _varint(buffer, item.linha)
+        elif isinstance(item, NoInterno):
+            campos = item.campos
+            chave = (item.op, campos)
+            formato = formatos.get(chave)
+            if formato is None:
+                formato = formatos[chave] = len(formatos)
+                indice(item.op)
+                for campo in campos:
+                    indice(campo)
+            _varint(buffer, NO + formato)
+            for campo in reversed(campos):
+                empilhar(getattr(item, campo))
+        elif isinstance(item, list):
+            escrever(LISTA)
+            _varint(buffer, len(item))
+            pilha.extend(reversed(item))
+        else:
+            raise TypeError(f"valor não serializável na árvore sintática: {item!r}")
+
+    _CABECALHO.pack_into(buffer, 0, ASSINATURA, len(buffer))
+    _varint(buffer, len(strings))
+    for texto in strings:
+        dados = texto.encode('utf-8')
+        _varint(buffer, len(dados))
+        buffer += dados
+    _varint(buffer, len(formatos))
+    for op, campos in formatos:
+        _varint(buffer, strings[op])
+        _varint(buffer, len(campos))
+        for campo in campos:
+            _varint(buffer, strings[campo])
+    return bytes(buffer)
+
+
+def de_binario(dados):
+    """
+    Reconstrói a árvore serializada por para_binario.
+
+    Args:
+        dados (bytes): Árvore serializada.
+
+    Returns:
+        NoInterno | NoFolha | list | str | None: Raiz da árvore.
+    Raises:
+        ValueError: Caso os dados não estejam no formato esperado.
+    """
+    dados = memoryview(dados)
+    if len(dados) < _CABECALHO.size:
+        raise ValueError("árvore serializada truncada")
+    assinatura, tabela = _CABECALHO.unpack_from(dados, 0)
+    if assinatura != ASSINATURA or tabela > len(dados):
+        raise ValueError("formato de árvore serializada desconhecido")
+
+    posicao = tabela
+
+    def ler():
+        nonlocal posicao
+        valor = deslocamento = 0
+        while True:
+            if posicao >= len(dados):
+                raise ValueError("árvore serializada truncada")
+            byte = dados[posicao]
+            posicao += 1
+            valor |= (byte & 0x7F) << deslocamento
+            if byte < 0x80:
+                return valor
+            deslocamento += 7
+
+    def lerString():
+        indice = ler()
+        if indice >= len(strings):
+            raise ValueError("índice de string inválido na árvore serializada")
+        return strings[indice]
+
+    strings = []
+    for _ in range(ler()):
+        tamanho = ler()
+        if posicao + tamanho > len(dados):
+            raise ValueError("árvore serializada truncada")
+        strings.append(bytes(dados[posicao:posicao + tamanho]).decode('utf-8'))
+        posicao += tamanho
+    formatos = []
+    for _ in range(ler()):
+        op = lerString()
+        campos = tuple(lerString() for _ in range(ler()))
+        formatos.append((op, NoInterno.classe(op, *campos)))
+
+    # Pilha de quadros [valores lidos, quantidade esperada, formato (None para listas)]
+    posicao = _CABECALHO.size
+    raiz = []
+    quadros = [[raiz, 1, None]]
+    while True:
+        if posicao >= tabela:
+            raise ValueError("árvore serializada truncada")
+        codigo = ler()
+        if codigo == NENHUM:
+            valor = None
+        elif codigo == TEXTO:
+            valor = lerString()
+        elif codigo == FOLHA:
+            valor = NoFolha(lerString(), lerString(), ler())
+        else:
+            if codigo == LISTA:
+                quadro = [[], ler(), None]
+            elif codigo - NO >= len(formatos):
+                raise ValueError("formato de nó inválido na árvore serializada")
+            else:
+                quadro = [[], len(formatos[codigo - NO][1].campos), formatos[codigo - NO]]
+            if quadro[1]:
+                quadros.append(quadro)
+                continue
+            valor = quadro[0] if quadro[2] is None else quadro[2][1](quadro[2][0])
+
+        # Fecha os quadros que ficaram completos com este valor
+        while True:
+            quadro = quadros[-1]
+            quadro[0].append(valor)
+            if len(quadro[0]) < quadro[1]:
+                break
+            quadros.pop()
+            if not quadros:
+                return raiz[0]
+            formato = quadro[2]
+            valor = quadro[0] if formato is None else formato[1](formato[0], *quadro[0])
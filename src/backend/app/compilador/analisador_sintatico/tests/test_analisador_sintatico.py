@@ -0,0 +1,173 @@
+import json
+import random
+
+import pytest
+
+from app.compilador.analisador_lexico.analisador_lexico import AnalisadorLexico
+from app.compilador.analisador_sintatico.analisador_sintatico import AnalisadorSintatico
+from app.compilador.analisador_sintatico.classes_auxiliares import SyntaxException, NoInterno, NoFolha
+from app.compilador.analisador_sintatico.serializador import para_json, para_binario, de_binario
+
+PROGRAMA = '''"exemplo"
+x : 1 + 2 * 3
+y : (x - 1) / 2 ^ 2
+SE ((x > 1) E NAO (y = 0)) {
+  ESCREVA("texto com \\"aspas\\" e acentuação")
+} SENAO {
+  y : 0
+}
+ENQUANTO (x < 10) {
+  REPITA (2) {
+    x : x + 1
+  }
+}
+MOVA(1, x, y)
+'''
+
+
+def analisar(codigo, **kwargs):
+    return AnalisadorSintatico(AnalisadorLexico(codigo).getTokenBuffer(), **kwargs).analisar()
+
+def despejar(arvore, intervalos=True):
+    """
+    Nós em pré-ordem, com op e intervalo de tokens (nós internos) ou valor e linha (folhas).
+    Sem `intervalos`, os intervalos de tokens, que não são serializados, ficam de fora.
+    """
+    saida = []
+    pilha = [arvore]
+    while pilha:
+        no = pilha.pop()
+        if isinstance(no, NoInterno):
+            saida.append((no.op, no.inicio, no.fim) if intervalos else no.op)
+            pilha.extend(reversed([getattr(no, campo) for campo in no.campos]))
+        elif isinstance(no, NoFolha):
+            saida.append((no.op, no.valor, no.linha))
+        elif isinstance(no, list):
+            saida.append(len(no))
+            pilha.extend(reversed(no))
+        else:
+            saida.append(no)
+    return saida
+
+
+def test_lista_de_declaracoes_plana():
+    arvore = analisar(PROGRAMA)
+    assert arvore.op == "program" and arvore.descricao.valor == "exemplo"
+    assert [declaracao.op for declaracao in arvore.statements.statements] == ["assign", "assign", "if", "while", "MOVA"]
+
+def test_erro_sintatico_com_linha():
+    with pytest.raises(SyntaxException) as erro:
+        analisar('"p"\nx : 1\nSE (x {\n}\n')
+    assert erro.value.linha == 3
+    assert '"RPAR"' in str(erro.value)
+
+def test_precedencia():
+    atribuicao = analisar('"p"\nx : 1 + 2 * 3 ^ 2\n').statements.statements[0]
+    soma = atribuicao.value
+    assert (soma.op, soma.operator, soma.esq.valor) == ("sum", "+", "1")
+    assert (soma.dir.op, soma.dir.esq.valor) == ("mult", "2")
+    assert soma.dir.dir.op == "power"
+
+def test_no_interno_com_slots():
+    no = NoInterno("sum", operator="+", esq=NoFolha("num", "1", 1), dir=NoFolha("num", "2", 1))
+    assert type(no) is NoInterno.classe("sum", "operator", "esq", "dir") and not hasattr(no, "__dict__")
+    assert no.campos == ("operator", "esq", "dir") and no.d["operator"] == "+"
+
+@pytest.mark.parametrize("campos", [("a", "a"), ("a", "b", "a"), ("class",), ("_a",), ("inicio",), ("1a",)])
+def test_no_interno_campos_invalidos(campos):
+    with pytest.raises(ValueError):
+        NoInterno.classe("op", *campos)
+
+def test_serializacao_binaria_ida_e_volta():
+    arvore = analisar(PROGRAMA)
+    dados = para_binario(arvore)
+    assert despejar(de_binario(dados), intervalos=False) == despejar(arvore, intervalos=False)
+    assert para_binario(de_binario(dados)) == dados
+
+def test_serializacao_json():
+    arvore = analisar(PROGRAMA)
+    documento = json.loads(para_json(arvore))
+    assert documento["op"] == "program"
+    assert list(documento["filhos"]) == ["descricao", "statements"]
+    atribuicao = documento["filhos"]["statements"]["filhos"]["statements"][0]
+    assert atribuicao["filhos"]["id"] == {"op": "id", "valor": "x", "linha": 2}
+    se = documento["filhos"]["statements"]["filhos"]["statements"][2]
+    texto = se["filhos"]["then_block"]["filhos"]["statements"]["filhos"]["statements"][0]["filhos"]["value"]
+    assert texto["valor"] == arvore.statements.statements[2].then_block.statements.statements[0].value.valor
+
+@pytest.mark.parametrize("dados", [
+    b"", b"VCA", b"XXXX\x08\x00\x00\x00", b"VCA\x01\xff\x00\x00\x00",
+    b"VCA\x01\x09\x00\x00\x00\x00\x01\x05ab",                 # string além do fim dos dados
+    b"VCA\x01\x0a\x00\x00\x00\x01\x05\x00\x00",                # índice de string fora da tabela
+    b"VCA\x01\x09\x00\x00\x00\x04\x00\x00",                    # formato de nó inexistente
+    b"VCA\x01\x0b\x00\x00\x00\x04\x00\x00\x02\x02op\x01a\x01\x00\x02\x01\x01",  # campo repetido
+])
+def test_binario_invalido(dados):
+    with pytest.raises(ValueError):
+        de_binario(dados)
+
+def test_binario_alterado_levanta_somente_value_error():
+    dados = para_binario(analisar(PROGRAMA))
+    aleatorio = random.Random(0)
+    for _ in range(2000):
+        alterado = bytearray(dados)
+        for _ in range(aleatorio.randint(1, 4)):
+            alterado[aleatorio.randrange(len(alterado))] = aleatorio.randrange(256)
+        try:
+            de_binario(bytes(alterado[:aleatorio.randint(len(alterado) // 2, len(alterado))]))
+        except ValueError:
+            pass
+
+def test_recuperacao_coleta_varios_erros():
+    analisador = AnalisadorSintatico(AnalisadorLexico('"p"\nx : 1 +\ny : 2\nSE (y {\n  z : 3\n}\nw : 4\n').getTokenBuffer(),
+                                     recuperar=True)
+    arvore = analisador.analisar()
+    assert [erro.linha for erro in analisador.erros] == [3, 4, 6]
+    # As declarações corretas depois dos erros continuam na árvore
+    assert [declaracao.id.valor for declaracao in arvore.statements.statements] == ["x", "z", "w"]
+
+@pytest.mark.parametrize("antigo, novo", [
+    ("x : x + 1", "x : x + 25"),                        # mesma quantidade de tokens
+    ("x : x + 1", "x : x + 1\n    ESCREVA(x)"),         # declaração e linha novas
+    ("REPITA (2)", "REPITA (2 * y)"),                   # cabeçalho de bloco
+    ("y : 0\n", ""),                                    # bloco vazio
+])
+def test_reanalise_incremental_igual_a_completa(antigo, novo):
+    codigo = PROGRAMA
+    posicao = codigo.index(antigo)
+    tokensAntigos = AnalisadorLexico(codigo).getTokenBuffer()
+    arvore = AnalisadorSintatico(tokensAntigos).analisar()
+
+    tokens = AnalisadorLexico.relex(tokensAntigos, posicao, len(antigo), novo)
+    editado = codigo[:posicao] + novo + codigo[posicao + len(antigo):]
+    assert list(map(tuple, ((t.tipo, t.valor, t.linha) for t in tokens))) == \
+        [(t.tipo, t.valor, t.linha) for t in AnalisadorLexico(editado).getTokenBuffer()]
+
+    # Tokens trocados: o maior prefixo e o maior sufixo comuns ficam de fora
+    chaves = lambda buffer: [(t.tipo, t.valor) for t in buffer]
+    velhos, novos = chaves(tokensAntigos), chaves(tokens)
+    inicio = 0
+    while velhos[inicio] == novos[inicio]:
+        inicio += 1
+    sufixo = 0
+    while sufixo < min(len(velhos), len(novos)) - inicio and velhos[-1 - sufixo] == novos[-1 - sufixo]:
+        sufixo += 1
+    removidos, inseridos = len(velhos) - inicio - sufixo, len(novos) - inicio - sufixo
+
+    nova = AnalisadorSintatico(tokens).reanalisar(arvore, tokensAntigos, inicio, removidos, inseridos)
+    assert despejar(nova) == despejar(analisar(editado))
+
+def test_reanalise_com_erro_levanta_o_mesmo_erro():
+    codigo = '"p"\nx : 1\ny : 2\n'
+    tokensAntigos = AnalisadorLexico(codigo).getTokenBuffer()
+    arvore = AnalisadorSintatico(tokensAntigos).analisar()
+    tokens = AnalisadorLexico.relex(tokensAntigos, codigo.index("2"), 1, "(2")
+    with pytest.raises(SyntaxException) as erro:
+        AnalisadorSintatico(tokens).reanalisar(arvore, tokensAntigos, 7, 1, 2)
+    with pytest.raises(SyntaxException) as completo:
+        analisar('"p"\nx : 1\ny : (2\n')
+    assert str(erro.value) == str(completo.value)
+
+def test_tokens_de_iterador():
+    lexico = AnalisadorLexico(PROGRAMA)
+    assert despejar(AnalisadorSintatico(lexico.iter_tokens()).analisar()) == despejar(analisar(PROGRAMA))
@@ -0,0 +1,129 @@
+import io
+import sys
+
+from app.compilador.analisador_sintatico.classes_auxiliares import NoInterno, NoFolha, imprimir
+from app.compilador.analisador_sintatico.visitante import Visitante, PULAR, filhos, pre_ordem, pos_ordem
+
+
+def folha(valor):
+    return NoFolha("id", valor, 1)
+
+def nome(no):
+    return no.op if isinstance(no, NoInterno) else no.valor
+
+def exemplo():
+    return NoInterno("sum", operator="+",
+                     esq=NoInterno("mult", operator="*", esq=folha("a"), dir=folha("b")),
+                     dir=NoInterno("statementList", statements=[folha("c"), NoInterno("neg", operando=folha("d")), "x", None]))
+
+def profunda():
+    """Cadeia de nós "neg" mais profunda que o limite de recursão do Python."""
+    arvore = folha("x")
+    for _ in range(sys.getrecursionlimit() + 100):
+        arvore = NoInterno("neg", operando=arvore)
+    return arvore
+
+def referencia(valor, nivel=0):
+    """Formato de NoInterno.toString, na implementação recursiva original (sem listas)."""
+    if isinstance(valor, str):
+        return f'"{valor}"'
+    if not isinstance(valor, NoInterno):
+        return repr(valor)
+    s = f'NoInterno(op="{valor.op}", \n'
+    for i, k in enumerate(valor.campos):
+        s += "    " * nivel + f"{k}=\n{'    ' * (nivel + 1)}{referencia(getattr(valor, k), nivel + 1)}"
+        s += ",\n" if i < len(valor.campos) - 1 else "\n"
+    return s + "    " * nivel + ")"
+
+
+class Registro(Visitante):
+    def __init__(self):
+        self.log = []
+
+    def entrar_padrao(self, no):
+        self.log.append("entrar " + nome(no))
+
+    def entrar_mult(self, no):
+        self.log.append("entrar_mult")
+        return PULAR
+
+    def sair_mult(self, no):
+        self.log.append("sair_mult")
+
+    def entrar_neg(self, no):
+        self.log.append("entrar_neg")
+
+    def sair_neg(self, no):
+        self.log.append("sair_neg")
+
+
+class Contador(Visitante):
+    def __init__(self):
+        self.n = 0
+
+    def entrar_neg(self, no):
+        self.n += 1
+
+
+def test_filhos():
+    arvore = exemplo()
+    assert [nome(no) for no in filhos(arvore)] == ["mult", "statementList"]
+    assert [nome(no) for no in filhos(arvore.dir)] == ["c", "neg"]
+    assert filhos(folha("a")) == []
+
+def test_pre_ordem_e_pos_ordem():
+    arvore = exemplo()
+    assert [nome(no) for no in pre_ordem(arvore)] == ["sum", "mult", "a", "b", "statementList", "c", "neg", "d"]
+    assert [nome(no) for no in pos_ordem(arvore)] == ["a", "b", "mult", "c", "d", "neg", "statementList", "sum"]
+    # Listas são percorridas em ordem e os valores que não são nós, ignorados
+    assert [nome(no) for no in pre_ordem([arvore.esq, "x", None, folha("e")])] == ["mult", "a", "b", "e"]
+    assert [nome(no) for no in pos_ordem([arvore.esq, "x", None, folha("e")])] == ["a", "b", "mult", "e"]
+    assert list(pre_ordem(None)) == list(pos_ordem("x")) == []
+
+def test_despacho_por_op_e_pular():
+    visitante = Registro()
+    visitante.visitar(exemplo())
+    assert visitante.log == ["entrar sum", "entrar_mult", "entrar statementList", "entrar c",
+                             "entrar_neg", "entrar d", "sair_neg"]
+    # Cada subclasse tem as suas próprias tabelas de despacho
+    assert set(Registro._entradas) == {"mult", "neg"} and set(Registro._saidas) == {"mult", "neg"}
+    assert set(Contador._entradas) == {"neg"} and Contador._saidas == {} and Visitante._entradas == {}
+
+def test_imprimir_igual_a_referencia():
+    arvore = NoInterno("sum", operator="+", esq=NoInterno("mult", operator="*", esq=folha("a"), dir=None), dir=folha("b"))
+    saida = io.StringIO()
+    imprimir(arvore, saida)
+    assert saida.getvalue() == arvore.toString() == referencia(arvore)
+    assert arvore.toString(2) == referencia(arvore, 2)
+
+def test_imprimir_listas():
+    arvore = NoInterno("statementList", statements=[NoInterno("neg", operando=folha("a")), "x"])
+    assert arvore.toString() == (
+        'NoInterno(op="statementList", \n'
+        'statements=\n'
+        '    [\n'
+        '        NoInterno(op="neg", \n'
+        '        operando=\n'
+        '            NoFolha(op="id", valor="a", linha=1)\n'
+        '        ),\n'
+        "        'x'\n"
+        '    ]\n'
+        ')')
+
+def test_arvore_mais_profunda_que_o_limite_de_recursao():
+    arvore = profunda()
+    profundidade = sys.getrecursionlimit() + 100
+    assert sum(1 for _ in pre_ordem(arvore)) == sum(1 for _ in pos_ordem(arvore)) == profundidade + 1
+    assert nome(next(iter(pos_ordem(arvore)))) == "x"
+    contador = Contador()
+    contador.visitar(arvore)
+    assert contador.n == profundidade
+    saida = io.StringIO()
+    imprimir(arvore, saida)
+    texto = saida.getvalue()
+    assert texto == arvore.toString()
+    linhas = texto.split("\n")
+    assert len(linhas) == 3 * profundidade + 1
+    assert linhas[2 * profundidade] == "    " * profundidade + repr(folha("x"))
+    assert linhas[-1] == ")" and linhas[-2] == "    )"
+    assert repr(arvore).count('NoInterno(op="neg"') == profundidade
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+Percurso da árvore sintática (NoInterno/NoFolha) sem recursão.
+
+Os percursos usam uma pilha explícita, de modo que árvores profundas (expressões ou
+blocos muito aninhados) não esbarram no limite de recursão do Python. Os valores que
+não são nós (str, None) são ignorados e as listas (statements=[...]) são percorridas
+em ordem, como se os seus itens fossem filhos do nó.
+
+Funções:
+    filhos: Lista os nós filhos de um nó, na ordem dos campos.
+    pre_ordem: Gera os nós da árvore em pré-ordem.
+    pos_ordem: Gera os nós da árvore em pós-ordem.
+
+Classes:
+    Visitante: Classe base de passagens sobre a árvore, com despacho por op.
+
+Para imprimir a árvore, veja `imprimir` e `representar` em classes_auxiliares.
+"""
+
+from app.compilador.analisador_sintatico.classes_auxiliares import NoInterno, NoFolha
+
+# Valor que entrar_<op> retorna para que os filhos do nó não sejam visitados
+PULAR = object()
+
+
+def filhos(no):
+    """
+    Lista os nós filhos de `no`, na ordem dos campos.
+
+    Args:
+        no (NoInterno | NoFolha): Nó da árvore.
+
+    Returns:
+        list: Os NoInterno/NoFolha dos campos de `no`, incluindo os itens das listas
+        (vazia para um NoFolha).
+    """
+    resultado = []
+    if isinstance(no, NoInterno):
+        for campo in no.campos:
+            valor = getattr(no, campo)
+            if isinstance(valor, (NoInterno, NoFolha)):
+                resultado.append(valor)
+            elif isinstance(valor, list):
+                resultado.extend(v for v in valor if isinstance(v, (NoInterno, NoFolha)))
+    return resultado
+
+
+def _raizes(arvore):
+    """Nós por onde um percurso de `arvore` começa, em ordem inversa (topo da pilha no fim)."""
+    if isinstance(arvore, (NoInterno, NoFolha)):
+        return [arvore]
+    if isinstance(arvore, list):
+        return [v for v in reversed(arvore) if isinstance(v, (NoInterno, NoFolha))]
+    return []
+
+
+def pre_ordem(arvore):
+    """
+    Gera os nós da árvore em pré-ordem (cada nó antes dos seus filhos).
+
+    Args:
+        arvore (NoInterno | NoFolha | list | None): Raiz da árvore.
+    """
+    pilha = _raizes(arvore)
+    while pilha:
+        no = pilha.pop()
+        yield no
+        if isinstance(no, NoInterno):
+            pilha.extend(reversed(filhos(no)))
+
+
+def pos_ordem(arvore):
+    """
+    Gera os nós da árvore em pós-ordem (cada nó depois dos seus filhos).
+
+    Args:
+        arvore (NoInterno | NoFolha | list | None): Raiz da árvore.
+    """
+    pilha = [(no, False) for no in _raizes(arvore)]
+    while pilha:
+        no, expandido = pilha.pop()
+        if expandido or isinstance(no, NoFolha):
+            yield no
+            continue
+        pilha.append((no, True))
+        pilha.extend((filho, False) for filho in reversed(filhos(no)))
+
+
+class Visitante:
+    """
+    Classe base de uma passagem sobre a árvore sintática.
+
+    As subclasses definem métodos entrar_<op>(no), chamados antes dos filhos do nó, e
+    sair_<op>(no), chamados depois deles, para os ops que lhes interessam (por exemplo,
+    entrar_assign, sair_sum, entrar_num). Os nós sem método próprio vão para
+    entrar_padrao/sair_padrao, que não fazem nada. Se entrar_<op> retornar PULAR, os
+    filhos do nó e o seu sair_<op> não são visitados.
+
+    As tabelas de despacho (op -> método) são montadas uma única vez, na criação de cada
+    subclasse; o percurso é iterativo (visitar).
+    """
+
+    _entradas = {}
+    _saidas = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._entradas = {}
+        cls._saidas = {}
+        for nome in dir(cls):
+            for prefixo, tabela in (('entrar_', cls._entradas), ('sair_', cls._saidas)):
+                if nome.startswith(prefixo) and nome != prefixo + 'padrao':
+                    tabela[nome[len(prefixo):]] = getattr(cls, nome)
+
+    def entrar_padrao(self, no):
+        pass
+
+    def sair_padrao(self, no):
+        pass
+
+    def visitar(self, arvore):
+        """
+        Percorre a árvore (NoInterno, NoFolha ou lista de nós) chamando os métodos de
+        entrada e saída de cada nó.
+
+        Args:
+            arvore (NoInterno | NoFolha | list | None): Raiz da árvore.
+        """
+        entradas, saidas = self._entradas, self._saidas
+        entrarPadrao, sairPadrao = type(self).entrar_padrao, type(self).sair_padrao
+        pilha = [(no, False) for no in _raizes(arvore)]
+        while pilha:
+            no, saindo = pilha.pop()
+            if saindo:
+                saidas.get(no.op, sairPadrao)(self, no)
+                continue
+            if entradas.get(no.op, entrarPadrao)(self, no) is PULAR:
+                continue
+            pilha.append((no, True))
+            if isinstance(no, NoInterno):
+                pilha.extend((filho, False) for filho in reversed(filhos(no)))
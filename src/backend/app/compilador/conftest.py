@@ -0,0 +1,29 @@
+import pytest
+
+from app.compilador.analisador_lexico.analisador_lexico import AnalisadorLexico
+from app.compilador.analisador_sintatico.analisador_sintatico import AnalisadorSintatico
+from app.compilador.analisador_semantico.analisador_semantico import AnalisadorSemantico
+from app.compilador.maquina_virtual.gerador_bytecode import GeradorBytecode
+
+
+def analisarCodigo(codigo, semantico=True):
+    """
+    Árvore sintática do código-fonte, anotada pelo analisador semântico (a menos que
+    `semantico` seja falso).
+    """
+    arvore = AnalisadorSintatico(AnalisadorLexico(codigo).getTokenBuffer()).analisar()
+    if semantico:
+        AnalisadorSemantico(arvore).analisar()
+    return arvore
+
+
+@pytest.fixture
+def analisar():
+    """Análise léxica, sintática e semântica de um código-fonte: analisar(codigo, semantico=True)."""
+    return analisarCodigo
+
+
+@pytest.fixture
+def compilar():
+    """ProgramaCompilado (bytecode) de um código-fonte: compilar(codigo)."""
+    return lambda codigo: GeradorBytecode(analisarCodigo(codigo)).gerar()
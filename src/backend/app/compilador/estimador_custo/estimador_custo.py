@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+"""
+Estimativa estática do custo de um programa, sem executá-lo.
+
+Os passos são contados como no Orcamento da MaquinaVirtual (uma atribuição, um comando,
+um teste de condição de SE ou ENQUANTO ou uma iteração de REPITA), de modo que o limite
+superior calculado é também o menor orçamento de passos que nunca interrompe o programa.
+O tempo de espera é a soma dos ESPERE(t) (em milissegundos); ESPERE_SENTAR e
+ESPERE_LEVANTAR dependem do paciente e são contados à parte.
+
+Os limites valem quando as quantidades são decidíveis:
+    - REPITA com contagem constante (ou calculada de variáveis atribuídas uma única vez
+      no programa, com um valor constante);
+    - ENQUANTO com condição constante falsa, ou cuja condição (ou uma das partes de uma
+      conjunção E) compara um contador com uma constante (i < 10, i >= 0, i <> 10...),
+      quando o contador recebe um valor constante imediatamente antes do laço e é
+      alterado no bloco uma única vez, por uma atribuição i : i + k ou i : i - k
+      (k constante) fora de blocos internos;
+    - SE: o custo do bloco mais caro.
+Os laços e esperas que não podem ser limitados são listados em `alertas`, e o limite
+correspondente fica indefinido (None).
+
+Classes:
+    Estimativa: Resultado da estimativa.
+    EstimadorCusto: Calcula a Estimativa de uma árvore sintática.
+"""
+
+import math
+
+from app.compilador.analisador_sintatico.classes_auxiliares import NoFolha
+from app.compilador.analisador_sintatico.visitante import pre_ordem, pos_ordem
+from app.compilador.maquina_virtual.gerador_bytecode import COMANDOS_POR_OP
+from app.compilador.otimizador.otimizador import OPERACOES, valorConstante, linhaDe
+
+# Declarações além dos comandos
+DECLARACOES = frozenset(["statementList", "program", "block", "assign", "if", "while", "repeat"])
+
+
+def _vezes(quantidade, custo):
+    """quantidade * custo, com 0 * infinito = 0 (um bloco vazio repetido sem limite)."""
+    return 0 if custo == 0 else quantidade * custo
+
+
+def _finito(valor):
+    return None if valor == math.inf else valor
+
+
+class Estimativa:
+    """
+    Resultado da estimativa de custo de um programa.
+
+    Atributos:
+        passos (int | None): Limite superior de passos executados (None: sem limite).
+        espera (int | float | None): Limite superior da soma dos ESPERE, em milissegundos.
+        esperasPaciente (int | None): Limite superior de ESPERE_SENTAR/ESPERE_LEVANTAR executados.
+        alertas (list[tuple[int, str]]): (linha, mensagem) de cada laço ou espera sem limite.
+    """
+
+    def __init__(self, passos, espera, esperasPaciente, alertas):
+        self.passos = _finito(passos)
+        self.espera = _finito(espera)
+        self.esperasPaciente = _finito(esperasPaciente)
+        self.alertas = alertas
+
+    @property
+    def limitado(self):
+        """Indica se o programa tem limite de passos e de tempo de espera."""
+        return self.passos is not None and self.espera is not None
+
+    def __repr__(self):
+        return (f"Estimativa(passos={self.passos}, espera={self.espera}, "
+                f"esperasPaciente={self.esperasPaciente}, alertas={self.alertas})")
+
+
+class EstimadorCusto:
+    """
+    Calcula a Estimativa de uma árvore sintática (anotada ou não pelo analisador semântico).
+
+    A árvore é percorrida em pós-ordem: o custo de cada declaração, (passos, espera,
+    esperas do paciente), e as variáveis que ela altera são calculados a partir dos das
+    declarações internas, já calculados.
+    """
+
+    def __init__(self, arvore):
+        """
+        Inicializa os atributos da classe.
+        """
+        self.arvore = arvore        # atributo arvore: raiz da árvore sintática
+        self.custos = {}            # atributo custos: id da declaração -> (passos, espera, esperas do paciente)
+        self.escritas = {}          # atributo escritas: id da declaração -> chaves das variáveis alteradas nela
+        self.constantes = {}        # atributo constantes: chave da variável atribuída uma única vez -> valor constante
+        self.anteriores = {}        # atributo anteriores: id da declaração -> (lista de declarações, posição)
+        self.alertas = []           # atributo alertas: (linha, mensagem) dos laços e esperas sem limite
+
+    @staticmethod
+    def chave(folha):
+        return folha.simbolo if folha.simbolo is not None else folha.valor
+
+    def estimar(self):
+        """
+        Calcula a estimativa de custo do programa.
+
+        Returns:
+            Estimativa: O resultado.
+        """
+        self.encontrarConstantes()
+        for no in pos_ordem(self.arvore):
+            if no.__class__ is not NoFolha and (no.op in DECLARACOES or no.op in COMANDOS_POR_OP):
+                self.custear(no)
+        passos, espera, paciente = self.custos[id(self.arvore)]
+        self.alertas.sort(key=lambda alerta: alerta[0] or 0)
+        return Estimativa(passos, espera, paciente, self.alertas)
+
+    def encontrarConstantes(self):
+        """
+        Encontra as variáveis atribuídas uma única vez no programa, com valor constante,
+        e registra a posição de cada declaração na sua lista.
+        """
+        atribuicoes = {}
+        for no in pre_ordem(self.arvore):
+            if no.op == "statementList":
+                for posicao, declaracao in enumerate(no.statements):
+                    self.anteriores[id(declaracao)] = (no.statements, posicao)
+            elif no.op == "assign":
+                atribuicoes.setdefault(self.chave(no.id), []).append(no)
+        # Em ordem de programa: uma variável só é lida depois da sua atribuição
+        for no in pre_ordem(self.arvore):
+            if no.op == "assign" and len(atribuicoes[self.chave(no.id)]) == 1:
+                valor = self.valor(no.value)
+                if valor is not None:
+                    self.constantes[self.chave(no.id)] = valor
+
+    def valor(self, expressao):
+        """
+        Valor constante (int ou bool) da expressão, ou None se ele não for conhecido.
+        """
+        valores = []
+        for no in pos_ordem(expressao):
+            if no.__class__ is NoFolha:
+                valores.append(self.constantes.get(self.chave(no)) if no.op == "id" else valorConstante(no))
+            elif no.op == "not":
+                valor = valores.pop()
+                valores.append(not valor if valor.__class__ is bool else None)
+            else:
+                b, a = valores.pop(), valores.pop()
+                verificar, operar = OPERACOES.get(no.operator, (None, None))
+                valores.append(operar(a, b) if a is not None and b is not None and verificar(a, b) else None)
+        return valores[0] if valores else None
+
+    def alertar(self, no, mensagem):
+        self.alertas.append((linhaDe(no), mensagem))
+
+    def custear(self, no):
+        """
+        Calcula o custo da declaração `no` e as variáveis alteradas nela.
+        """
+        op = no.op
+        custos, escritas = self.custos, self.escritas
+        alteradas = set()
+        if op == "statementList":
+            passos = espera = paciente = 0
+            for declaracao in no.statements:
+                p, e, s = custos[id(declaracao)]
+                passos, espera, paciente = passos + p, espera + e, paciente + s
+                alteradas |= escritas[id(declaracao)]
+            custo = (passos, espera, paciente)
+        elif op in ("program", "block"):
+            custo = custos[id(no.statements)]
+            alteradas = escritas[id(no.statements)]
+        elif op == "assign":
+            custo = (1, 0, 0)
+            alteradas = {self.chave(no.id)}
+        elif op == "if":
+            entao = custos[id(no.then_block)]
+            senao = custos[id(no.else_block)] if no.else_block is not None else (0, 0, 0)
+            custo = (1 + max(entao[0], senao[0]), max(entao[1], senao[1]), max(entao[2], senao[2]))
+            alteradas = escritas[id(no.then_block)] | (escritas[id(no.else_block)] if no.else_block is not None else set())
+        elif op == "repeat":
+            vezes = self.valor(no.times)
+            if vezes.__class__ is not int:
+                self.alertar(no, "REPITA sem contagem constante: a quantidade de repetições não pode ser limitada")
+                vezes = math.inf
+            vezes = max(vezes, 0)
+            passos, espera, paciente = custos[id(no.block)]
+            custo = (_vezes(vezes, passos + 1), _vezes(vezes, espera), _vezes(vezes, paciente))
+            alteradas = escritas[id(no.block)]
+        elif op == "while":
+            vezes = self.iteracoes(no)
+            passos, espera, paciente = custos[id(no.block)]
+            custo = (1 + _vezes(vezes, passos + 1), _vezes(vezes, espera), _vezes(vezes, paciente))
+            alteradas = escritas[id(no.block)]
+        elif op == "ESPERE":
+            tempo = self.valor(no.t)
+            if tempo.__class__ is not int:
+                self.alertar(no, "ESPERE sem tempo constante: o tempo de espera não pode ser limitado")
+                tempo = math.inf
+            custo = (1, max(tempo, 0), 0)
+        elif op in ("ESPERE_SENTAR", "ESPERE_LEVANTAR"):
+            custo = (1, 0, 1)
+        else:
+            custo = (1, 0, 0)
+        custos[id(no)] = custo
+        escritas[id(no)] = alteradas
+
+    def iteracoes(self, no):
+        """
+        Limite superior de iterações de um ENQUANTO (infinito, com um alerta, se não houver).
+        """
+        condicao = self.valor(no.condition)
+        if condicao is False:
+            return 0
+        if condicao is True:
+            self.alertar(no, "ENQUANTO com condição sempre verdadeira")
+            return math.inf
+        # Partes da conjunção: o laço termina quando qualquer uma delas for falsa
+        limite = math.inf
+        partes = [no.condition]
+        while partes:
+            parte = partes.pop()
+            if parte.__class__ is NoFolha:
+                continue
+            if parte.op == "mult" and parte.operator == "E":
+                partes += [parte.esq, parte.dir]
+            elif parte.op == "expression":
+                limite = min(limite, self.limiteContador(no, parte))
+        if limite == math.inf:
+            self.alertar(no, "ENQUANTO sem limite de iterações conhecido")
+        return limite
+
+    # operador da comparação com o contador à direita -> operador equivalente com o contador à esquerda
+    ESPELHADOS = {"<": ">", ">": "<", "<=": ">=", ">=": "<=", "<>": "<>"}
+
+    def limiteContador(self, laco, comparacao):
+        """
+        Limite de iterações do laço `laco` dado pela comparação (contador OP constante).
+        """
+        operador = comparacao.operator
+        if operador not in self.ESPELHADOS:
+            return math.inf
+        contador, limite = comparacao.esq, self.valor(comparacao.dir)
+        if contador.__class__ is not NoFolha or contador.op != "id":
+            contador, limite = comparacao.dir, self.valor(comparacao.esq)
+            operador = self.ESPELHADOS[operador]
+        if contador.__class__ is not NoFolha or contador.op != "id" or limite.__class__ is not int:
+            return math.inf
+        chave = self.chave(contador)
+        passo = self.incremento(laco.block.statements.statements, chave)
+        inicio = self.valorInicial(laco, chave)
+        if passo is None or inicio is None:
+            return math.inf
+
+        distancia = limite - inicio
+        if (operador in ("<", "<=") and passo > 0) or (operador in (">", ">=") and passo < 0):
+            return max(-(-distancia // passo) if operador in ("<", ">") else distancia // passo + 1, 0)
+        if operador == "<>":
+            if distancia % passo == 0 and distancia // passo >= 0:
+                return distancia // passo
+            return math.inf
+        # O contador se afasta do limite: termina apenas se a condição já for falsa
+        verdadeira = {"<": inicio < limite, "<=": inicio <= limite, ">": inicio > limite, ">=": inicio >= limite}
+        return math.inf if verdadeira[operador] else 0
+
+    def incremento(self, declaracoes, chave):
+        """
+        Incremento constante (diferente de 0) do contador `chave` em cada iteração, se ele
+        é alterado uma única vez no bloco, por uma atribuição i : i + k ou i : i - k fora
+        de blocos internos (None, caso contrário).
+        """
+        passo = None
+        for declaracao in declaracoes:
+            if chave not in self.escritas[id(declaracao)]:
+                continue
+            if passo is not None or declaracao.op != "assign" or declaracao.value.op != "sum":
+                return None
+            valor = declaracao.value
+            esq, dir = valor.esq, valor.dir
+            if esq.__class__ is NoFolha and esq.op == "id" and self.chave(esq) == chave:
+                k = self.valor(dir)
+            elif valor.operator == "+" and dir.__class__ is NoFolha and dir.op == "id" and self.chave(dir) == chave:
+                k = self.valor(esq)
+            else:
+                return None
+            if k.__class__ is not int or k == 0:
+                return None
+            passo = k if valor.operator == "+" else -k
+        return passo
+
+    def valorInicial(self, laco, chave):
+        """
+        Valor constante do contador `chave` ao entrar no laço: o da última atribuição a ele
+        antes do laço, na mesma lista de declarações (None se não for conhecido).
+        """
+        if id(laco) not in self.anteriores:
+            return None
+        declaracoes, posicao = self.anteriores[id(laco)]
+        for declaracao in reversed(declaracoes[:posicao]):
+            if declaracao.op == "assign" and self.chave(declaracao.id) == chave:
+                valor = self.valor(declaracao.value)
+                return valor if valor.__class__ is int else None
+            if chave in self.escritas[id(declaracao)]:
+                return None
+        return None
+
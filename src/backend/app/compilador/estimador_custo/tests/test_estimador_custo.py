@@ -0,0 +1,50 @@
+import pytest
+
+from app.compilador.estimador_custo.estimador_custo import EstimadorCusto
+from app.compilador.maquina_virtual.gerador_bytecode import GeradorBytecode
+from app.compilador.maquina_virtual.hospedeiro import HospedeiroRegistro
+from app.compilador.maquina_virtual.maquina_virtual import MaquinaVirtual
+
+
+def passosExecutados(arvore):
+    maquina = MaquinaVirtual(GeradorBytecode(arvore).gerar(), HospedeiroRegistro())
+    maquina.executar()
+    return maquina.passos
+
+
+@pytest.mark.parametrize("codigo", [
+    '"p"\nn : 4\nREPITA (n * 2) {\n  ESCREVA(n)\n}\n',
+    '"p"\ni : 0\nENQUANTO (i < 10) {\n  REPITA (3) {\n    x : i\n  }\n  i : i + 1\n}\n',
+    '"p"\ni : 20\nENQUANTO ((i >= 0) E (i <> 7)) {\n  i : i - 3\n}\n',
+    '"p"\nENQUANTO (falso) {\n  ESCREVA(1)\n}\nREPITA (0 - 2) {\n  ESCREVA(1)\n}\n',
+])
+def test_lacos_contados_exatos(analisar, codigo):
+    arvore = analisar(codigo)
+    estimativa = EstimadorCusto(arvore).estimar()
+    assert estimativa.limitado and estimativa.alertas == []
+    assert estimativa.passos == passosExecutados(arvore)
+
+def test_se_conta_o_bloco_mais_caro(analisar):
+    arvore = analisar('"p"\nx : 1\nSE (x > 0) {\n  ESCREVA(x)\n} SENAO {\n  REPITA (5) {\n    ESCREVA(x)\n  }\n}\n')
+    estimativa = EstimadorCusto(arvore).estimar()
+    assert estimativa.passos == 1 + 1 + 5 * 2
+    assert estimativa.passos >= passosExecutados(arvore)
+
+def test_esperas(analisar):
+    estimativa = EstimadorCusto(analisar('"p"\nREPITA (3) {\n  ESPERE(250)\n  ESPERE_SENTAR()\n}\n')).estimar()
+    assert (estimativa.passos, estimativa.espera, estimativa.esperasPaciente) == (9, 750, 3)
+
+@pytest.mark.parametrize("codigo, linha", [
+    ('"p"\nx : 1\nENQUANTO (x > 0) {\n  x : x * 2\n}\n', 3),
+    ('"p"\nENQUANTO (verdadeiro) {\n  ESCREVA(1)\n}\n', 2),
+    ('"p"\nx : 1\nx : x + 1\nREPITA (x) {\n  ESCREVA(x)\n}\n', 4),
+])
+def test_lacos_sem_limite(analisar, codigo, linha):
+    estimativa = EstimadorCusto(analisar(codigo)).estimar()
+    assert not estimativa.limitado and estimativa.passos is None
+    assert [alerta[0] for alerta in estimativa.alertas] == [linha]
+
+def test_espera_sem_limite(analisar):
+    estimativa = EstimadorCusto(analisar('"p"\nt : 1\nt : t * 10\nESPERE(t)\n')).estimar()
+    assert estimativa.passos == 3 and estimativa.espera is None
+    assert not estimativa.limitado
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+"""
+Geração de código JavaScript a partir da árvore sintática, para executar os programas
+no navegador.
+
+O resultado é um módulo ES autocontido: a exportação padrão é uma função assíncrona
+executar(hospedeiro), `variaveis` lista os nomes das variáveis do programa e `descricao`
+é a sua descrição. Como na MaquinaVirtual (veja maquina_virtual/hospedeiro.py), cada
+comando FUNC_IN/FUNC_OUT chama o método de mesmo nome do hospedeiro
+(hospedeiro.MOVA(ref, dx, dy)) ou, sem ele, hospedeiro.comando(nome, argumentos); o
+resultado de cada chamada é aguardado (await), de modo que ESPERE, ESPERE_SENTAR etc.
+podem retornar Promises sem bloquear a página.
+
+executar() retorna os valores finais das variáveis, por nome; os erros de execução são
+lançados como ErroExecucao (também exportada), com a linha do programa original.
+
+O código gerado supõe uma árvore aceita pelo analisador semântico: os tipos dos
+operandos não são verificados durante a execução e os números são os do JavaScript
+(ponto flutuante de 64 bits, sem os inteiros de precisão arbitrária do Python).
+
+Classes:
+    GeradorJavaScript: Gera o código-fonte JavaScript de uma árvore.
+"""
+
+import json
+
+from app.compilador.analisador_sintatico.classes_auxiliares import NoFolha
+from app.compilador.analisador_sintatico.visitante import pos_ordem
+from app.compilador.maquina_virtual.gerador_bytecode import COMANDOS_POR_OP
+
+# Operador -> modelo da expressão JavaScript
+OPERADORES = {
+    "+": "({} + {})", "-": "({} - {})", "*": "({} * {})",
+    "/": "_dividir({}, {})", "MOD": "_resto({}, {})", "^": "_potencia({}, {})", "**": "_potencia({}, {})",
+    "=": "({} === {})", "<>": "({} !== {})", "<": "({} < {})", ">": "({} > {})", "<=": "({} <= {})", ">=": "({} >= {})",
+    "E": "({} && {})", "OU": "({} || {})",
+}
+
+# Início do módulo: ErroExecucao e as operações equivalentes às de maquina_virtual/classes_auxiliares.py
+AMBIENTE = """\
+// Gerado pelo compilador. Não edite este arquivo.
+
+export const descricao = %s;
+
+export class ErroExecucao extends Error {
+  constructor(mensagem, linha = null) {
+    super(linha === null ? mensagem : `${mensagem}, na linha ${linha}`);
+    this.name = "ErroExecucao";
+    this.linha = linha;
+  }
+}
+
+function _dividir(a, b) {
+  if (b === 0) throw new ErroExecucao("Divisão por zero");
+  return a / b;
+}
+
+function _resto(a, b) {
+  if (b === 0) throw new ErroExecucao("Divisão por zero no MOD");
+  const r = a %% b;
+  return r !== 0 && (r < 0) !== (b < 0) ? r + b : r;
+}
+
+function _potencia(a, b) {
+  if (a === 0 && b < 0) throw new ErroExecucao("Divisão por zero");
+  const r = a ** b;
+  if (Number.isNaN(r)) throw new ErroExecucao(`Potência sem resultado real: ${a} ^ ${b}`);
+  return r;
+}
+
+function _repeticoes(n) {
+  return Math.max(Math.trunc(n), 0);
+}
+
+function _metodo(hospedeiro, nome) {
+  const metodo = hospedeiro[nome];
+  if (typeof metodo === "function") return metodo.bind(hospedeiro);
+  return (...argumentos) => hospedeiro.comando(nome, argumentos);
+}
+
+"""
+
+RECUO = "  "
+
+
+class GeradorJavaScript:
+    """
+    Gera o código-fonte JavaScript (módulo ES) de uma árvore sintática, com uma pilha
+    explícita (sem recursão). Antes de cada declaração, o código gerado guarda a sua
+    linha em _linha, usada nas mensagens de erro de execução.
+    """
+
+    def __init__(self, arvore):
+        """
+        Inicializa os atributos da classe.
+        """
+        self.arvore = arvore    # atributo arvore: raiz da árvore sintática
+        self.codigo = []        # atributo codigo: linhas do código-fonte gerado
+        self.indices = {}       # atributo indices: chave da variável (Simbolo ou nome) -> índice
+        self.variaveis = []     # atributo variaveis: nome de cada variável, pelo índice
+        self.comandos = {}      # atributo comandos: nomes dos comandos usados (na ordem de uso)
+        self.linha = 0          # atributo linha: linha original da última folha traduzida
+
+    def gerar(self):
+        """
+        Gera o código-fonte do módulo.
+
+        Returns:
+            str: Código-fonte do módulo ES.
+        Raises:
+            ValueError: Caso a árvore contenha um nó sem tradução.
+        """
+        # Tarefas: (nó, nível de recuo) ou (texto da linha, nível)
+        tarefas = [(self.arvore, 2)]
+        while tarefas:
+            item, nivel = tarefas.pop()
+            if isinstance(item, str):
+                self.escrever(item, nivel)
+            else:
+                self.declaracao(item, nivel, tarefas)
+        corpo, self.codigo = self.codigo, []
+
+        descricao = getattr(self.arvore, "descricao", None)
+        # Como literal JSON (ASCII), a descrição não pode terminar a string nem a linha
+        self.codigo.append(AMBIENTE % json.dumps(descricao.valor if isinstance(descricao, NoFolha) else ""))
+        self.escrever(f"export const variaveis = {json.dumps(self.variaveis)};", 0)
+        self.escrever("", 0)
+        self.escrever("export default async function executar(hospedeiro = { comando() {} }) {", 0)
+        for nome in self.comandos:
+            self.escrever(f"const c_{nome} = _metodo(hospedeiro, {json.dumps(nome)});", 1)
+        if self.variaveis:
+            self.escrever(f"let {', '.join(f'v{indice}' for indice in range(len(self.variaveis)))};", 1)
+        self.escrever("let _linha = null;", 1)
+        self.escrever("try {", 1)
+        self.codigo += corpo
+        self.escrever("} catch (erro) {", 1)
+        self.escrever("if (erro instanceof ErroExecucao && erro.linha === null) throw new ErroExecucao(erro.message, _linha);", 2)
+        self.escrever("throw erro;", 2)
+        self.escrever("}", 1)
+        valores = ", ".join(f"[{json.dumps(nome)}, v{indice}]" for indice, nome in enumerate(self.variaveis))
+        self.escrever(f"return Object.fromEntries([{valores}].filter(([, valor]) => valor !== undefined));", 1)
+        self.escrever("}", 0)
+        return "\n".join(self.codigo) + "\n"
+
+    def escrever(self, texto, nivel):
+        self.codigo.append(RECUO * nivel + texto)
+
+    def variavel(self, folha):
+        """Nome JavaScript da variável da folha "id" `folha`."""
+        chave = folha.simbolo if folha.simbolo is not None else folha.valor
+        indice = self.indices.get(chave)
+        if indice is None:
+            indice = self.indices[chave] = len(self.variaveis)
+            self.variaveis.append(folha.valor)
+        return f"v{indice}"
+
+    def expressao(self, no):
+        """
+        Traduz uma expressão (em pós-ordem, com uma pilha de textos já traduzidos).
+
+        Returns:
+            tuple[str, int]: O texto JavaScript e a linha da primeira folha da expressão.
+        """
+        textos = []     # (texto, linha da primeira folha)
+        for filho in pos_ordem(no):
+            if filho.__class__ is NoFolha:
+                op = filho.op
+                if op == "id":
+                    texto = self.variavel(filho)
+                elif op == "num":
+                    texto = str(int(filho.valor))
+                elif op == "alt":
+                    texto = "true" if filho.valor == "verdadeiro" else "false"
+                elif op == "string":
+                    texto = json.dumps(filho.valor)
+                else:
+                    raise ValueError(f'folha "{op}" não suportada pelo gerador JavaScript')
+                self.linha = filho.linha
+                textos.append((texto, filho.linha))
+            elif filho.op == "not":
+                texto, linha = textos.pop()
+                textos.append((f"(!{texto})", linha))
+            else:
+                modelo = OPERADORES.get(filho.operator)
+                if modelo is None or filho.op not in ("sum", "mult", "expression", "power"):
+                    raise ValueError(f'operador "{filho.operator}" não suportado pelo gerador JavaScript')
+                b, _ = textos.pop()
+                a, linha = textos.pop()
+                textos.append((modelo.format(a, b), linha))
+        return textos[0]
+
+    def declaracao(self, no, nivel, tarefas):
+        """
+        Escreve a declaração `no` ou empilha as tarefas que a escrevem.
+        """
+        op = no.op
+        sequencia = []
+        if op == "statementList":
+            sequencia = [(declaracao, nivel) for declaracao in no.statements]
+        elif op in ("program", "block"):
+            sequencia = [(no.statements, nivel)]
+        elif op == "assign":
+            valor, _ = self.expressao(no.value)
+            self.escrever(f"_linha = {no.id.linha}; {self.variavel(no.id)} = {valor};", nivel)
+            self.linha = no.id.linha
+        elif op == "if":
+            condicao, linha = self.expressao(no.condition)
+            self.escrever(f"_linha = {linha};", nivel)
+            self.escrever(f"if ({condicao}) {{", nivel)
+            sequencia = [(no.then_block, nivel + 1)]
+            if no.else_block is not None:
+                sequencia += [("} else {", nivel), (no.else_block, nivel + 1)]
+            sequencia.append(("}", nivel))
+        elif op == "while":
+            condicao, linha = self.expressao(no.condition)
+            self.escrever(f"while ((_linha = {linha}, {condicao})) {{", nivel)
+            sequencia = [(no.block, nivel + 1), ("}", nivel)]
+        elif op == "repeat":
+            vezes, linha = self.expressao(no.times)
+            self.escrever(f"_linha = {linha};", nivel)
+            self.escrever(f"for (let _n = _repeticoes({vezes}); _n > 0; _n--) {{", nivel)
+            sequencia = [(no.block, nivel + 1), ("}", nivel)]
+        elif op in COMANDOS_POR_OP:
+            nome, campos = COMANDOS_POR_OP[op]
+            self.comandos[nome] = None
+            argumentos, linha = [], None
+            for campo in campos:
+                texto, linhaArgumento = self.expressao(getattr(no, campo))
+                argumentos.append(texto)
+                linha = linha or linhaArgumento
+            self.escrever(f"_linha = {linha or self.linha}; await c_{nome}({', '.join(argumentos)});", nivel)
+        else:
+            raise ValueError(f'nó "{op}" não suportado pelo gerador JavaScript')
+        tarefas.extend(reversed(sequencia))
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+"""
+Geração de código Python a partir da árvore sintática.
+
+O programa vira uma função Python (_programa(_hospedeiro)): ENQUANTO e SE viram while e
+if nativos, REPITA vira um for sobre range, as variáveis viram variáveis locais (v0, v1,
+...) e cada comando chama o método do hospedeiro (veja maquina_virtual/hospedeiro.py),
+obtido uma única vez no início da função. Divisão, MOD, potência e a contagem do
+REPITA usam as mesmas funções da MaquinaVirtual, de modo que os dois executores
+produzem os mesmos resultados para programas aceitos pelo analisador semântico.
+
+O código-fonte gerado é compilado uma única vez com compile(); o objeto de código fica
+em um cache indexado pelo hash SHA-256 da árvore serializada (para_binario), de modo
+que simular o mesmo programa muitas vezes não repete a geração nem a compilação.
+
+O compilador do CPython limita o aninhamento de laços (20) e de parênteses (200): os
+programas que os ultrapassam são recusados com ValueError (use a MaquinaVirtual).
+
+Classes:
+    GeradorPython: Gera o código-fonte Python de uma árvore.
+    ProgramaPython: Programa compilado, pronto para executar.
+    CacheProgramas: Cache (LRU) de ProgramaPython por hash da árvore.
+
+Funções:
+    compilar: Retorna o ProgramaPython de uma árvore, usando o cache.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+
+from app.compilador.analisador_sintatico.classes_auxiliares import NoFolha
+from app.compilador.analisador_sintatico.serializador import para_binario
+from app.compilador.analisador_sintatico.visitante import pos_ordem
+from app.compilador.maquina_virtual.classes_auxiliares import ErroExecucao, multiplicar, dividir, resto, potencia, repeticoes
+from app.compilador.maquina_virtual.gerador_bytecode import COMANDOS_POR_OP
+from app.compilador.maquina_virtual.hospedeiro import Hospedeiro
+
+# Operador -> modelo da expressão Python
+OPERADORES = {
+    "+": "({} + {})", "-": "({} - {})", "*": "_multiplicar({}, {})",
+    "/": "_dividir({}, {})", "MOD": "_resto({}, {})", "^": "_potencia({}, {})", "**": "_potencia({}, {})",
+    "=": "({} == {})", "<>": "({} != {})", "<": "({} < {})", ">": "({} > {})", "<=": "({} <= {})", ">=": "({} >= {})",
+    "E": "({} and {})", "OU": "({} or {})",
+}
+
+# Funções de apoio disponíveis para o código gerado
+AMBIENTE = {
+    '_multiplicar': multiplicar,
+    '_dividir': dividir,
+    '_resto': resto,
+    '_potencia': potencia,
+    '_repeticoes': repeticoes,
+}
+
+# Limites de aninhamento aceitos pelo compilador do CPython (com folga)
+MAX_LACOS = 19
+MAX_BLOCOS = 90
+MAX_PROFUNDIDADE = 180
+
+RECUO = "    "
+
+
+class GeradorPython:
+    """
+    Gera o código-fonte Python de uma árvore sintática, com uma pilha explícita (sem
+    recursão). Para cada linha gerada, `linhas` guarda a linha do programa original,
+    usada nas mensagens de erro de execução.
+    """
+
+    def __init__(self, arvore):
+        """
+        Inicializa os atributos da classe.
+        """
+        self.arvore = arvore    # atributo arvore: raiz da árvore sintática
+        self.codigo = []        # atributo codigo: linhas do código-fonte gerado
+        self.linhas = [0]       # atributo linhas: linha original de cada linha gerada (a partir da 1)
+        self.indices = {}       # atributo indices: chave da variável (Simbolo ou nome) -> índice
+        self.variaveis = []     # atributo variaveis: nome de cada variável, pelo índice
+        self.comandos = {}      # atributo comandos: nomes dos comandos usados (na ordem de uso)
+        self.linha = 0          # atributo linha: linha original da última folha traduzida
+
+    def gerar(self):
+        """
+        Gera o código-fonte do programa.
+
+        Returns:
+            str: Código-fonte de um módulo que define _programa(_hospedeiro).
+        Raises:
+            ValueError: Caso a árvore contenha um nó sem tradução ou ultrapasse os limites
+            de aninhamento do CPython.
+        """
+        corpo, linhasCorpo = self.codigo, self.linhas
+        self.codigo, self.linhas = [], [0]
+        # Tarefas: (nó, nível de recuo, laços abertos) ou (texto da linha, nível, linha original)
+        tarefas = [(self.arvore, 1, 0)]
+        while tarefas:
+            item, nivel, extra = tarefas.pop()
+            if isinstance(item, str):
+                self.escrever(item, nivel, extra)
+            else:
+                self.declaracao(item, nivel, extra, tarefas)
+        corpo, self.codigo = self.codigo, corpo
+        linhasCorpo, self.linhas = self.linhas, linhasCorpo
+
+        self.escrever("def _programa(_hospedeiro):", 0, 0)
+        for nome in self.comandos:
+            self.escrever(f"c_{nome} = _hospedeiro.metodo({nome!r})", 1, 0)
+        self.codigo += corpo
+        self.linhas += linhasCorpo[1:]
+        self.escrever("return locals()", 1, self.linha)
+        return "\n".join(self.codigo) + "\n"
+
+    def escrever(self, texto, nivel, linha):
+        self.codigo.append(RECUO * nivel + texto)
+        self.linhas.append(linha)
+
+    def variavel(self, folha):
+        """Nome Python da variável da folha "id" `folha`."""
+        chave = folha.simbolo if folha.simbolo is not None else folha.valor
+        indice = self.indices.get(chave)
+        if indice is None:
+            indice = self.indices[chave] = len(self.variaveis)
+            self.variaveis.append(folha.valor)
+        return f"v{indice}"
+
+    def expressao(self, no):
+        """
+        Traduz uma expressão (em pós-ordem, com uma pilha de textos já traduzidos).
+
+        Returns:
+            tuple[str, int]: O texto Python e a linha da primeira folha da expressão.
+        """
+        textos = []     # (texto, profundidade, linha da primeira folha)
+        for filho in pos_ordem(no):
+            if filho.__class__ is NoFolha:
+                op = filho.op
+                if op == "id":
+                    texto = self.variavel(filho)
+                elif op == "num":
+                    texto = str(int(filho.valor))
+                elif op == "alt":
+                    texto = "True" if filho.valor == "verdadeiro" else "False"
+                elif op == "string":
+                    texto = repr(filho.valor)
+                else:
+                    raise ValueError(f'folha "{op}" não suportada pelo gerador Python')
+                self.linha = filho.linha
+                textos.append((texto, 0, filho.linha))
+            elif filho.op == "not":
+                texto, profundidade, linha = textos.pop()
+                textos.append((f"(not {texto})", profundidade + 1, linha))
+            else:
+                modelo = OPERADORES.get(filho.operator)
+                if modelo is None or filho.op not in ("sum", "mult", "expression", "power"):
+                    raise ValueError(f'operador "{filho.operator}" não suportado pelo gerador Python')
+                b, profundidadeB, _ = textos.pop()
+                a, profundidadeA, linha = textos.pop()
+                profundidade = max(profundidadeA, profundidadeB) + 1
+                if profundidade > MAX_PROFUNDIDADE:
+                    raise ValueError(f"expressão aninhada demais para o gerador Python, na linha {linha}")
+                textos.append((modelo.format(a, b), profundidade, linha))
+        texto, _, linha = textos[0]
+        return texto, linha
+
+    def declaracao(self, no, nivel, lacos, tarefas):
+        """
+        Escreve a declaração `no` ou empilha as tarefas que a escrevem.
+        """
+        if nivel > MAX_BLOCOS or lacos > MAX_LACOS:
+            raise ValueError(f"blocos aninhados demais para o gerador Python, na linha {self.linha}")
+        op = no.op
+        sequencia = []
+        if op == "statementList":
+            sequencia = [(declaracao, nivel, lacos) for declaracao in no.statements]
+        elif op in ("program", "block"):
+            if not no.statements.statements:
+                self.escrever("pass", nivel, self.linha)
+            sequencia = [(no.statements, nivel, lacos)]
+        elif op == "assign":
+            valor, _ = self.expressao(no.value)
+            self.escrever(f"{self.variavel(no.id)} = {valor}", nivel, no.id.linha)
+            self.linha = no.id.linha
+        elif op == "if":
+            condicao, linha = self.expressao(no.condition)
+            self.escrever(f"if {condicao}:", nivel, linha)
+            sequencia = [(no.then_block, nivel + 1, lacos)]
+            if no.else_block is not None:
+                sequencia += [("else:", nivel, linha), (no.else_block, nivel + 1, lacos)]
+        elif op == "while":
+            condicao, linha = self.expressao(no.condition)
+            self.escrever(f"while {condicao}:", nivel, linha)
+            sequencia = [(no.block, nivel + 1, lacos + 1)]
+        elif op == "repeat":
+            vezes, linha = self.expressao(no.times)
+            self.escrever(f"for _ in range(_repeticoes({vezes})):", nivel, linha)
+            sequencia = [(no.block, nivel + 1, lacos + 1)]
+        elif op in COMANDOS_POR_OP:
+            nome, campos = COMANDOS_POR_OP[op]
+            self.comandos[nome] = None
+            argumentos, linha = [], None
+            for campo in campos:
+                texto, linhaArgumento = self.expressao(getattr(no, campo))
+                argumentos.append(texto)
+                linha = linha or linhaArgumento
+            self.escrever(f"c_{nome}({', '.join(argumentos)})", nivel, linha or self.linha)
+        else:
+            raise ValueError(f'nó "{op}" não suportado pelo gerador Python')
+        tarefas.extend(reversed(sequencia))
+
+
+class ProgramaPython:
+    """
+    Programa gerado pelo GeradorPython e compilado com compile().
+
+    Atributos:
+        fonte (str): Código-fonte Python gerado.
+        codigo (code): Objeto de código do módulo gerado.
+        variaveis (list[str]): Nome original de cada variável (v0, v1, ...).
+        linhas (list[int]): Linha do programa original de cada linha do código gerado.
+    """
+
+    def __init__(self, arvore, nome="<programa>"):
+        gerador = GeradorPython(arvore)
+        self.fonte = gerador.gerar()
+        self.variaveis = gerador.variaveis
+        self.linhas = gerador.linhas
+        self.nome = nome
+        try:
+            self.codigo = compile(self.fonte, nome, 'exec')
+        except (SyntaxError, RecursionError, MemoryError) as erro:
+            raise ValueError(f"programa não suportado pelo gerador Python: {erro}") from None
+        ambiente = dict(AMBIENTE)
+        exec(self.codigo, ambiente)
+        self.funcao = ambiente['_programa']
+
+    def executar(self, hospedeiro=None):
+        """
+        Executa o programa.
+
+        Args:
+            hospedeiro (Hospedeiro, opcional): Executa os comandos.
+
+        Returns:
+            dict: Valores finais das variáveis atribuídas, por nome.
+        Raises:
+            ErroExecucao: Caso ocorra um erro de execução (com a linha do programa).
+        """
+        try:
+            locais = self.funcao(hospedeiro or Hospedeiro())
+        except ErroExecucao as erro:
+            if erro.linha is not None:
+                raise
+            linha = self.linhaDoErro(erro)
+            raise ErroExecucao(f"{erro}, na linha {linha}", linha) from None
+        except (TypeError, ValueError, OverflowError, ZeroDivisionError, NameError) as erro:
+            linha = self.linhaDoErro(erro)
+            indice = self.variavelSemValor(erro) if isinstance(erro, NameError) else None
+            if indice is not None:
+                mensagem = f'A variável "{self.variaveis[indice]}" não tem valor'
+            else:
+                mensagem = f"Erro de execução: {erro}"
+            raise ErroExecucao(f"{mensagem}, na linha {linha}", linha) from erro
+        return {self.variaveis[int(nome[1:])]: valor for nome, valor in locais.items() if nome[0] == 'v'}
+
+    def variavelSemValor(self, erro):
+        """
+        Índice da variável lida antes de ter valor que causou o NameError `erro`: um
+        UnboundLocalError (lida antes da atribuição) ou NameError (nunca atribuída) de
+        uma variável vN no próprio código gerado. None se o erro veio de outro código
+        (um método do hospedeiro, por exemplo).
+        """
+        rastro = erro.__traceback__
+        while rastro is not None and rastro.tb_next is not None:
+            rastro = rastro.tb_next
+        if rastro is None or rastro.tb_frame.f_code.co_filename != self.nome:
+            return None
+        correspondencia = re.search(r"'v(\d+)'", str(erro))
+        if correspondencia is None or int(correspondencia.group(1)) >= len(self.variaveis):
+            return None
+        return int(correspondencia.group(1))
+
+    def linhaDoErro(self, erro):
+        """Linha do programa original em que o erro `erro` ocorreu (None se desconhecida)."""
+        linha = None
+        rastro = erro.__traceback__
+        while rastro is not None:
+            if rastro.tb_frame.f_code.co_filename == self.nome:
+                linha = self.linhas[rastro.tb_lineno]
+            rastro = rastro.tb_next
+        return linha
+
+
+class CacheProgramas:
+    """
+    Cache dos ProgramaPython, indexado pelo hash SHA-256 da árvore serializada no formato
+    binário. Guarda no máximo `capacidade` programas, descartando o usado há mais tempo.
+    """
+
+    def __init__(self, capacidade=256):
+        self.capacidade = capacidade
+        self.programas = OrderedDict()
+
+    def obter(self, arvore):
+        """
+        Retorna o ProgramaPython da árvore, gerando-o e compilando-o se necessário.
+        """
+        chave = hashlib.sha256(para_binario(arvore)).hexdigest()
+        programa = self.programas.get(chave)
+        if programa is not None:
+            self.programas.move_to_end(chave)
+            return programa
+        programa = ProgramaPython(arvore, f"<programa {chave[:16]}>")
+        self.programas[chave] = programa
+        if len(self.programas) > self.capacidade:
+            self.programas.popitem(last=False)
+        return programa
+
+
+CACHE = CacheProgramas()
+
+
+def compilar(arvore, cache=CACHE):
+    """
+    Retorna o ProgramaPython da árvore sintática, do cache quando possível.
+
+    Args:
+        arvore (NoInterno): Raiz da árvore sintática.
+        cache (CacheProgramas | None): Cache a usar (None: sempre compila).
+
+    Returns:
+        ProgramaPython: O programa compilado.
+    Raises:
+        ValueError: Caso o programa não possa ser traduzido para Python.
+    """
+    if cache is None:
+        return ProgramaPython(arvore)
+    return cache.obter(arvore)
@@ -0,0 +1,128 @@
+"""
+Os mesmos programas executados pela MaquinaVirtual, pelo código Python gerado, pelo
+código JavaScript gerado (com o node, se disponível) e pelo interpretador de árvore do
+benchmark devem produzir as mesmas variáveis, chamadas ao hospedeiro e erros; sem as
+atribuições mortas, o mesmo vale para a árvore otimizada.
+"""
+
+import json
+import math
+import shutil
+import subprocess
+
+import pytest
+
+from app.compilador.gerador_codigo.gerador_javascript import GeradorJavaScript
+from app.compilador.gerador_codigo.gerador_python import ProgramaPython
+from app.compilador.maquina_virtual.benchmark import InterpretadorArvore
+from app.compilador.maquina_virtual.classes_auxiliares import ErroExecucao
+from app.compilador.maquina_virtual.gerador_bytecode import GeradorBytecode
+from app.compilador.maquina_virtual.hospedeiro import HospedeiroRegistro
+from app.compilador.maquina_virtual.maquina_virtual import MaquinaVirtual
+from app.compilador.otimizador.otimizador import Otimizador
+
+PROGRAMAS = {
+    "aritmetica": '"aritmetica"\na : 7\nb : 2\nsoma : a + b * 3 - 1\ndivisao : a / b\nexata : 8 / b\n'
+                  'resto : a MOD b\npot : b ^ 10\nESCREVA(soma)\nESCREVA(divisao)\n',
+    "logica": '"logica"\nx : 5\ny : (x > 3) E (x < 10)\nz : NAO y OU (x = 5)\nw : x <> 5\n'
+              'SE (y) {\n  ESCREVA("sim")\n} SENAO {\n  ESCREVA("nao")\n}\n',
+    "lacos": '"lacos"\ntotal : 0\ni : 0\nENQUANTO (i < 10) {\n  REPITA (i) {\n    total : total + 1\n  }\n'
+             '  i : i + 1\n}\nESCREVA_LINHA(total)\n',
+    "figuras": '"figuras"\nCRIE_FIGURA("circulo", 10, 20, "azul", 5)\nREPITA (3) {\n  MOVA(1, 2, 0 - 1)\n}\n'
+               'DESTAQUE(1)\nESPERE(100)\nLIMPE()\n',
+    "escopos": '"escopos"\nn : 3\nSE (n > 1) {\n  m : n * 2\n  n : m + 1\n}\nfat : 1\nk : n\n'
+               'ENQUANTO (k > 1) {\n  fat : fat * k\n  k : k - 1\n}\n',
+    "erro": '"erro"\nx : 4\ny : 0\nESCREVA(x)\nz : x / y\n',
+}
+
+# Executa os módulos m0.mjs, m1.mjs... e escreve [estado, variáveis ou linha, chamadas] de cada um
+EXECUTOR_JS = """
+const resultados = [];
+for (let i = 0; i < %d; i++) {
+  const modulo = await import(`./m${i}.mjs`);
+  const chamadas = [];
+  const hospedeiro = { comando(nome, argumentos) { chamadas.push([nome, argumentos]); } };
+  try {
+    resultados.push(["ok", await modulo.default(hospedeiro), chamadas]);
+  } catch (erro) {
+    if (!(erro instanceof modulo.ErroExecucao)) throw erro;
+    resultados.push(["erro", erro.linha, chamadas]);
+  }
+}
+console.log(JSON.stringify(resultados));
+"""
+
+
+def executar(funcao):
+    """[estado, variáveis ou linha do erro, chamadas] da execução de funcao(hospedeiro)."""
+    hospedeiro = HospedeiroRegistro()
+    try:
+        return ["ok", funcao(hospedeiro), [[nome, list(argumentos)] for nome, argumentos in hospedeiro.chamadas]]
+    except ErroExecucao as erro:
+        return ["erro", erro.linha, [[nome, list(argumentos)] for nome, argumentos in hospedeiro.chamadas]]
+
+def maquina(arvore):
+    programa = GeradorBytecode(arvore).gerar()
+
+    def funcao(hospedeiro):
+        maquinaVirtual = MaquinaVirtual(programa, hospedeiro)
+        maquinaVirtual.executar()
+        return maquinaVirtual.valores()
+    return executar(funcao)
+
+def arvoreInterpretada(arvore):
+    def funcao(hospedeiro):
+        interpretador = InterpretadorArvore(hospedeiro)
+        interpretador.executar(arvore)
+        return interpretador.variaveis
+    return executar(funcao)
+
+def iguais(a, b):
+    """Igualdade dos resultados, com números comparados com tolerância (JavaScript usa ponto flutuante)."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return a is b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return math.isclose(a, b, rel_tol=1e-12)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(iguais(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(iguais(a[chave], b[chave]) for chave in a)
+    return a == b
+
+
+@pytest.mark.parametrize("nome", PROGRAMAS)
+def test_maquina_python_e_arvore(analisar, nome):
+    arvore = analisar(PROGRAMAS[nome])
+    esperado = maquina(arvore)
+    assert executar(ProgramaPython(arvore).executar) == esperado
+    # O interpretador do benchmark não registra a linha dos erros
+    estado, valor, chamadas = arvoreInterpretada(arvore)
+    assert (estado, chamadas) == (esperado[0], esperado[2])
+    if estado == "ok":
+        assert valor == esperado[1]
+
+@pytest.mark.parametrize("nome", [nome for nome in PROGRAMAS if nome != "erro"])
+def test_otimizado_equivalente(analisar, nome):
+    # Sem as atribuições mortas (e, no programa "erro", a divisão por zero com elas)
+    # ficam as mesmas chamadas e os mesmos valores das variáveis restantes
+    _, variaveis, chamadas = maquina(analisar(PROGRAMAS[nome]))
+    otimizada = Otimizador(analisar(PROGRAMAS[nome])).otimizar()
+    for resultado in (maquina(otimizada), executar(ProgramaPython(otimizada).executar)):
+        assert resultado[0] == "ok" and resultado[2] == chamadas
+        assert resultado[1] == {variavel: variaveis[variavel] for variavel in resultado[1]}
+
+def test_resultados_esperados(analisar):
+    assert maquina(analisar(PROGRAMAS["lacos"]))[1]["total"] == 45
+    assert maquina(analisar(PROGRAMAS["escopos"]))[1] == {"n": 7, "m": 6, "fat": 5040, "k": 1}
+    assert maquina(analisar(PROGRAMAS["erro"])) == ["erro", 5, [["ESCREVA", [4]]]]
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node não está instalado")
+def test_javascript(analisar, tmp_path):
+    nomes = list(PROGRAMAS)
+    for indice, nome in enumerate(nomes):
+        (tmp_path / f"m{indice}.mjs").write_text(GeradorJavaScript(analisar(PROGRAMAS[nome])).gerar(), encoding="utf-8")
+    (tmp_path / "executar.mjs").write_text(EXECUTOR_JS % len(nomes), encoding="utf-8")
+    saida = subprocess.run(["node", str(tmp_path / "executar.mjs")], capture_output=True, text=True, check=True).stdout
+    for nome, resultado in zip(nomes, json.loads(saida)):
+        esperado = maquina(analisar(PROGRAMAS[nome]))
+        assert iguais(resultado, esperado), nome
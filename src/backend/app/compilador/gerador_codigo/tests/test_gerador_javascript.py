@@ -0,0 +1,36 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from app.compilador.gerador_codigo.gerador_javascript import GeradorJavaScript
+
+# Descrições que terminariam um comentário de linha (\r, U+2028, U+2029) ou uma string
+DESCRICOES = [
+    "abc\rexport const pwn = 1; globalThis.PWNED = 42; //",
+    "abc\u2028export const pwn = 1; globalThis.PWNED = 42; //",
+    "abc\u2029export const pwn = 1; globalThis.PWNED = 42; //",
+    "abc\\\"; export const pwn = 1; globalThis.PWNED = 42; //",
+]
+
+# Importa o módulo e escreve a descrição, os nomes exportados e globalThis.PWNED
+EXECUTOR_JS = """
+const modulo = await import("./modulo.mjs");
+console.log(JSON.stringify([modulo.descricao, Object.keys(modulo).sort(), globalThis.PWNED ?? null]));
+"""
+
+
+@pytest.mark.parametrize("descricao", DESCRICOES)
+def test_descricao_nao_encerra_linha(analisar, descricao):
+    codigo = GeradorJavaScript(analisar(f'"{descricao}"\nx : 1\n')).gerar()
+    assert not any(terminador in codigo for terminador in ("\r", "\u2028", "\u2029"))
+    assert f"export const descricao = {json.dumps(descricao)};" in codigo
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node não está instalado")
+@pytest.mark.parametrize("descricao", DESCRICOES)
+def test_descricao_nao_e_executada(analisar, tmp_path, descricao):
+    (tmp_path / "modulo.mjs").write_text(GeradorJavaScript(analisar(f'"{descricao}"\nx : 1\n')).gerar(), encoding="utf-8")
+    (tmp_path / "executar.mjs").write_text(EXECUTOR_JS, encoding="utf-8")
+    saida = subprocess.run(["node", str(tmp_path / "executar.mjs")], capture_output=True, text=True, check=True).stdout
+    assert json.loads(saida) == [descricao, ["ErroExecucao", "default", "descricao", "variaveis"], None]
@@ -0,0 +1,56 @@
+import pytest
+
+from app.compilador.gerador_codigo.gerador_python import ProgramaPython, CacheProgramas
+from app.compilador.maquina_virtual.classes_auxiliares import ErroExecucao
+from app.compilador.maquina_virtual.hospedeiro import Hospedeiro, HospedeiroRegistro
+
+
+class HospedeiroComErro(Hospedeiro):
+    """Hospedeiro cujo ESCREVA lança a exceção `erro`."""
+
+    def __init__(self, erro):
+        self.erro = erro
+
+    def escreva(self, valor):
+        raise self.erro
+
+    def comando(self, nome, argumentos):
+        if nome == "ESCREVA":
+            raise self.erro
+
+
+def test_executa_e_retorna_variaveis(analisar):
+    programa = ProgramaPython(analisar('"p"\nx : 0\nREPITA (4) {\n  x : x + 2\n}\nESCREVA(x)\n'))
+    hospedeiro = HospedeiroRegistro()
+    assert programa.executar(hospedeiro) == {"x": 8}
+    assert hospedeiro.chamadas == [("ESCREVA", (8,))]
+
+def test_variavel_sem_valor(analisar):
+    # Rejeitado pelo analisador semântico; o gerador aceita árvores sem anotação
+    programa = ProgramaPython(analisar('"p"\nSE (falso) {\n  x : 1\n}\nESCREVA(x)\n', semantico=False))
+    with pytest.raises(ErroExecucao) as erro:
+        programa.executar()
+    assert 'A variável "x" não tem valor' in str(erro.value)
+    assert erro.value.linha == 5
+
+def test_erro_de_execucao_com_linha(analisar):
+    programa = ProgramaPython(analisar('"p"\nx : 0\ny : 1 / x\n'))
+    with pytest.raises(ErroExecucao) as erro:
+        programa.executar()
+    assert erro.value.linha == 3
+
+@pytest.mark.parametrize("excecao", [NameError("outro erro"), NameError("name 'v0' is not defined"),
+                                     UnboundLocalError("local variable 'total' referenced before assignment")])
+def test_name_error_do_hospedeiro_nao_e_variavel_sem_valor(analisar, excecao):
+    programa = ProgramaPython(analisar('"p"\nx : 1\nESCREVA(x)\n'))
+    with pytest.raises(ErroExecucao) as erro:
+        programa.executar(HospedeiroComErro(excecao))
+    assert str(erro.value).startswith("Erro de execução: ")
+    assert erro.value.linha == 3
+
+def test_cache_reutiliza_programas(analisar):
+    cache = CacheProgramas(capacidade=1)
+    primeiro = cache.obter(analisar('"p"\nx : 1\n'))
+    assert cache.obter(analisar('"p"\nx : 1\n')) is primeiro
+    cache.obter(analisar('"p"\nx : 2\n'))
+    assert cache.obter(analisar('"p"\nx : 1\n')) is not primeiro
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""
+Comparação de desempenho entre a MaquinaVirtual, o código Python gerado
+(gerador_codigo/gerador_python.py) e um interpretador ingênuo da árvore.
+
+O InterpretadorArvore percorre a árvore sintática recursivamente, lendo os campos de
+cada nó pela visão de dicionário (no.d) e decidindo o que fazer pelo op a cada visita,
+como um avaliador escrito diretamente sobre a saída de AnalisadorSintatico.analisar().
+Ele também serve de referência: os executores devem terminar com as mesmas
+variáveis e os mesmos comandos chamados.
+
+Uso (a partir de src/backend):
+    python -m app.compilador.maquina_virtual.benchmark [iterações]
+"""
+
+import sys
+import time
+
+from app.compilador.analisador_lexico.analisador_lexico import AnalisadorLexico
+from app.compilador.analisador_sintatico.analisador_sintatico import AnalisadorSintatico
+from app.compilador.analisador_sintatico.classes_auxiliares import NoFolha
+from app.compilador.analisador_semantico.analisador_semantico import AnalisadorSemantico
+from app.compilador.gerador_codigo.gerador_python import compilar
+from app.compilador.maquina_virtual.classes_auxiliares import ErroExecucao, multiplicar, dividir, resto, potencia, repeticoes
+from app.compilador.maquina_virtual.gerador_bytecode import GeradorBytecode, COMANDOS_POR_OP
+from app.compilador.maquina_virtual.hospedeiro import HospedeiroRegistro
+from app.compilador.maquina_virtual.maquina_virtual import MaquinaVirtual
+
+OPERACOES = {
+    "+": lambda a, b: a + b, "-": lambda a, b: a - b, "*": multiplicar,
+    "/": dividir, "MOD": resto, "^": potencia, "**": potencia,
+    "=": lambda a, b: a == b, "<>": lambda a, b: a != b, "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b, "<=": lambda a, b: a <= b, ">=": lambda a, b: a >= b,
+}
+
+
+class InterpretadorArvore:
+    """
+    Interpretador ingênuo (recursivo) da árvore sintática, usado como base de comparação.
+    """
+
+    def __init__(self, hospedeiro):
+        self.hospedeiro = hospedeiro
+        self.variaveis = {}
+
+    def executar(self, no):
+        op = no.op
+        d = no.d
+        if op in ("program", "block"):
+            self.executar(d["statements"])
+        elif op == "statementList":
+            for declaracao in d["statements"]:
+                self.executar(declaracao)
+        elif op == "assign":
+            self.variaveis[d["id"].valor] = self.avaliar(d["value"])
+        elif op == "if":
+            if self.avaliar(d["condition"]):
+                self.executar(d["then_block"])
+            elif d["else_block"] is not None:
+                self.executar(d["else_block"])
+        elif op == "while":
+            while self.avaliar(d["condition"]):
+                self.executar(d["block"])
+        elif op == "repeat":
+            for _ in range(repeticoes(self.avaliar(d["times"]))):
+                self.executar(d["block"])
+        else:
+            nome, campos = COMANDOS_POR_OP[op]
+            self.hospedeiro.metodo(nome)(*[self.avaliar(d[campo]) for campo in campos])
+
+    def avaliar(self, no):
+        if isinstance(no, NoFolha):
+            if no.op == "id":
+                if no.valor not in self.variaveis:
+                    raise ErroExecucao(f'A variável "{no.valor}" não tem valor', no.linha)
+                return self.variaveis[no.valor]
+            if no.op == "num":
+                return int(no.valor)
+            if no.op == "alt":
+                return no.valor == "verdadeiro"
+            return no.valor
+        d = no.d
+        if no.op == "not":
+            return not self.avaliar(d["operand"])
+        if no.op == "power":
+            return potencia(self.avaliar(d["base"]), self.avaliar(d["expoente"]))
+        operador = d["operator"]
+        if operador == "E":
+            return self.avaliar(d["esq"]) and self.avaliar(d["dir"])
+        if operador == "OU":
+            return self.avaliar(d["esq"]) or self.avaliar(d["dir"])
+        return OPERACOES[operador](self.avaliar(d["esq"]), self.avaliar(d["dir"]))
+
+
+PROGRAMA = '''"benchmark"
+total : 0
+i : 0
+ENQUANTO (i < %d) {
+    SE ((i MOD 3 = 0) OU ((i > 1000) E NAO (i = 2000))) {
+        total : total + i * 2 - (i / 2)
+    } SENAO {
+        total : total - 1
+    }
+    REPITA (2) { passo : total MOD 7 }
+    i : i + 1
+}
+MOVA(1, total MOD 100, i)
+'''
+
+
+def medir(funcao):
+    """Menor tempo de três execuções de `funcao`, em segundos."""
+    melhor = None
+    for _ in range(3):
+        inicio = time.perf_counter()
+        funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor
+
+
+def main(iteracoes=20000):
+    arvore = AnalisadorSintatico(AnalisadorLexico(PROGRAMA % iteracoes).getTokens()).analisar()
+    AnalisadorSemantico(arvore).analisar()
+    programa = GeradorBytecode(arvore).gerar()
+
+    referencia = HospedeiroRegistro()
+    interpretador = InterpretadorArvore(referencia)
+    interpretador.executar(arvore)
+    registro = HospedeiroRegistro()
+    maquina = MaquinaVirtual(programa, registro)
+    maquina.executar()
+    assert maquina.valores() == interpretador.variaveis and registro.chamadas == referencia.chamadas
+    programaPython = compilar(arvore)
+    registro = HospedeiroRegistro()
+    assert programaPython.executar(registro) == interpretador.variaveis and registro.chamadas == referencia.chamadas
+
+    arvoreTempo = medir(lambda: InterpretadorArvore(HospedeiroRegistro()).executar(arvore))
+    maquinaTempo = medir(lambda: MaquinaVirtual(programa, HospedeiroRegistro()).executar())
+    pythonTempo = medir(lambda: programaPython.executar(HospedeiroRegistro()))
+    print(f"{iteracoes} iterações, {len(programa.codigo) // 2} instruções")
+    print(f"interpretador da árvore: {arvoreTempo * 1000:8.1f} ms")
+    print(f"máquina virtual:         {maquinaTempo * 1000:8.1f} ms  ({arvoreTempo / maquinaTempo:.1f}x)")
+    print(f"código Python gerado:    {pythonTempo * 1000:8.1f} ms  ({arvoreTempo / pythonTempo:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
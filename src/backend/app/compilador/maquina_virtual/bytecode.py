@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+Formato do bytecode executado pela MaquinaVirtual.
+
+Cada instrução ocupa duas posições de um array de inteiros: o código da operação e o
+seu argumento (0 quando não usado). Os saltos apontam para a posição (par) da
+instrução de destino.
+
+Operações (argumento entre parênteses):
+    CONSTANTE (índice na tabela de constantes)  empilha a constante
+    CARREGAR (variável)                         empilha o valor da variável
+    GUARDAR (variável)                          desempilha o valor na variável
+    SOMAR ... MAIOR_IGUAL                       desempilha b e a, empilha a <op> b
+    NAO                                         nega o topo
+    SALTAR (destino)                            salta incondicionalmente
+    SALTAR_SE_FALSO (destino)                   desempilha a condição e salta se falsa
+    SALTAR_SE_FALSO_OU_DESEMPILHAR (destino)    E: salta mantendo o topo se falso
+    SALTAR_SE_VERDADEIRO_OU_DESEMPILHAR (dest.) OU: salta mantendo o topo se verdadeiro
+    INICIAR_REPETICAO                           desempilha a contagem de um REPITA
+    REPETIR (destino)                           conta uma repetição ou, se acabaram, salta
+    COMANDO (índice na tabela de comandos)      desempilha os argumentos e chama o comando
+    PARAR                                       encerra a execução
+"""
+
+from array import array
+
+(CONSTANTE, CARREGAR, GUARDAR,
+ SOMAR, SUBTRAIR, MULTIPLICAR, DIVIDIR, RESTO, POTENCIA,
+ IGUAL, DIFERENTE, MENOR, MAIOR, MENOR_IGUAL, MAIOR_IGUAL,
+ NAO, SALTAR, SALTAR_SE_FALSO, SALTAR_SE_FALSO_OU_DESEMPILHAR, SALTAR_SE_VERDADEIRO_OU_DESEMPILHAR,
+ INICIAR_REPETICAO, REPETIR, COMANDO, PARAR) = range(24)
+
+NOMES = (
+    'CONSTANTE', 'CARREGAR', 'GUARDAR',
+    'SOMAR', 'SUBTRAIR', 'MULTIPLICAR', 'DIVIDIR', 'RESTO', 'POTENCIA',
+    'IGUAL', 'DIFERENTE', 'MENOR', 'MAIOR', 'MENOR_IGUAL', 'MAIOR_IGUAL',
+    'NAO', 'SALTAR', 'SALTAR_SE_FALSO', 'SALTAR_SE_FALSO_OU_DESEMPILHAR', 'SALTAR_SE_VERDADEIRO_OU_DESEMPILHAR',
+    'INICIAR_REPETICAO', 'REPETIR', 'COMANDO', 'PARAR',
+)
+
+# Operações cujo argumento é o destino de um salto
+SALTOS = frozenset([SALTAR, SALTAR_SE_FALSO, SALTAR_SE_FALSO_OU_DESEMPILHAR,
+                    SALTAR_SE_VERDADEIRO_OU_DESEMPILHAR, REPETIR])
+
+
+class ProgramaCompilado:
+    """
+    Programa gerado pelo GeradorBytecode.
+
+    Atributos:
+        codigo (array): Instruções (pares operação, argumento).
+        linhas (array): Linha do código-fonte de cada instrução (índice = posição / 2).
+        constantes (list): Tabela de constantes (int, float, bool, str).
+        variaveis (list[str]): Nome de cada variável, pelo seu índice.
+        comandos (list[tuple[str, int]]): (nome do comando, quantidade de argumentos),
+            pelo índice usado em COMANDO.
+    """
+
+    def __init__(self):
+        self.codigo = array('i')
+        self.linhas = array('I')
+        self.constantes = []
+        self.variaveis = []
+        self.comandos = []
+
+    def linhaDe(self, posicao):
+        """Linha do código-fonte da instrução na posição `posicao`."""
+        return self.linhas[posicao // 2]
+
+    def desmontar(self):
+        """
+        Retorna a listagem legível do bytecode (uma instrução por linha).
+        """
+        saida = []
+        codigo = self.codigo
+        for posicao in range(0, len(codigo), 2):
+            op, arg = codigo[posicao], codigo[posicao + 1]
+            if op == CONSTANTE:
+                detalhe = repr(self.constantes[arg])
+            elif op in (CARREGAR, GUARDAR):
+                detalhe = self.variaveis[arg]
+            elif op == COMANDO:
+                detalhe = "%s/%d" % self.comandos[arg]
+            elif op in SALTOS:
+                detalhe = f"-> {arg}"
+            else:
+                detalhe = ""
+            saida.append(f"{posicao:6d} {self.linhaDe(posicao):5d}  {NOMES[op]:<36} {detalhe}".rstrip())
+        return "\n".join(saida)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+Classes e funções auxiliares da execução de programas.
+
+Classes:
+    ErroExecucao: Erro durante a execução de um programa.
+    Orcamento: Limites de passos, tempo e memória de uma execução.
+    OrcamentoExcedido: Erro de execução lançado quando um limite do Orcamento é excedido.
+
+Funções:
+    multiplicar, dividir, resto, potencia, repeticoes: Operações da linguagem cujo
+        comportamento não é o do operador do Python correspondente.
+"""
+
+import math
+
+# Maior quantidade de bits do resultado inteiro de * e ^. O custo dessas operações cresce
+# com o tamanho dos operandos e uma única instrução não pode ser interrompida pelos limites
+# do Orcamento (x : x * x em um laço dobra o tamanho de x a cada passo). + e - acrescentam
+# no máximo um bit por passo, então o seu custo já é limitado pelos passos e pelo tempo.
+LIMITE_BITS = 1 << 16
+
+
+class ErroExecucao(Exception):
+    """
+    Define uma classe que representa um erro de execução (divisão por zero, variável
+    sem valor, operandos de tipos incompatíveis...).
+    Herda da classe Exception; o atributo linha guarda a linha do erro (None se desconhecida).
+    """
+
+    def __init__(self, mensagem, linha=None):
+        super().__init__(mensagem)
+        self.linha = linha
+
+    def __reduce__(self):
+        return self.__class__, (str(self), self.linha)
+
+
+class Orcamento:
+    """
+    Define os limites de uma execução (None: sem limite).
+
+    Atributos:
+        passos (int | None): Máximo de passos; cada declaração executada (atribuição,
+            comando, teste de SE) e cada iteração de ENQUANTO ou REPITA é um passo.
+        tempo (float | None): Máximo de segundos de execução (relógio monotônico, incluindo
+            o tempo gasto nos comandos do hospedeiro, mas não o de execução suspensa).
+        memoria (int | None): Máximo de bytes ocupados pelos valores das variáveis e da
+            pilha da execução (estimado com sys.getsizeof).
+        intervalo (int): O tempo e a memória são verificados a cada `intervalo` passos.
+    """
+
+    def __init__(self, passos=None, tempo=None, memoria=None, intervalo=1000):
+        self.passos = passos
+        self.tempo = tempo
+        self.memoria = memoria
+        self.intervalo = intervalo
+
+
+class OrcamentoExcedido(ErroExecucao):
+    """
+    Define uma classe que representa o fim de uma execução por exceder um limite do
+    Orcamento. Herda da classe ErroExecucao (linha: linha em que o programa estava);
+    recurso é o limite excedido ("passos", "tempo" ou "memoria") e passos e tempo são os
+    passos executados e os segundos decorridos até a interrupção.
+    """
+
+    MENSAGENS = {
+        "passos": "Limite de passos excedido",
+        "tempo": "Limite de tempo excedido",
+        "memoria": "Limite de memória excedido",
+    }
+
+    def __init__(self, recurso, linha, passos, tempo):
+        super().__init__(f"{self.MENSAGENS[recurso]} ({passos} passos, {tempo:.3f} s), na linha {linha}", linha)
+        self.recurso = recurso
+        self.passos = passos
+        self.tempo = tempo
+
+    def __reduce__(self):
+        return self.__class__, (self.recurso, self.linha, self.passos, self.tempo)
+
+
+def erroNumeroGrande():
+    return ErroExecucao(f"Número grande demais: o resultado teria mais de {LIMITE_BITS} bits")
+
+
+def multiplicar(a, b):
+    """
+    Multiplicação de NUM; resultados inteiros com mais de LIMITE_BITS bits são erros.
+    """
+    if a.__class__ is int and b.__class__ is int and a.bit_length() + b.bit_length() > LIMITE_BITS + 1:
+        raise erroNumeroGrande()
+    return a * b
+
+
+def dividir(a, b):
+    """
+    Divisão de NUM: o resultado é inteiro quando a divisão é exata (6 / 2 -> 3).
+    """
+    if b == 0:
+        raise ErroExecucao("Divisão por zero")
+    if a.__class__ is int and b.__class__ is int and a % b == 0:
+        return a // b
+    return a / b
+
+
+def resto(a, b):
+    """
+    Resto da divisão (MOD).
+    """
+    if b == 0:
+        raise ErroExecucao("Divisão por zero no MOD")
+    return a % b
+
+
+def potencia(a, b):
+    """
+    Potência (^). Resultados complexos (base negativa e expoente fracionário) e inteiros
+    com mais de LIMITE_BITS bits são erros.
+    """
+    if a.__class__ is int and b.__class__ is int and b > 0 and abs(a) > 1 and b * math.log2(abs(a)) > LIMITE_BITS:
+        raise erroNumeroGrande()
+    resultado = a ** b
+    if resultado.__class__ is complex:
+        raise ErroExecucao(f"Potência sem resultado real: {a} ^ {b}")
+    return resultado
+
+
+def repeticoes(valor):
+    """
+    Quantidade de repetições de um REPITA: a parte inteira da contagem (0 se negativa).
+    """
+    if valor.__class__ is bool or not isinstance(valor, (int, float)):
+        raise ErroExecucao(f"A quantidade de repetições do REPITA deve ser NUM, mas é {valor!r}")
+    return max(int(valor), 0)
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+from app.compilador.analisador_sintatico.classes_auxiliares import NoFolha
+from app.compilador.analisador_sintatico.gramatica import COMANDOS
+from app.compilador.maquina_virtual.bytecode import (
+    ProgramaCompilado, SALTOS, CONSTANTE, CARREGAR, GUARDAR,
+    SOMAR, SUBTRAIR, MULTIPLICAR, DIVIDIR, RESTO, POTENCIA,
+    IGUAL, DIFERENTE, MENOR, MAIOR, MENOR_IGUAL, MAIOR_IGUAL,
+    NAO, SALTAR, SALTAR_SE_FALSO, SALTAR_SE_FALSO_OU_DESEMPILHAR, SALTAR_SE_VERDADEIRO_OU_DESEMPILHAR,
+    INICIAR_REPETICAO, REPETIR, COMANDO, PARAR)
+
+# Operador binário -> operação
+BINARIOS = {
+    "+": SOMAR, "-": SUBTRAIR, "*": MULTIPLICAR, "/": DIVIDIR, "MOD": RESTO,
+    "^": POTENCIA, "**": POTENCIA,
+    "=": IGUAL, "<>": DIFERENTE, "<": MENOR, ">": MAIOR, "<=": MENOR_IGUAL, ">=": MAIOR_IGUAL,
+}
+
+# Operadores lógicos, avaliados em curto-circuito: operador -> salto após o operando esquerdo
+LOGICOS = {"E": SALTAR_SE_FALSO_OU_DESEMPILHAR, "OU": SALTAR_SE_VERDADEIRO_OU_DESEMPILHAR}
+
+# op do nó do comando -> (nome do comando, campos dos argumentos, na ordem)
+COMANDOS_POR_OP = {op: (nome, tuple(campo for campo, _ in argumentos)) for nome, (_, op, argumentos) in COMANDOS.items()}
+
+# Tarefas da pilha de geração
+_NO, _EMITIR, _ROTULO = 0, 1, 2
+
+
+class GeradorBytecode:
+    """
+    Gera o bytecode (ProgramaCompilado) de uma árvore sintática.
+
+    A árvore é percorrida com uma pilha explícita de tarefas (gerar o código de um nó,
+    emitir uma instrução ou marcar a posição de um rótulo), sem recursão. Os saltos são
+    emitidos com o número do rótulo de destino e corrigidos no final.
+
+    As variáveis recebem índices fixos: uma por Simbolo, se a árvore foi anotada pelo
+    analisador semântico, ou uma por nome. A linha de cada instrução é a da última
+    folha gerada (a dos alvos, nas atribuições).
+    """
+
+    def __init__(self, arvore):
+        """
+        Inicializa os atributos da classe.
+        """
+        self.arvore = arvore                    # atributo arvore: raiz da árvore sintática
+        self.programa = ProgramaCompilado()     # atributo programa: bytecode em construção
+        self.indices = {}                       # atributo indices: (tipo, valor) da constante ou chave da variável -> índice
+        self.comandos = {}                      # atributo comandos: nome do comando -> índice
+        self.rotulos = []                       # atributo rotulos: posição de cada rótulo (None até ser marcado)
+        self.saltos = []                        # atributo saltos: posições das instruções de salto
+        self.linha = 0                          # atributo linha: linha da última folha gerada
+
+    def gerar(self):
+        """
+        Gera o bytecode da árvore.
+
+        Returns:
+            ProgramaCompilado: O programa gerado.
+        Raises:
+            ValueError: Caso a árvore contenha um nó sem tradução.
+        """
+        tarefas = [(_NO, self.arvore)]
+        while tarefas:
+            tipo, dado = tarefas.pop()
+            if tipo == _NO:
+                self.expandir(dado, tarefas)
+            elif tipo == _EMITIR:
+                self.emitir(*dado)
+            else:
+                self.rotulos[dado] = len(self.programa.codigo)
+        self.emitir(PARAR)
+
+        codigo = self.programa.codigo
+        for posicao in self.saltos:
+            codigo[posicao + 1] = self.rotulos[codigo[posicao + 1]]
+        return self.programa
+
+    def emitir(self, op, arg=0, linha=None):
+        """
+        Acrescenta a instrução (op, arg) ao programa.
+        """
+        if linha is not None:
+            self.linha = linha
+        programa = self.programa
+        if op in SALTOS:
+            self.saltos.append(len(programa.codigo))
+        programa.codigo.append(op)
+        programa.codigo.append(arg)
+        programa.linhas.append(self.linha)
+
+    def rotulo(self):
+        """Cria um rótulo (ainda sem posição) e retorna o seu número."""
+        self.rotulos.append(None)
+        return len(self.rotulos) - 1
+
+    def constante(self, valor):
+        """Índice de `valor` na tabela de constantes (acrescentado, se necessário)."""
+        chave = (valor.__class__, valor)
+        indice = self.indices.get(chave)
+        if indice is None:
+            indice = self.indices[chave] = len(self.programa.constantes)
+            self.programa.constantes.append(valor)
+        return indice
+
+    def variavel(self, folha):
+        """Índice da variável da folha "id" `folha`."""
+        chave = ('id', folha.simbolo if folha.simbolo is not None else folha.valor)
+        indice = self.indices.get(chave)
+        if indice is None:
+            indice = self.indices[chave] = len(self.programa.variaveis)
+            self.programa.variaveis.append(folha.valor)
+        return indice
+
+    def comando(self, nome, quantidade):
+        """Índice do comando `nome` na tabela de comandos."""
+        indice = self.comandos.get(nome)
+        if indice is None:
+            indice = self.comandos[nome] = len(self.programa.comandos)
+            self.programa.comandos.append((nome, quantidade))
+        return indice
+
+    def expandir(self, no, tarefas):
+        """
+        Gera o código de uma folha ou empilha as tarefas que geram o código de `no`.
+        """
+        if no.__class__ is NoFolha:
+            op = no.op
+            if op == "id":
+                self.emitir(CARREGAR, self.variavel(no), no.linha)
+            elif op == "num":
+                self.emitir(CONSTANTE, self.constante(int(no.valor)), no.linha)
+            elif op == "alt":
+                self.emitir(CONSTANTE, self.constante(no.valor == "verdadeiro"), no.linha)
+            elif op == "string":
+                self.emitir(CONSTANTE, self.constante(no.valor), no.linha)
+            else:
+                raise ValueError(f'folha "{op}" não suportada pelo gerador de bytecode')
+            return
+
+        op = no.op
+        if op == "statementList":
+            sequencia = [(_NO, declaracao) for declaracao in no.statements]
+        elif op in ("program", "block"):
+            sequencia = [(_NO, no.statements)]
+        elif op == "assign":
+            sequencia = [(_NO, no.value), (_EMITIR, (GUARDAR, self.variavel(no.id), no.id.linha))]
+        elif op == "if":
+            senao, fim = self.rotulo(), self.rotulo()
+            sequencia = [(_NO, no.condition), (_EMITIR, (SALTAR_SE_FALSO, senao)), (_NO, no.then_block)]
+            if no.else_block is not None:
+                sequencia += [(_EMITIR, (SALTAR, fim)), (_ROTULO, senao), (_NO, no.else_block), (_ROTULO, fim)]
+            else:
+                sequencia.append((_ROTULO, senao))
+        elif op == "while":
+            inicio, fim = self.rotulo(), self.rotulo()
+            sequencia = [(_ROTULO, inicio), (_NO, no.condition), (_EMITIR, (SALTAR_SE_FALSO, fim)),
+                         (_NO, no.block), (_EMITIR, (SALTAR, inicio)), (_ROTULO, fim)]
+        elif op == "repeat":
+            inicio, fim = self.rotulo(), self.rotulo()
+            sequencia = [(_NO, no.times), (_EMITIR, (INICIAR_REPETICAO,)), (_ROTULO, inicio),
+                         (_EMITIR, (REPETIR, fim)), (_NO, no.block), (_EMITIR, (SALTAR, inicio)), (_ROTULO, fim)]
+        elif op in ("sum", "mult", "expression"):
+            operador = no.operator
+            if operador in LOGICOS:
+                fim = self.rotulo()
+                sequencia = [(_NO, no.esq), (_EMITIR, (LOGICOS[operador], fim)), (_NO, no.dir), (_ROTULO, fim)]
+            elif operador in BINARIOS:
+                sequencia = [(_NO, no.esq), (_NO, no.dir), (_EMITIR, (BINARIOS[operador],))]
+            else:
+                raise ValueError(f'operador "{operador}" não suportado pelo gerador de bytecode')
+        elif op == "power":
+            sequencia = [(_NO, no.base), (_NO, no.expoente), (_EMITIR, (POTENCIA,))]
+        elif op == "not":
+            sequencia = [(_NO, no.operand), (_EMITIR, (NAO,))]
+        elif op in COMANDOS_POR_OP:
+            nome, campos = COMANDOS_POR_OP[op]
+            sequencia = [(_NO, getattr(no, campo)) for campo in campos]
+            sequencia.append((_EMITIR, (COMANDO, self.comando(nome, len(campos)))))
+        else:
+            raise ValueError(f'nó "{op}" não suportado pelo gerador de bytecode')
+        tarefas.extend(reversed(sequencia))
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Interface entre os programas em execução e o ambiente (cadeira, tela, sensores).
+
+Os comandos FUNC_IN/FUNC_OUT (MOVA, ESPERE, ESTA_SENTADO, ...) não são executados pela
+máquina virtual: ela chama o método de mesmo nome do hospedeiro, com os argumentos na
+ordem da chamada (hospedeiro.MOVA(ref, dx, dy)). Um hospedeiro implementa apenas os
+comandos que lhe interessam; os demais vão para comando(nome, argumentos).
+
+Um comando que precisa esperar (ESPERE, ESPERE_SENTAR...) sem bloquear a thread pode
+retornar SUSPENDER: a máquina virtual interrompe a execução logo após o comando, e
+MaquinaVirtual.executar() retoma-a do mesmo ponto quando chamada de novo.
+
+Classes:
+    Hospedeiro: Hospedeiro base, que ignora todos os comandos.
+    HospedeiroRegistro: Hospedeiro que registra as chamadas (testes e simulações).
+"""
+
+# Resultado de um comando que suspende a execução do programa
+SUSPENDER = object()
+
+
+class Hospedeiro:
+    """
+    Hospedeiro base: todo comando sem método próprio chama comando(), que não faz nada.
+    """
+
+    def comando(self, nome, argumentos):
+        """
+        Executa um comando sem método próprio no hospedeiro.
+
+        Args:
+            nome (str): Nome do comando (MOVA, ESPERE, ...).
+            argumentos (tuple): Valores dos argumentos, na ordem da chamada.
+
+        Returns:
+            O resultado do comando (usado pelos comandos de entrada; None por padrão).
+        """
+        return None
+
+    def metodo(self, nome):
+        """
+        Retorna a função que executa o comando `nome` neste hospedeiro (o método de mesmo
+        nome ou, sem ele, uma chamada a comando()).
+        """
+        metodo = getattr(self, nome, None)
+        if metodo is not None:
+            return metodo
+        comando = self.comando
+        return lambda *argumentos: comando(nome, argumentos)
+
+
+class HospedeiroRegistro(Hospedeiro):
+    """
+    Hospedeiro que registra cada comando executado em `chamadas`, como (nome, argumentos).
+    Os comandos de entrada retornam None.
+    """
+
+    def __init__(self):
+        self.chamadas = []
+
+    def comando(self, nome, argumentos):
+        self.chamadas.append((nome, argumentos))
+        return None
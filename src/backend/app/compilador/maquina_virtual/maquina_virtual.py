@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+
+from app.compilador.maquina_virtual.bytecode import (
+    CONSTANTE, CARREGAR, GUARDAR,
+    SOMAR, SUBTRAIR, MULTIPLICAR, DIVIDIR, RESTO, POTENCIA,
+    IGUAL, DIFERENTE, MENOR, MAIOR, MENOR_IGUAL, MAIOR_IGUAL,
+    NAO, SALTAR, SALTAR_SE_FALSO, SALTAR_SE_FALSO_OU_DESEMPILHAR, SALTAR_SE_VERDADEIRO_OU_DESEMPILHAR,
+    INICIAR_REPETICAO, REPETIR, COMANDO, PARAR)
+from app.compilador.maquina_virtual.classes_auxiliares import (
+    LIMITE_BITS, ErroExecucao, OrcamentoExcedido, erroNumeroGrande, dividir, resto, potencia, repeticoes)
+from app.compilador.maquina_virtual.hospedeiro import Hospedeiro, SUSPENDER
+
+# Valor das variáveis ainda não atribuídas
+INDEFINIDO = object()
+
+# Tamanho do lote de passos sem limites (na prática, nunca se esgota)
+SEM_LIMITE = sys.maxsize
+
+
+class _Pausa(Exception):
+    """Fim da fatia de passos de executar(fatia): interrompe o laço de execução."""
+
+
+class MaquinaVirtual:
+    """
+    Máquina virtual de pilha que executa um ProgramaCompilado.
+
+    Os operandos ficam em uma pilha (lista Python), as variáveis em uma lista indexada
+    pelo número da variável e as contagens dos REPITA em andamento em uma pilha própria.
+    O laço de execução decodifica cada instrução com uma cadeia de comparações ordenada
+    pela frequência das operações, usando apenas variáveis locais.
+
+    Os comandos são executados pelo hospedeiro (veja hospedeiro.py); o resultado dos
+    comandos de entrada é descartado.
+
+    Cada atribuição, comando, teste de condição (SE e ENQUANTO) e iteração de REPITA
+    consome um passo. Os passos são contados em lotes: o laço apenas decrementa um
+    contador local e, quando ele zera, cobrar() contabiliza o lote, verifica os limites
+    de passos, tempo e memória e define o próximo lote. Um limite excedido interrompe a
+    execução com OrcamentoExcedido, que informa a linha em que o programa estava.
+
+    A execução pode ser suspensa e retomada (execução cooperativa): executar() retorna
+    quando um comando do hospedeiro retorna SUSPENDER ou quando a fatia de passos pedida
+    se esgota, e a chamada seguinte continua do mesmo ponto. Ao fim da fatia, a instrução
+    em que a execução parou é desfeita antes de ter efeito (e cobrada só ao ser retomada).
+    """
+
+    def __init__(self, programa, hospedeiro=None, orcamento=None):
+        """
+        Inicializa os atributos da classe.
+        """
+        self.programa = programa                                # atributo programa: ProgramaCompilado a executar
+        self.hospedeiro = hospedeiro or Hospedeiro()            # atributo hospedeiro: executa os comandos
+        self.orcamento = orcamento                              # atributo orcamento: limites da execução (Orcamento ou None)
+        self.variaveis = [INDEFINIDO] * len(programa.variaveis)  # atributo variaveis: valor de cada variável
+        self.codigo = programa.codigo.tolist()                  # atributo codigo: instruções, como lista (acesso mais rápido)
+        self.comandos = [(self.hospedeiro.metodo(nome), quantidade) for nome, quantidade in programa.comandos]
+        self.pc = 0                                             # atributo pc: posição da próxima instrução
+        self.pilha = []                                         # atributo pilha: pilha de operandos
+        self.contagens = []                                     # atributo contagens: repetições restantes dos REPITA em andamento
+        self.terminado = False                                  # atributo terminado: indica se o programa chegou ao fim
+        self.passos = 0                                         # atributo passos: passos executados (contabilizados)
+        self.lote = SEM_LIMITE                                  # atributo lote: tamanho do lote de passos em andamento
+        self.fimFatia = None                                    # atributo fimFatia: último passo da fatia em andamento (None: sem fatia)
+        self.inicio = None                                      # atributo inicio: instante (monotônico) do início descontadas as suspensões
+        self.decorrido = 0.0                                    # atributo decorrido: segundos de execução até a última suspensão
+
+    def valores(self):
+        """
+        Retorna os valores das variáveis atribuídas, por nome (para variáveis de blocos
+        diferentes com o mesmo nome, vale a de maior índice).
+        """
+        return {nome: valor for nome, valor in zip(self.programa.variaveis, self.variaveis) if valor is not INDEFINIDO}
+
+    def proximoLote(self):
+        """Tamanho do próximo lote de passos (até o próximo limite, verificação ou fim da fatia)."""
+        lote = SEM_LIMITE
+        orcamento = self.orcamento
+        if orcamento is not None:
+            if orcamento.tempo is not None or orcamento.memoria is not None:
+                lote = orcamento.intervalo
+            if orcamento.passos is not None:
+                lote = min(lote, orcamento.passos + 1 - self.passos)
+        if self.fimFatia is not None:
+            lote = min(lote, self.fimFatia + 1 - self.passos)
+        return max(lote, 1)
+
+    def memoria(self, pilha, contagens):
+        """Estimativa dos bytes ocupados pelos valores das variáveis e das pilhas."""
+        tamanho = sys.getsizeof
+        return (tamanho(self.variaveis) + sum(map(tamanho, self.variaveis)) +
+                tamanho(pilha) + sum(map(tamanho, pilha)) + tamanho(contagens))
+
+    def cobrar(self, pc, pilha, contagens):
+        """
+        Contabiliza o lote de passos encerrado e verifica os limites do orçamento e o fim
+        da fatia.
+
+        Returns:
+            int: O tamanho do próximo lote.
+        Raises:
+            OrcamentoExcedido: Caso algum limite tenha sido excedido.
+            _Pausa: Caso a fatia tenha se esgotado (o passo corrente é devolvido).
+        """
+        self.passos += self.lote
+        self.lote = 0
+        orcamento = self.orcamento
+        if orcamento is not None:
+            recurso = None
+            decorrido = time.monotonic() - self.inicio
+            if orcamento.passos is not None and self.passos > orcamento.passos:
+                recurso = "passos"
+            elif orcamento.tempo is not None and decorrido > orcamento.tempo:
+                recurso = "tempo"
+            elif orcamento.memoria is not None and self.memoria(pilha, contagens) > orcamento.memoria:
+                recurso = "memoria"
+            if recurso is not None:
+                raise OrcamentoExcedido(recurso, self.programa.linhaDe(pc - 2), self.passos, decorrido)
+        if self.fimFatia is not None and self.passos > self.fimFatia:
+            self.passos -= 1
+            raise _Pausa()
+        self.lote = self.proximoLote()
+        return self.lote
+
+    def executar(self, fatia=None):
+        """
+        Executa (ou retoma) o programa até o fim, até um comando do hospedeiro retornar
+        SUSPENDER ou, com `fatia`, até executar `fatia` passos.
+
+        Returns:
+            bool: True se o programa terminou; False se a execução foi suspensa.
+        Raises:
+            ErroExecucao: Caso ocorra um erro de execução (com a linha da instrução).
+            OrcamentoExcedido: Caso a execução exceda um limite do orçamento.
+        """
+        if self.terminado:
+            return True
+        self.inicio = time.monotonic() - self.decorrido
+        self.fimFatia = None if fatia is None else self.passos + fatia
+        self.lote = restantes = self.proximoLote()
+        programa = self.programa
+        codigo = self.codigo
+        constantes = programa.constantes
+        variaveis = self.variaveis
+        comandos = self.comandos
+        pilha = self.pilha
+        empilhar, desempilhar = pilha.append, pilha.pop
+        contagens = self.contagens
+        pc = self.pc
+        try:
+            while True:
+                op = codigo[pc]
+                arg = codigo[pc + 1]
+                pc += 2
+                if op == CARREGAR:
+                    valor = variaveis[arg]
+                    if valor is INDEFINIDO:
+                        raise ErroExecucao(f'A variável "{programa.variaveis[arg]}" não tem valor')
+                    empilhar(valor)
+                elif op == CONSTANTE:
+                    empilhar(constantes[arg])
+                elif op == GUARDAR:
+                    restantes -= 1
+                    if not restantes:
+                        restantes = self.cobrar(pc, pilha, contagens)
+                    variaveis[arg] = desempilhar()
+                elif op == SALTAR_SE_FALSO:
+                    restantes -= 1
+                    if not restantes:
+                        restantes = self.cobrar(pc, pilha, contagens)
+                    valor = desempilhar()
+                    if valor is False:
+                        pc = arg
+                    elif valor is not True:
+                        raise ErroExecucao(f"A condição deve ser ALT, mas é {valor!r}")
+                elif op == SALTAR:
+                    pc = arg
+                elif op <= MAIOR_IGUAL:
+                    b = desempilhar()
+                    a = pilha[-1]
+                    if op == SOMAR:
+                        pilha[-1] = a + b
+                    elif op == SUBTRAIR:
+                        pilha[-1] = a - b
+                    elif op == MULTIPLICAR:
+                        if a.__class__ is int and b.__class__ is int and a.bit_length() + b.bit_length() > LIMITE_BITS + 1:
+                            raise erroNumeroGrande()
+                        pilha[-1] = a * b
+                    elif op == MENOR:
+                        pilha[-1] = a < b
+                    elif op == MAIOR:
+                        pilha[-1] = a > b
+                    elif op == IGUAL:
+                        pilha[-1] = a == b
+                    elif op == DIFERENTE:
+                        pilha[-1] = a != b
+                    elif op == MENOR_IGUAL:
+                        pilha[-1] = a <= b
+                    elif op == MAIOR_IGUAL:
+                        pilha[-1] = a >= b
+                    elif op == DIVIDIR:
+                        pilha[-1] = dividir(a, b)
+                    elif op == RESTO:
+                        pilha[-1] = resto(a, b)
+                    else:
+                        pilha[-1] = potencia(a, b)
+                elif op == REPETIR:
+                    if contagens[-1] > 0:
+                        restantes -= 1
+                        if not restantes:
+                            restantes = self.cobrar(pc, pilha, contagens)
+                        contagens[-1] -= 1
+                    else:
+                        contagens.pop()
+                        pc = arg
+                elif op == COMANDO:
+                    restantes -= 1
+                    if not restantes:
+                        restantes = self.cobrar(pc, pilha, contagens)
+                    funcao, quantidade = comandos[arg]
+                    if quantidade:
+                        argumentos = pilha[-quantidade:]
+                        del pilha[-quantidade:]
+                        resultado = funcao(*argumentos)
+                    else:
+                        resultado = funcao()
+                    if resultado is SUSPENDER:
+                        return False
+                elif op == NAO:
+                    valor = pilha[-1]
+                    if valor.__class__ is not bool:
+                        raise ErroExecucao(f"NAO exige um valor ALT, mas recebeu {valor!r}")
+                    pilha[-1] = not valor
+                elif op == SALTAR_SE_FALSO_OU_DESEMPILHAR:
+                    if pilha[-1] is False:
+                        pc = arg
+                    else:
+                        desempilhar()
+                elif op == SALTAR_SE_VERDADEIRO_OU_DESEMPILHAR:
+                    if pilha[-1] is True:
+                        pc = arg
+                    else:
+                        desempilhar()
+                elif op == INICIAR_REPETICAO:
+                    contagens.append(repeticoes(desempilhar()))
+                elif op == PARAR:
+                    self.terminado = True
+                    return True
+                else:
+                    raise ErroExecucao(f"Instrução inválida: {op}")
+        except _Pausa:
+            pc -= 2
+            return False
+        except ErroExecucao as erro:
+            self.terminado = True
+            if erro.linha is not None:
+                raise
+            linha = programa.linhaDe(pc - 2)
+            raise ErroExecucao(f"{erro}, na linha {linha}", linha) from None
+        except (TypeError, ValueError, OverflowError, ZeroDivisionError) as erro:
+            self.terminado = True
+            linha = programa.linhaDe(pc - 2)
+            raise ErroExecucao(f"Erro de execução: {erro}, na linha {linha}", linha) from erro
+        finally:
+            self.passos += self.lote - restantes
+            self.pc = pc
+            self.decorrido = time.monotonic() - self.inicio
@@ -0,0 +1,65 @@
+import pickle
+import time
+
+import pytest
+
+from app.compilador.maquina_virtual.classes_auxiliares import ErroExecucao, Orcamento, OrcamentoExcedido
+from app.compilador.maquina_virtual.maquina_virtual import MaquinaVirtual
+
+
+LACO_INFINITO = '"p"\nx : 0\nENQUANTO (verdadeiro) {\n  x : x + 1\n}\n'
+
+
+def test_limite_de_passos_exato(compilar):
+    maquina = MaquinaVirtual(compilar(LACO_INFINITO), orcamento=Orcamento(passos=1000))
+    with pytest.raises(OrcamentoExcedido) as erro:
+        maquina.executar()
+    assert erro.value.recurso == "passos"
+    assert erro.value.passos == 1001
+    assert erro.value.linha in (3, 4)
+
+def test_limite_de_tempo(compilar):
+    maquina = MaquinaVirtual(compilar(LACO_INFINITO), orcamento=Orcamento(tempo=0.05))
+    inicio = time.monotonic()
+    with pytest.raises(OrcamentoExcedido) as erro:
+        maquina.executar()
+    assert erro.value.recurso == "tempo"
+    assert time.monotonic() - inicio < 1
+
+def test_orcamento_excedido_pode_ser_serializado(compilar):
+    maquina = MaquinaVirtual(compilar(LACO_INFINITO), orcamento=Orcamento(passos=10))
+    with pytest.raises(OrcamentoExcedido) as erro:
+        maquina.executar()
+    copia = pickle.loads(pickle.dumps(erro.value))
+    assert (copia.recurso, copia.linha, copia.passos, str(copia)) == \
+        (erro.value.recurso, erro.value.linha, erro.value.passos, str(erro.value))
+
+@pytest.mark.parametrize("expressao", ["x * x", "x ^ 5", "x ^ 64"])
+def test_numeros_que_crescem_sem_limite_param_a_execucao(compilar, expressao):
+    # Uma única multiplicação de inteiros enormes não seria interrompida pelo orçamento
+    codigo = f'"p"\nx : 2\nENQUANTO (verdadeiro) {{\n  x : {expressao}\n}}\n'
+    maquina = MaquinaVirtual(compilar(codigo), orcamento=Orcamento(passos=10 ** 6, tempo=2, memoria=10 ** 7))
+    inicio = time.monotonic()
+    with pytest.raises(ErroExecucao) as erro:
+        maquina.executar()
+    assert "Número grande demais" in str(erro.value)
+    assert erro.value.linha == 4
+    assert time.monotonic() - inicio < 1
+
+def test_soma_cresce_limitada_pelo_orcamento(compilar):
+    codigo = '"p"\nx : 1\nENQUANTO (verdadeiro) {\n  x : x + x\n}\n'
+    maquina = MaquinaVirtual(compilar(codigo), orcamento=Orcamento(passos=10 ** 6, tempo=0.5, memoria=10 ** 7))
+    inicio = time.monotonic()
+    with pytest.raises(OrcamentoExcedido):
+        maquina.executar()
+    assert time.monotonic() - inicio < 2
+
+def test_fatias_retomam_do_mesmo_ponto(compilar):
+    codigo = '"p"\nx : 0\nREPITA (100) {\n  x : x + 1\n}\n'
+    maquina = MaquinaVirtual(compilar(codigo))
+    fatias = 1
+    while not maquina.executar(fatia=7):
+        fatias += 1
+    assert maquina.valores() == {"x": 100}
+    assert maquina.passos == 201
+    assert fatias == 29
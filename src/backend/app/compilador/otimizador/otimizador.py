@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+
+"""
+Otimizador da árvore sintática.
+
+Passagens (todas iterativas, sobre a árvore alterada no lugar):
+    dobrar_constantes: Substitui expressões de operandos constantes (sum, mult, power,
+        expression, not) pela folha "num"/"alt" com o seu valor, e simplifica E/OU com
+        um operando constante (x E falso -> falso, x OU verdadeiro -> verdadeiro).
+    eliminar_desvios: Remove os desvios decididos em tempo de compilação e os blocos
+        inalcançáveis ou vazios: SE com condição constante é trocado pelas declarações do
+        bloco escolhido, ENQUANTO (falso) e REPITA com contagem <= 0 são removidos, assim
+        como SE e REPITA sem declarações; um SENAO vazio é descartado.
+    eliminar_atribuicoes_mortas: Remove as atribuições cujo valor nunca é lido: as de
+        variáveis que não são lidas em nenhum ponto do programa e as sobrescritas, na
+        mesma lista de declarações, antes de qualquer leitura.
+
+As expressões da linguagem não têm efeitos colaterais, então descartá-las é seguro. As
+variáveis são identificadas pelo Simbolo anotado pelo analisador semântico, ou pelo
+nome, se a árvore não foi anotada.
+"""
+
+import time
+
+from app.compilador.analisador_sintatico.classes_auxiliares import NoInterno, NoFolha
+from app.compilador.analisador_sintatico.visitante import pre_ordem, pos_ordem
+
+# Folhas das constantes
+VERDADEIRO, FALSO = "verdadeiro", "falso"
+
+# Maior valor absoluto de um NUM dobrado (inteiros exatos em JavaScript e nos dispositivos);
+# expressões com resultados maiores ficam como estão
+LIMITE_NUM = 2 ** 53
+
+# Ops das expressões
+EXPRESSOES = frozenset(["sum", "mult", "power", "expression", "not"])
+
+
+def _num(a, b):
+    return a.__class__ is int and b.__class__ is int
+
+
+def _alt(a, b):
+    return a.__class__ is bool and b.__class__ is bool
+
+
+def _potencia(base, expoente):
+    if expoente < 0 or (abs(base) > 1 and expoente * abs(base).bit_length() > 64):
+        return None
+    return base ** expoente
+
+
+# operador -> (verificação dos operandos, operação). A operação retorna None quando o
+# resultado não é representável (divisão não exata, MOD de negativos...)
+OPERACOES = {
+    "+": (_num, lambda a, b: a + b),
+    "-": (_num, lambda a, b: a - b),
+    "*": (_num, lambda a, b: a * b),
+    "/": (_num, lambda a, b: a // b if b and a % b == 0 else None),
+    "MOD": (_num, lambda a, b: a % b if b > 0 and a >= 0 else None),
+    "^": (_num, _potencia),
+    "**": (_num, _potencia),
+    "E": (_alt, lambda a, b: a and b),
+    "OU": (_alt, lambda a, b: a or b),
+    "=": (lambda a, b: a.__class__ is b.__class__, lambda a, b: a == b),
+    "<>": (lambda a, b: a.__class__ is b.__class__, lambda a, b: a != b),
+    "<": (_num, lambda a, b: a < b),
+    ">": (_num, lambda a, b: a > b),
+    "<=": (_num, lambda a, b: a <= b),
+    ">=": (_num, lambda a, b: a >= b),
+}
+
+# Operando constante que decide sozinho o resultado de E/OU
+ABSORVENTES = {"E": False, "OU": True}
+
+
+def valorConstante(no):
+    """
+    Valor de uma folha constante: int para "num", bool para "alt" (None se não for
+    uma constante).
+    """
+    if no.__class__ is NoFolha:
+        if no.op == "num":
+            try:
+                return int(no.valor)
+            except ValueError:
+                return None
+        if no.op == "alt":
+            return no.valor == VERDADEIRO
+    return None
+
+
+def folhaConstante(valor, linha):
+    """
+    Folha "num" ou "alt" com o valor `valor` (int ou bool).
+    """
+    if valor.__class__ is bool:
+        folha = NoFolha("alt", VERDADEIRO if valor else FALSO, linha)
+        folha.tipoDado = "ALT"
+    else:
+        folha = NoFolha("num", str(valor), linha)
+        folha.tipoDado = "NUM"
+    return folha
+
+
+def linhaDe(no):
+    """Linha da primeira folha de `no` (None se não houver)."""
+    for folha in pre_ordem(no):
+        if folha.__class__ is NoFolha:
+            return folha.linha
+    return None
+
+
+class Otimizador:
+    """
+    Aplica as passagens de otimização à árvore sintática (alterada no lugar).
+
+    Depois de otimizar(), `estatisticas` contém, para cada passagem, a quantidade de
+    alterações e o tempo gasto, e `nosAntes`/`nosDepois` o tamanho da árvore.
+    """
+
+    PASSAGENS = ("dobrar_constantes", "eliminar_desvios", "eliminar_atribuicoes_mortas")
+
+    def __init__(self, arvore):
+        """
+        Inicializa os atributos da classe.
+        """
+        self.arvore = arvore            # atributo arvore: raiz da árvore sintática (NoInterno "program")
+        self.estatisticas = {passagem: {"alteracoes": 0, "tempo": 0.0} for passagem in self.PASSAGENS}
+        self.nosAntes = 0               # atributo nosAntes: quantidade de nós antes da otimização
+        self.nosDepois = 0              # atributo nosDepois: quantidade de nós depois da otimização
+
+    def otimizar(self):
+        """
+        Otimiza a árvore. A eliminação de desvios e a de atribuições mortas se repetem
+        enquanto uma delas alterar a árvore (uma remoção pode esvaziar um bloco, que
+        pode conter a única leitura de uma variável).
+
+        Returns:
+            NoInterno: A própria árvore, otimizada.
+        """
+        self.nosAntes = sum(1 for _ in pre_ordem(self.arvore))
+        self.executar("dobrar_constantes", self.dobrarConstantes)
+        while self.executar("eliminar_desvios", self.eliminarDesvios) + \
+                self.executar("eliminar_atribuicoes_mortas", self.eliminarAtribuicoesMortas):
+            pass
+        self.nosDepois = sum(1 for _ in pre_ordem(self.arvore))
+        return self.arvore
+
+    def executar(self, passagem, metodo):
+        """
+        Executa uma passagem, acumulando as suas estatísticas. Retorna a quantidade de
+        alterações.
+        """
+        inicio = time.perf_counter()
+        alteracoes = metodo()
+        estatisticas = self.estatisticas[passagem]
+        estatisticas["alteracoes"] += alteracoes
+        estatisticas["tempo"] += time.perf_counter() - inicio
+        return alteracoes
+
+    # Dobramento de constantes
+
+    def dobrarConstantes(self):
+        """
+        Substitui as expressões constantes pelas suas folhas. Em pós-ordem, cada nó
+        dobra os filhos diretos, cujos operandos já foram dobrados.
+        """
+        alteracoes = 0
+        for no in pos_ordem(self.arvore):
+            if no.__class__ is NoFolha:
+                continue
+            for campo in no.campos:
+                filho = getattr(no, campo)
+                if filho.__class__ is list:
+                    for i, item in enumerate(filho):
+                        dobrado = self.dobrar(item)
+                        if dobrado is not item:
+                            filho[i] = dobrado
+                            alteracoes += 1
+                else:
+                    dobrado = self.dobrar(filho)
+                    if dobrado is not filho:
+                        setattr(no, campo, dobrado)
+                        alteracoes += 1
+        return alteracoes
+
+    @staticmethod
+    def dobrar(no):
+        """
+        Retorna a folha que substitui a expressão `no`, ou o próprio `no`.
+        """
+        if not isinstance(no, NoInterno) or no.op not in EXPRESSOES:
+            return no
+        operador = no.operator
+        if no.op == "not":
+            valor = valorConstante(no.operand)
+            if valor.__class__ is bool:
+                return folhaConstante(not valor, linhaDe(no))
+            return no
+
+        esq, dir = (no.base, no.expoente) if no.op == "power" else (no.esq, no.dir)
+        a, b = valorConstante(esq), valorConstante(dir)
+        if a is None or b is None:
+            absorvente = ABSORVENTES.get(operador)
+            constante, outro = (b, esq) if a is None else (a, dir)
+            if absorvente is None or constante.__class__ is not bool:
+                return no
+            if constante is absorvente:
+                return folhaConstante(absorvente, linhaDe(no))
+            # x E verdadeiro -> x, x OU falso -> x (só com o tipo ALT confirmado)
+            return outro if outro.tipoDado == "ALT" else no
+
+        verificar, operacao = OPERACOES.get(operador, (None, None))
+        if verificar is None or not verificar(a, b):
+            return no
+        valor = operacao(a, b)
+        if valor is None or (valor.__class__ is int and abs(valor) > LIMITE_NUM):
+            return no
+        return folhaConstante(valor, linhaDe(no))
+
+    # Eliminação de desvios
+
+    def eliminarDesvios(self):
+        """
+        Reescreve as listas de declarações, das mais internas para as externas, sem os
+        desvios decididos em tempo de compilação nem os blocos vazios.
+        """
+        alteracoes = 0
+        for no in pos_ordem(self.arvore):
+            if no.__class__ is NoFolha or no.op != "statementList":
+                continue
+            declaracoes = []
+            alterada = False
+            for declaracao in no.statements:
+                if declaracao.op == "if" and declaracao.else_block is not None \
+                        and not declaracao.else_block.statements.statements:
+                    declaracao.else_block = None
+                    alteracoes += 1
+                substituta = self.simplificar(declaracao)
+                if substituta is declaracao:
+                    declaracoes.append(declaracao)
+                    continue
+                alteracoes += 1
+                alterada = True
+                if substituta is not None:
+                    declaracoes.extend(substituta)
+            if alterada:
+                no.statements = declaracoes
+        return alteracoes
+
+    @staticmethod
+    def simplificar(declaracao):
+        """
+        Retorna a própria declaração, a lista de declarações que a substituem ou None,
+        se ela deve ser removida.
+        """
+        op = declaracao.op
+        if op == "if":
+            condicao = valorConstante(declaracao.condition)
+            if condicao.__class__ is bool:
+                bloco = declaracao.then_block if condicao else declaracao.else_block
+                return bloco.statements.statements if bloco is not None else None
+            if declaracao.else_block is None and not declaracao.then_block.statements.statements:
+                return None
+        elif op == "while":
+            if valorConstante(declaracao.condition) is False:
+                return None
+        elif op == "repeat":
+            vezes = valorConstante(declaracao.times)
+            if (vezes.__class__ is int and vezes <= 0) or not declaracao.block.statements.statements:
+                return None
+        return declaracao
+
+    # Eliminação de atribuições mortas
+
+    @staticmethod
+    def chave(folha):
+        """Identificação da variável de uma folha "id": o Simbolo ou, sem ele, o nome."""
+        return folha.simbolo if folha.simbolo is not None else folha.valor
+
+    def leituras(self, no):
+        """
+        Gera as chaves das variáveis lidas em `no` (os "id" que não são alvo de atribuição).
+        """
+        alvos = set()
+        for filho in pre_ordem(no):
+            if filho.__class__ is NoFolha:
+                if filho.op == "id" and id(filho) not in alvos:
+                    yield self.chave(filho)
+            elif filho.op == "assign":
+                alvos.add(id(filho.id))
+
+    def eliminarAtribuicoesMortas(self):
+        """
+        Marca como mortas as atribuições sobrescritas antes de uma leitura na mesma lista
+        de declarações e, depois, as de variáveis sem nenhuma leitura restante (removendo
+        uma atribuição, as leituras do seu valor também deixam de contar). Remove as
+        marcadas das suas listas.
+        """
+        contagem = {}       # chave -> leituras da variável no programa
+        for chave in self.leituras(self.arvore):
+            contagem[chave] = contagem.get(chave, 0) + 1
+        atribuicoes = {}    # chave -> atribuições à variável
+        mortas = set()
+        for no in pre_ordem(self.arvore):
+            if no.__class__ is NoFolha or no.op != "statementList":
+                continue
+            pendentes = {}  # chave -> última atribuição desta lista ainda sem leitura
+            for declaracao in no.statements:
+                if pendentes:
+                    for chave in self.leituras(declaracao):
+                        pendentes.pop(chave, None)
+                if declaracao.op == "assign":
+                    chave = self.chave(declaracao.id)
+                    atribuicoes.setdefault(chave, []).append(declaracao)
+                    anterior = pendentes.get(chave)
+                    if anterior is not None:
+                        mortas.add(id(anterior))
+                    pendentes[chave] = declaracao
+
+        # Propaga: variáveis sem leituras tornam mortas todas as suas atribuições
+        porId = {id(a): a for lista in atribuicoes.values() for a in lista}
+        fila = list(mortas)
+        for chave, lista in atribuicoes.items():
+            if not contagem.get(chave):
+                for atribuicao in lista:
+                    # Cada atribuição entra na fila uma única vez
+                    if id(atribuicao) not in mortas:
+                        mortas.add(id(atribuicao))
+                        fila.append(id(atribuicao))
+        while fila:
+            for chave in self.leituras(porId[fila.pop()].value):
+                contagem[chave] -= 1
+                if contagem[chave] == 0:
+                    for atribuicao in atribuicoes.get(chave, ()):
+                        if id(atribuicao) not in mortas:
+                            mortas.add(id(atribuicao))
+                            fila.append(id(atribuicao))
+
+        if mortas:
+            for no in pre_ordem(self.arvore):
+                if no.__class__ is not NoFolha and no.op == "statementList":
+                    no.statements = [d for d in no.statements if id(d) not in mortas]
+        return len(mortas)
@@ -0,0 +1,90 @@
+import pytest
+
+from app.compilador.maquina_virtual.gerador_bytecode import GeradorBytecode
+from app.compilador.maquina_virtual.hospedeiro import HospedeiroRegistro
+from app.compilador.maquina_virtual.maquina_virtual import MaquinaVirtual
+from app.compilador.otimizador.otimizador import Otimizador
+
+
+def executar(arvore):
+    """
+    Executa a árvore na MaquinaVirtual e retorna os comandos chamados.
+    """
+    hospedeiro = HospedeiroRegistro()
+    MaquinaVirtual(GeradorBytecode(arvore).gerar(), hospedeiro).executar()
+    return hospedeiro.chamadas
+
+def declaracoes(arvore):
+    return [declaracao.op for declaracao in arvore.statements.statements]
+
+@pytest.fixture
+def otimizar(analisar):
+    """otimizar(codigo): a árvore otimizada e as alterações de cada passagem."""
+    def otimizar(codigo):
+        otimizador = Otimizador(analisar(codigo))
+        arvore = otimizador.otimizar()
+        alteracoes = {passagem: e["alteracoes"] for passagem, e in otimizador.estatisticas.items()}
+        return arvore, alteracoes
+    return otimizar
+
+@pytest.fixture
+def verify_same_behavior(analisar, otimizar):
+    """
+    verify_same_behavior(codigo): verifica que o programa otimizado chama os mesmos
+    comandos que o original.
+    """
+    def verify_same_behavior(codigo):
+        arvore, _ = otimizar(codigo)
+        assert executar(arvore) == executar(analisar(codigo))
+    return verify_same_behavior
+
+
+def test_dobrar_constantes(otimizar):
+    arvore, alteracoes = otimizar('"p"\nx : 2 * 3 + 4\nESCREVA(x)\n')
+    atribuicao = arvore.statements.statements[0]
+    assert atribuicao.value.op == "num" and atribuicao.value.valor == "10"
+    assert alteracoes["dobrar_constantes"] > 0
+
+def test_dobrar_constantes_mantem_divisao_nao_exata(otimizar, verify_same_behavior):
+    arvore, _ = otimizar('"p"\nx : 7 / 2\nESCREVA(x)\n')
+    assert arvore.statements.statements[0].value.op != "num"
+    verify_same_behavior('"p"\nx : 7 / 2\nESCREVA(x)\n')
+
+def test_dobrar_e_ou_com_operando_constante(otimizar):
+    arvore, _ = otimizar('"p"\nx : 1\nSE ((x > 0) E falso) {\n  ESCREVA(1)\n}\nESCREVA(x)\n')
+    assert declaracoes(arvore) == ["assign", "escreva"]
+
+def test_eliminar_desvios(otimizar, verify_same_behavior):
+    codigo = ('"p"\nSE (1 < 2) {\n  ESCREVA(1)\n} SENAO {\n  ESCREVA(2)\n}\n'
+              'ENQUANTO (falso) {\n  ESCREVA(3)\n}\nREPITA (0) {\n  ESCREVA(4)\n}\n')
+    arvore, alteracoes = otimizar(codigo)
+    assert declaracoes(arvore) == ["escreva"]
+    assert alteracoes["eliminar_desvios"] == 3
+    verify_same_behavior(codigo)
+
+def test_eliminar_atribuicao_sobrescrita(otimizar):
+    arvore, alteracoes = otimizar('"p"\nx : 1\nx : 2\nESCREVA(x)\n')
+    assert declaracoes(arvore) == ["assign", "escreva"]
+    assert arvore.statements.statements[0].value.valor == "2"
+    assert alteracoes["eliminar_atribuicoes_mortas"] == 1
+
+def test_eliminar_atribuicoes_de_variavel_sem_leitura(otimizar):
+    # Removida x : y * 2, a leitura de y deixa de contar e y : 5 também é removida
+    arvore, alteracoes = otimizar('"p"\ny : 5\nx : y * 2\nESCREVA(1)\n')
+    assert declaracoes(arvore) == ["escreva"]
+    assert alteracoes["eliminar_atribuicoes_mortas"] == 2
+
+def test_atribuicao_sobrescrita_de_variavel_sem_leitura_conta_uma_vez(otimizar, verify_same_behavior):
+    # x : y é sobrescrita e x nunca é lida: a leitura de y só pode ser descontada uma vez
+    codigo = '"p"\ny : 1\nx : y\nx : 2\nESCREVA(y)\n'
+    arvore, alteracoes = otimizar(codigo)
+    assert declaracoes(arvore) == ["assign", "escreva"]
+    assert arvore.statements.statements[0].id.valor == "y"
+    assert alteracoes["eliminar_atribuicoes_mortas"] == 2
+    verify_same_behavior(codigo)
+
+def test_mantem_atribuicao_lida_no_laco(otimizar, verify_same_behavior):
+    codigo = '"p"\nx : 0\nREPITA (3) {\n  ESCREVA(x)\n  x : x + 1\n}\n'
+    arvore, alteracoes = otimizar(codigo)
+    assert alteracoes["eliminar_atribuicoes_mortas"] == 0
+    verify_same_behavior(codigo)
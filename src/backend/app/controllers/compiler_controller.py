@@ -1,11 +1,20 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+import base64
+import json
+
+from fastapi import APIRouter, HTTPException, Response
+from typing import List, Dict, Any, Literal, Optional
 from pydantic import BaseModel
 
 from app.compilador.analisador_lexico.analisador_lexico import AnalisadorLexico
 from app.compilador.analisador_lexico.classes_auxiliares import LexicalException
 from app.compilador.analisador_sintatico.analisador_sintatico import AnalisadorSintatico
 from app.compilador.analisador_sintatico.classes_auxiliares import SyntaxException
+from app.compilador.analisador_sintatico.serializador import para_json, para_binario
+from app.compilador.analisador_semantico.analisador_semantico import AnalisadorSemantico
+from app.compilador.analisador_semantico.classes_auxiliares import SemanticException
+from app.compilador.otimizador.otimizador import Otimizador
+from app.compilador.gerador_codigo.gerador_javascript import GeradorJavaScript
+from app.compilador.estimador_custo.estimador_custo import EstimadorCusto
 
 router = APIRouter()
 
@@ -15,13 +24,28 @@ class CompilationRequest(BaseModel):
     
     Attributes:
         source_code (str): Source code to be analyzed/compiled
+        tree_format (str): Syntax tree format in /compile responses: "text" (repr of the
+            tree), "json" (structured JSON) or "binary" (compact binary format, base64)
+        recover (bool): Diagnostics mode for /compile: collect every lexical, syntactic
+            and semantic error in one pass and return them with a partial syntax tree
+            instead of failing on the first error
+        optimize (bool): Run the optimizer on the syntax tree in /compile (constant
+            folding, dead-branch and dead-store elimination) and return its statistics
+        target (str | None): Code generation target for /compile: "js" returns the program
+            as a self-contained JavaScript (ES) module, run in the browser with a host
+            object that implements the FUNC_IN/FUNC_OUT commands
     """
     source_code: str
+    tree_format: Literal["text", "json", "binary"] = "text"
+    recover: bool = False
+    optimize: bool = False
+    target: Optional[Literal["js"]] = None
     
     class Config:
         schema_extra = {
             "example": {
-                "source_code": "number1 : 5\nnumber2 RECEBA 10\n"
+                "source_code": "number1 : 5\nnumber2 RECEBA 10\n",
+                "tree_format": "json"
             }
         }
 
@@ -54,6 +78,86 @@ def token_to_dict(token) -> Dict[str, Any]:
         "line": token.linha
     }
 
+def diagnostic_to_dict(stage: str, error: Exception) -> Dict[str, Any]:
+    """
+    Converts a lexical, syntactic or semantic error to a diagnostic dictionary.
+    
+    Args:
+        stage (str): Compilation step that found the error ("lexical", "syntactic" or "semantic")
+        error (Exception): LexicalException, SyntaxException or SemanticException
+        
+    Returns:
+        Dict[str, Any]: Dictionary representing the diagnostic
+    """
+    return {
+        "stage": stage,
+        "message": str(error),
+        "line": error.linha
+    }
+
+def symbol_to_dict(symbol) -> Dict[str, Any]:
+    """
+    Converts a Simbolo from the semantic analyzer's symbol table to a dictionary.
+    
+    Args:
+        symbol: Simbolo object (a program variable)
+        
+    Returns:
+        Dict[str, Any]: Dictionary representing the variable
+    """
+    return {
+        "name": symbol.nome,
+        "type": symbol.tipo,
+        "line": symbol.linha,
+        "scope_depth": symbol.nivel,
+        "reads": symbol.leituras,
+        "writes": symbol.escritas
+    }
+
+def optimization_to_dict(optimizer) -> Dict[str, Any]:
+    """
+    Converts the statistics of an Otimizador run to a dictionary.
+    
+    Args:
+        optimizer: Otimizador that already optimized the tree
+        
+    Returns:
+        Dict[str, Any]: Tree size before/after and, per pass, the number of changes
+        and the time spent in milliseconds
+    """
+    return {
+        "nodes_before": optimizer.nosAntes,
+        "nodes_after": optimizer.nosDepois,
+        "passes": [
+            {
+                "name": name,
+                "changes": stats["alteracoes"],
+                "time_ms": round(stats["tempo"] * 1000, 3)
+            }
+            for name, stats in optimizer.estatisticas.items()
+        ]
+    }
+
+def estimate_to_dict(estimate) -> Dict[str, Any]:
+    """
+    Converts the static cost Estimativa of a program to a dictionary.
+    
+    Args:
+        estimate: Estimativa computed by EstimadorCusto
+        
+    Returns:
+        Dict[str, Any]: Upper bounds on executed steps, total ESPERE time (ms) and
+        ESPERE_SENTAR/ESPERE_LEVANTAR waits (null when unbounded), and the loops and
+        waits that could not be bounded
+    """
+    return {
+        "bounded": estimate.limitado,
+        "max_steps": estimate.passos,
+        "max_wait_ms": estimate.espera,
+        "max_patient_waits": estimate.esperasPaciente,
+        "warnings": [{"line": line, "message": message} for line, message in estimate.alertas]
+    }
+
 @router.post("/lexical-analysis", 
             response_model=List[TokenResponse],
             tags=["Compiler"],
@@ -74,8 +178,7 @@ async def lexical_analysis(request: CompilationRequest):
     """
     try:
         analyzer = AnalisadorLexico(request.source_code)
-        tokens = analyzer.getTokens()
-        return [token_to_dict(token) for token in tokens]
+        return [token_to_dict(token) for token in analyzer.iter_tokens()]
     except LexicalException as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -84,38 +187,90 @@ async def lexical_analysis(request: CompilationRequest):
 @router.post("/compile",
             tags=["Compiler"],
             summary="Performs complete compilation",
-            description="Receives source code and performs the complete compilation process (currently only lexical analysis and partial syntactic analysis).")
+            description="Receives source code and performs the complete compilation process (currently lexical, syntactic and semantic analysis).")
 async def compile_code(request: CompilationRequest):
     """
-    Main compilation endpoint. Currently performs lexical and partial syntactic analysis.
+    Main compilation endpoint. Currently performs lexical, syntactic and semantic analysis.
     
     Args:
         request (CompilationRequest): Request containing the source code
         
     Returns:
-        Dict: Compilation result containing tokens and syntax tree
+        Response: JSON compilation result containing tokens, the syntax tree in the
+        requested format, that format (tree_format) and the program variables found by
+        the semantic analysis (symbols) and the static cost estimate of the program
+        (estimate, null if the program has errors). With optimize, the tree is the optimized one
+        and the optimizer statistics are returned in optimization. With target, the generated
+        code is returned in code (null if the program has errors). In diagnostics mode (recover)
+        it also contains the list of errors found (diagnostics), and the syntax tree is
+        partial (statements with errors are left out) or null
         
     Raises:
         HTTPException: If there's an error in any compilation step
     """
     try:
         # Lexical Analysis
-        lexical_analyzer = AnalisadorLexico(request.source_code)
-        tokens = lexical_analyzer.getTokens()
+        lexical_analyzer = AnalisadorLexico(request.source_code, recover=request.recover)
+        tokens = lexical_analyzer.getTokenBuffer()
         
         # Syntactic Analysis
-        syntactic_analyzer = AnalisadorSintatico(tokens)
+        syntactic_analyzer = AnalisadorSintatico(tokens, recuperar=request.recover)
         syntax_tree = syntactic_analyzer.analisar()
         
-        # Prepare response
-        return {
-            "tokens": [token_to_dict(token) for token in tokens],
-            "syntax_tree": str(syntax_tree)  # For now, just string representation
-        }
+        # Semantic Analysis (annotates the tree with types and symbols)
+        semantic_analyzer = None
+        if syntax_tree is not None:
+            semantic_analyzer = AnalisadorSemantico(syntax_tree, recuperar=request.recover)
+            semantic_analyzer.analisar()
+        symbols = semantic_analyzer.tabela.simbolos if semantic_analyzer else []
+        
+        # Optimization
+        optimizer = None
+        if request.optimize and syntax_tree is not None:
+            optimizer = Otimizador(syntax_tree)
+            syntax_tree = optimizer.otimizar()
+        
+        # Cost estimate and code generation (only for programs without errors)
+        estimate = code = None
+        has_errors = lexical_analyzer.errors or syntactic_analyzer.erros or (semantic_analyzer and semantic_analyzer.erros)
+        if syntax_tree is not None and not has_errors:
+            estimate = estimate_to_dict(EstimadorCusto(syntax_tree).estimar())
+            if request.target == "js":
+                code = GeradorJavaScript(syntax_tree).gerar()
+        
+        # Prepare response (written directly, so the JSON tree is not re-encoded)
+        if request.tree_format == "json":
+            tree = para_json(syntax_tree)
+        elif request.tree_format == "binary":
+            tree = json.dumps(base64.b64encode(para_binario(syntax_tree)).decode('ascii'))
+        elif syntax_tree is None:
+            tree = "null"
+        else:
+            tree = json.dumps(str(syntax_tree), ensure_ascii=False)
+        body = '{"tokens":%s,"syntax_tree":%s,"tree_format":"%s","symbols":%s,"estimate":%s' % (
+            json.dumps([token_to_dict(token) for token in tokens], ensure_ascii=False),
+            tree,
+            request.tree_format,
+            json.dumps([symbol_to_dict(symbol) for symbol in symbols], ensure_ascii=False),
+            json.dumps(estimate, ensure_ascii=False)
+        )
+        if optimizer:
+            body += ',"optimization":%s' % json.dumps(optimization_to_dict(optimizer))
+        if request.target:
+            body += ',"target":"%s","code":%s' % (request.target, json.dumps(code, ensure_ascii=False))
+        if request.recover:
+            diagnostics = [diagnostic_to_dict("lexical", error) for error in lexical_analyzer.errors]
+            diagnostics += [diagnostic_to_dict("syntactic", error) for error in syntactic_analyzer.erros]
+            if semantic_analyzer:
+                diagnostics += [diagnostic_to_dict("semantic", error) for error in semantic_analyzer.erros]
+            body += ',"diagnostics":%s' % json.dumps(diagnostics, ensure_ascii=False)
+        return Response(content=body + '}', media_type="application/json")
         
     except LexicalException as e:
         raise HTTPException(status_code=400, detail=f"Lexical error: {str(e)}")
     except SyntaxException as e:
         raise HTTPException(status_code=400, detail=f"Syntactic error: {str(e)}")
+    except SemanticException as e:
+        raise HTTPException(status_code=400, detail=f"Semantic error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,137 @@
+import asyncio
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from app.compilador.analisador_lexico.analisador_lexico import AnalisadorLexico
+from app.compilador.analisador_lexico.classes_auxiliares import LexicalException
+from app.compilador.analisador_sintatico.analisador_sintatico import AnalisadorSintatico
+from app.compilador.analisador_sintatico.classes_auxiliares import SyntaxException
+from app.compilador.analisador_semantico.analisador_semantico import AnalisadorSemantico
+from app.compilador.analisador_semantico.classes_auxiliares import SemanticException
+from app.compilador.maquina_virtual.classes_auxiliares import Orcamento
+from app.compilador.maquina_virtual.gerador_bytecode import GeradorBytecode
+from app.services.render_stream import RenderStream
+from app.services.session_service import scheduler
+
+router = APIRouter()
+
+# Interval between render frames, in seconds
+FRAME_INTERVAL = 1 / 30
+
+POSTURES = {"seated": True, "standing": False}
+
+# Server-side budget of every session (the time counts execution only, not waits);
+# a client-supplied max_steps can only lower the step limit
+MAX_STEPS = 10_000_000
+MAX_TIME = 10.0
+MAX_MEMORY = 16 * 1024 * 1024
+
+def session_budget(max_steps=None) -> Orcamento:
+    """
+    Budget of a session: the server limits, with the step limit lowered to max_steps.
+
+    Raises:
+        ValueError: If max_steps is not a positive integer
+    """
+    steps = MAX_STEPS
+    if max_steps is not None:
+        if max_steps.__class__ is not int or max_steps <= 0:
+            raise ValueError("max_steps must be a positive integer")
+        steps = min(max_steps, MAX_STEPS)
+    return Orcamento(passos=steps, tempo=MAX_TIME, memoria=MAX_MEMORY)
+
+def compile_program(source_code: str):
+    """
+    Compiles source code to bytecode for a session.
+
+    Raises:
+        LexicalException, SyntaxException, SemanticException: If the program has errors
+    """
+    tokens = AnalisadorLexico(source_code).getTokenBuffer()
+    syntax_tree = AnalisadorSintatico(tokens).analisar()
+    AnalisadorSemantico(syntax_tree).analisar()
+    return GeradorBytecode(syntax_tree).gerar()
+
+async def receive_controls(websocket: WebSocket, session):
+    """
+    Applies the control messages of the client to a running session until it disconnects
+    (messages that are not JSON objects are ignored).
+    """
+    try:
+        while True:
+            message = await websocket.receive_json()
+            if not isinstance(message, dict):
+                continue
+            if message.get("posture") in POSTURES:
+                session.set_posture(POSTURES[message["posture"]])
+            elif message.get("type") == "stop":
+                session.cancel()
+    except (WebSocketDisconnect, ValueError):
+        session.cancel()
+
+@router.websocket("/sessions/stream")
+async def session_stream(websocket: WebSocket):
+    """
+    Runs a program in a session and streams its display to the client.
+
+    Protocol:
+        1. The client sends {"source_code": str, "max_steps": int (optional, at most
+           MAX_STEPS)}. Every session runs with the server's step, time and memory budget.
+        2. The server compiles the program and replies {"type": "started", "session_id": int},
+           or {"type": "error", "message": str} and closes the connection.
+        3. While the program runs, the server sends one binary message per frame (at most
+           30 per second, only when the scene changed) in the format of
+           services/render_stream.py: the figures changed in the frame, with their final
+           state, plus the text and sound events. The first frame is a full snapshot.
+        4. The client may send {"posture": "seated" | "standing"} (chair sensors, resumes
+           ESPERE_SENTAR/ESPERE_LEVANTAR) or {"type": "stop"}.
+        5. When the program ends, the server sends the last frame, then
+           {"type": "result", ...} with the session result (see Session.wait) and closes
+           the connection ({"type": "error", "message": str} if the stream fails).
+           Disconnecting cancels the session.
+    """
+    await websocket.accept()
+    try:
+        request = await websocket.receive_json()
+        program = compile_program(request["source_code"])
+        budget = session_budget(request.get("max_steps"))
+    except WebSocketDisconnect:
+        return
+    except (LexicalException, SyntaxException, SemanticException) as e:
+        await websocket.send_json({"type": "error", "message": str(e)})
+        await websocket.close()
+        return
+    except Exception as e:
+        await websocket.send_json({"type": "error", "message": f"Invalid request: {str(e)}"})
+        await websocket.close()
+        return
+
+    stream = RenderStream()
+    session = scheduler.start(program, on_command=stream.apply, budget=budget)
+    controls = asyncio.create_task(receive_controls(websocket, session))
+    try:
+        await websocket.send_json({"type": "started", "session_id": session.id})
+        await websocket.send_bytes(stream.snapshot())
+        loop = asyncio.get_running_loop()
+        next_frame = loop.time()
+        while not session.done.done():
+            next_frame += FRAME_INTERVAL
+            await asyncio.wait([session.done], timeout=max(next_frame - loop.time(), 0))
+            frame = stream.flush()
+            if frame is not None:
+                await websocket.send_bytes(frame)
+        # The program may end before the first wait: its events are still pending
+        frame = stream.flush()
+        if frame is not None:
+            await websocket.send_bytes(frame)
+        await websocket.send_json({"type": "result", **session.result})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        session.cancel()
+        await websocket.send_json({"type": "error", "message": f"Internal error: {str(e)}"})
+        await websocket.close()
+    finally:
+        session.cancel()
+        controls.cancel()
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.controllers.session_controller import router
+from app.services.tests.test_render_stream import decode
+
+
+@pytest.fixture(scope="module")
+def client():
+    # One client (one event loop) for the module: the sessions share the global scheduler
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        yield client
+
+def run_session(client, request):
+    """Messages the server sends for a request, up to the result (or error) message."""
+    messages = []
+    with client.websocket_connect("/sessions/stream") as websocket:
+        websocket.send_json(request)
+        while True:
+            message = websocket.receive()
+            if message.get("bytes") is not None:
+                messages.append(message["bytes"])
+                continue
+            messages.append(json.loads(message["text"]))
+            if messages[-1]["type"] in ("result", "error"):
+                return messages
+
+
+def test_events_of_a_program_that_ends_at_once(client):
+    started, snapshot, *frames, result = run_session(client, {"source_code": '"p"\nESCREVA(42)\nESCREVA_LINHA(7)\n'})
+    assert started["type"] == "started"
+    strings = {}
+    decode(snapshot, strings)
+    events = [operation for frame in frames for operation in decode(frame, strings)[1]]
+    assert events == [("TEXT", False, "42"), ("TEXT", True, "7")]
+    assert result["type"] == "result" and result["status"] == "finished"
+
+def test_controls_that_are_not_objects_are_ignored(client):
+    with client.websocket_connect("/sessions/stream") as websocket:
+        websocket.send_json({"source_code": '"p"\nESPERE_SENTAR()\nx : 1\n'})
+        assert websocket.receive_json()["type"] == "started"
+        for message in ([], 1, "seated", None):
+            websocket.send_json(message)
+        websocket.send_json({"posture": "seated"})
+        while (message := websocket.receive()).get("text") is None:
+            pass
+    assert json.loads(message["text"])["status"] == "finished"
+
+@pytest.mark.parametrize("payload, message", [
+    ({"source_code": '"p"\nx : \n'}, ""),
+    ({"source_code": '"p"\nx : 1\n', "max_steps": 0}, "Invalid request: max_steps must be a positive integer"),
+    ({}, "Invalid request: "),
+])
+def test_invalid_requests(client, payload, message):
+    (error,) = run_session(client, payload)
+    assert error["type"] == "error" and error["message"].startswith(message)
@@ -4,6 +4,7 @@ from contextlib import asynccontextmanager
 from app.controllers import patient_controller
 from app.controllers import exercise_controller
 from app.controllers import compiler_controller
+from app.controllers import session_controller
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -39,5 +40,6 @@ app = FastAPI(
 
 # Inclui as rotas dos controladores
 app.include_router(compiler_controller.router)
+app.include_router(session_controller.router)
 app.include_router(patient_controller.router)
 app.include_router(exercise_controller.router)
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+Scene figures stored as NumPy columns (struct of arrays).
+
+Each figure is a row of the columns x, y, size (float64), type, color (int32 codes of
+interned strings; the image file name of images is kept in type) and flags (uint8),
+indexed by handle. Handles of removed figures go to a free list and are reused by
+the next figures created; handle 0 is never used (it means "no figure"). Creating more
+than `max_figures` figures is a runtime error of the program.
+
+MOVA calls are queued and applied in bulk, as vectorized operations, when the scene
+is read or changed otherwise; move_many() and set_many() update many figures at once.
+Every change is recorded in the `changed` column (a field mask, see render_stream.py),
+so a frame encoder reads the changed rows without any per-figure bookkeeping.
+"""
+
+import numpy as np
+
+from app.compilador.maquina_virtual.classes_auxiliares import ErroExecucao
+
+# Most figures a scene may hold at once
+MAX_FIGURES = 1 << 16
+
+# Field masks of `changed` (the UPSERT fields of render_stream.py)
+X, Y, SIZE, COLOR, TYPE, IMAGE, CREATED = 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40
+ALL_FIGURE = X | Y | SIZE | COLOR | TYPE
+ALL_IMAGE = X | Y | IMAGE
+
+# Bits of `flags`
+_ALIVE, _IS_IMAGE = 0x01, 0x02
+
+
+class FigureStore:
+    """
+    Figures of a scene, in NumPy columns indexed by handle.
+
+    Attributes:
+        x, y, size (np.ndarray): Position and size (float64)
+        type, color (np.ndarray): Codes of the figure type (or image file) and color (int32)
+        flags (np.ndarray): Whether the handle is in use and holds an image (uint8)
+        changed (np.ndarray): Fields changed since the last clear_changes() (uint8 mask)
+        names (list): Interned strings, by code
+    """
+
+    def __init__(self, capacity=64, max_figures=MAX_FIGURES):
+        self.max_figures = max_figures
+        self.capacity = 0
+        self.x = self.y = self.size = np.zeros(0)
+        self.type = self.color = np.zeros(0, dtype=np.int32)
+        self.flags = self.changed = np.zeros(0, dtype=np.uint8)
+        self._grow(capacity)
+        self.top = 1                # first handle never used
+        self.free = []              # handles to reuse (a stack)
+        self.count = 0
+        self.names = []
+        self.codes = {}
+        self.moves = ([], [], [])   # queued MOVA: handles, dx, dy
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, handle):
+        self._apply_moves()
+        return (isinstance(handle, (int, np.integer)) and handle.__class__ is not bool
+                and 0 < handle < self.top and bool(self.flags[handle] & _ALIVE))
+
+    def ref(self, value) -> int:
+        """
+        Handle referenced by a program value (a NUM): integers, and floats with an integral
+        value, are handles, which may not refer to any figure.
+
+        Raises:
+            ErroExecucao: If the value is not an integral number
+        """
+        if value.__class__ is int or isinstance(value, np.integer):
+            return int(value)
+        if value.__class__ is float and value.is_integer():
+            return int(value)
+        raise ErroExecucao(f"Referência de figura inválida: {value!r}")
+
+    def _grow(self, capacity):
+        size = self.capacity
+        self.capacity = max(capacity, 2 * size)
+        for name in ("x", "y", "size", "type", "color", "flags", "changed"):
+            column = getattr(self, name)
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:size] = column
+            setattr(self, name, grown)
+
+    def code(self, value) -> int:
+        """Code of the interned string `value`."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.names)
+            self.names.append(value)
+        return code
+
+    def _handle(self):
+        # Queued moves apply to the figures that exist now
+        self._apply_moves()
+        if self.count >= self.max_figures:
+            raise ErroExecucao(f"Limite de figuras excedido ({self.max_figures})")
+        if self.free:
+            handle = self.free.pop()
+        else:
+            handle = self.top
+            self.top += 1
+            if handle >= self.capacity:
+                self._grow(handle + 1)
+        self.count += 1
+        return handle
+
+    # Single figures
+
+    def create(self, type, x, y, color, size) -> int:
+        """Adds a figure and returns its handle."""
+        handle = self._handle()
+        self._set(handle, type, x, y, color, size)
+        self.changed[handle] = ALL_FIGURE | CREATED
+        return handle
+
+    def create_image(self, image, x, y) -> int:
+        """Adds an image and returns its handle."""
+        handle = self._handle()
+        self._set_image(handle, image, x, y)
+        self.changed[handle] = ALL_IMAGE | CREATED
+        return handle
+
+    def move(self, handle, dx, dy):
+        """Queues a relative move (applied with the other queued moves, in bulk)."""
+        handle = self.ref(handle)
+        # Moves of handles never used are dropped here (the others are checked in bulk)
+        if 0 < handle < self.top:
+            handles, dxs, dys = self.moves
+            dxs.append(float(dx))
+            dys.append(float(dy))
+            handles.append(handle)
+
+    def redefine(self, handle, type, x, y, color, size) -> bool:
+        """Redefines a figure (an image becomes a figure). Returns False for unknown handles."""
+        handle = self.ref(handle)
+        if handle not in self:
+            return False
+        # An image turned into a figure is sent as a new figure
+        self.changed[handle] |= ALL_FIGURE | (CREATED if self.flags[handle] & _IS_IMAGE else 0)
+        self._set(handle, type, x, y, color, size)
+        return True
+
+    def redefine_image(self, handle, image, x, y) -> bool:
+        """Redefines an image (a figure becomes an image). Returns False for unknown handles."""
+        handle = self.ref(handle)
+        if handle not in self:
+            return False
+        self.changed[handle] |= ALL_IMAGE | (0 if self.flags[handle] & _IS_IMAGE else CREATED)
+        self._set_image(handle, image, x, y)
+        return True
+
+    def _set(self, handle, type, x, y, color, size):
+        self.x[handle] = x
+        self.y[handle] = y
+        self.size[handle] = size
+        self.type[handle] = self.code(type)
+        self.color[handle] = self.code(color)
+        self.flags[handle] = _ALIVE
+
+    def _set_image(self, handle, image, x, y):
+        self.x[handle] = x
+        self.y[handle] = y
+        self.size[handle] = 0
+        self.type[handle] = self.code(image)
+        self.color[handle] = 0
+        self.flags[handle] = _ALIVE | _IS_IMAGE
+
+    def remove(self, handle) -> bool:
+        """Removes a figure; its handle is reused. Returns False for unknown handles."""
+        handle = self.ref(handle)
+        if handle not in self:
+            return False
+        self.flags[handle] = 0
+        self.changed[handle] = 0
+        self.free.append(handle)
+        self.count -= 1
+        return True
+
+    def clear(self):
+        """Removes every figure (handles start again from 1)."""
+        self.moves = ([], [], [])
+        self.flags[:self.top] = 0
+        self.changed[:self.top] = 0
+        self.top = 1
+        self.free = []
+        self.count = 0
+
+    # Bulk operations
+
+    def _apply_moves(self):
+        handles, dxs, dys = self.moves
+        if handles:
+            self.moves = ([], [], [])
+            self.move_many(handles, dxs, dys)
+
+    def move_many(self, handles, dx, dy):
+        """
+        Moves many figures at once (dx and dy are arrays or scalars; a handle may
+        repeat, its moves add up). Unknown handles and zero moves are ignored.
+        """
+        handles = np.asarray(handles, dtype=np.intp)
+        dx = np.broadcast_to(np.asarray(dx, dtype=np.float64), handles.shape)
+        dy = np.broadcast_to(np.asarray(dy, dtype=np.float64), handles.shape)
+        valid = (handles > 0) & (handles < self.top) & ((dx != 0) | (dy != 0))
+        valid[valid] = self.flags[handles[valid]] & _ALIVE != 0
+        if not valid.all():
+            handles, dx, dy = handles[valid], dx[valid], dy[valid]
+        np.add.at(self.x, handles, dx)
+        np.add.at(self.y, handles, dy)
+        self.changed[handles] |= X | Y
+
+    def set_many(self, handles, x=None, y=None, size=None, color=None):
+        """
+        Sets the position, size or color of many figures at once (each value is an
+        array or a scalar; a color is a string). Unknown handles are ignored.
+        """
+        self._apply_moves()
+        handles = np.asarray(handles, dtype=np.intp)
+        valid = (handles > 0) & (handles < self.top)
+        valid[valid] = self.flags[handles[valid]] & _ALIVE != 0
+        fields = 0
+        for column, values, field in ((self.x, x, X), (self.y, y, Y), (self.size, size, SIZE)):
+            if values is not None:
+                column[handles[valid]] = np.broadcast_to(np.asarray(values, dtype=np.float64), handles.shape)[valid]
+                fields |= field
+        handles = handles[valid]
+        if color is not None:
+            self.color[handles] = self.code(color)
+            fields |= COLOR
+        # Size and color only apply to figures
+        self.changed[handles] |= np.where(self.flags[handles] & _IS_IMAGE, fields & (X | Y), fields).astype(np.uint8)
+
+    # Reading
+
+    def _masks(self, handles, fields):
+        return np.where(self.flags[handles] & _IS_IMAGE, ALL_IMAGE & fields, ALL_FIGURE & fields).astype(np.uint8)
+
+    def figures(self):
+        """Handles of every figure, in increasing order, and the masks of all their fields."""
+        self._apply_moves()
+        handles = np.flatnonzero(self.flags[:self.top] & _ALIVE)
+        return handles, self._masks(handles, 0xFF)
+
+    def changes(self):
+        """
+        Handles changed since the last clear_changes(), in increasing order, and their
+        field masks (restricted to the fields of figures or images).
+        """
+        self._apply_moves()
+        handles = np.flatnonzero(self.changed[:self.top])
+        return handles, self._masks(handles, self.changed[handles]) | (self.changed[handles] & CREATED)
+
+    def clear_changes(self):
+        self.changed[:self.top] = 0
+
+    def get(self, handle):
+        """The figure `handle` as a dict ({"image", "x", "y"} for images), or None."""
+        handle = self.ref(handle)
+        if handle not in self:
+            return None
+        if self.flags[handle] & _IS_IMAGE:
+            return {"image": self.names[self.type[handle]], "x": float(self.x[handle]), "y": float(self.y[handle])}
+        return {"type": self.names[self.type[handle]], "x": float(self.x[handle]), "y": float(self.y[handle]),
+                "color": self.names[self.color[handle]], "size": float(self.size[handle])}
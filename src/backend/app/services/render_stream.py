@@ -0,0 +1,256 @@
+"""
+Frame-batched render stream of a running program.
+
+The display commands (FUNC_OUT) a program issues are applied to a scene model instead
+of being forwarded one by one. Once per frame, flush() encodes only what changed since
+the previous frame: the final state of each figure touched during the frame (so any
+number of MOVA/REDEFINA_* on a figure cost one update with the changed fields), the
+background and highlight if they changed, and the text and sound events in order.
+
+Binary format (little-endian). A message is a header followed by operations:
+
+    header      u8 version (1), u32 frame number, u32 operation count
+    STRING  0   u32 id, u32 length, UTF-8 bytes   (defines a string used by later operations)
+    UPSERT  1   u32 handle, u8 fields, then the fields present, in this order:
+                TYPE 0x10 u32 string id, X 0x01 f32, Y 0x02 f32, COLOR 0x08 u32 string id,
+                SIZE 0x04 f32, IMAGE 0x20 u32 string id
+                (CREATED 0x40 marks a new figure; its fields are all present)
+    CLEAR   2   (LIMPE: removes every figure, handles start again from 1; the current
+                figures follow as UPSERTs)
+    BACKGROUND 3  u8 kind (0 color, 1 image), u32 string id
+    HIGHLIGHT  4  u32 handle (0: none)
+    TEXT    5   u8 newline, u32 length, UTF-8 bytes   (ESCREVA / ESCREVA_LINHA)
+    SOUND   6   u32 string id                       (TOQUE)
+
+String ids are shared by every message of a stream, so each color, figure type or file
+name crosses the wire once. snapshot() encodes the whole scene (for a new client).
+"""
+
+import struct
+
+import numpy as np
+
+from app.services.figure_store import FigureStore, X, Y, SIZE, COLOR, TYPE, IMAGE, CREATED
+
+VERSION = 1
+
+STRING, UPSERT, CLEAR, BACKGROUND, HIGHLIGHT, TEXT, SOUND = range(7)
+
+HEADER = struct.Struct("<BII")
+
+# UPSERT of a figure that only moved, encoded for many figures at once
+MOVE = np.dtype([("op", "u1"), ("handle", "<u4"), ("fields", "u1"), ("x", "<f4"), ("y", "<f4")])
+
+
+def _text(value) -> str:
+    if value is True:
+        return "verdadeiro"
+    if value is False:
+        return "falso"
+    return str(value)
+
+
+class RenderStream:
+    """
+    Scene model and frame encoder of one running program.
+
+    apply() is the session's on_command callback (see session_service.Session); flush()
+    is called once per frame by the connection that streams the scene.
+
+    Attributes:
+        figures (FigureStore): Figures of the scene (also records the fields changed in
+            the frame)
+        frame (int): Number of the last encoded frame
+    """
+
+    def __init__(self):
+        self.figures = FigureStore()
+        self.background = None      # (kind, value)
+        self.highlight = 0
+        self.cleared = False
+        self.background_dirty = False
+        self.highlight_dirty = False
+        self.events = []            # (op, value) of TEXT and SOUND, in order
+        self.strings = {}
+        self.frame = 0
+
+    # Commands
+
+    def apply(self, session, name, args):
+        """
+        Applies a command to the scene (unknown commands and handles are ignored).
+
+        Raises:
+            ErroExecucao: If a figure reference is not an integral number
+
+        Returns:
+            int | None: The handle of the figure created by CRIE_FIGURA/CRIE_IMAGEM
+        """
+        handler = getattr(self, "_" + name, None)
+        if handler is not None:
+            return handler(*args)
+        return None
+
+    def _CRIE_FIGURA(self, type, x, y, color, size):
+        return self.figures.create(type, x, y, color, size)
+
+    def _CRIE_IMAGEM(self, image, x, y):
+        return self.figures.create_image(image, x, y)
+
+    def _MOVA(self, handle, dx, dy):
+        self.figures.move(handle, dx, dy)
+
+    def _REDEFINA_FIGURA(self, handle, type, x, y, color, size):
+        self.figures.redefine(handle, type, x, y, color, size)
+
+    def _REDEFINA_IMAGEM(self, handle, image, x, y):
+        self.figures.redefine_image(handle, image, x, y)
+
+    def _DESTAQUE(self, handle):
+        handle = self.figures.ref(handle)
+        if handle in self.figures and handle != self.highlight:
+            self.highlight = handle
+            self.highlight_dirty = True
+
+    def _REVERTA_DESTAQUE(self):
+        if self.highlight:
+            self.highlight = 0
+            self.highlight_dirty = True
+
+    def _LIMPE(self):
+        self.figures.clear()
+        self.cleared = True
+        self._REVERTA_DESTAQUE()
+
+    def _INICIE_COM_COR(self, color):
+        self.background = (0, color)
+        self.background_dirty = True
+
+    def _INICIE_COM_IMAGEM(self, image):
+        self.background = (1, image)
+        self.background_dirty = True
+
+    def _ESCREVA(self, value):
+        self.events.append((0, _text(value)))
+
+    def _ESCREVA_LINHA(self, value):
+        self.events.append((1, _text(value)))
+
+    def _TOQUE(self, sound):
+        self.events.append((None, sound))
+
+    # Encoding
+
+    @property
+    def changed(self) -> bool:
+        """Whether the scene changed since the last flush()."""
+        return bool(self.cleared or self.background_dirty or self.highlight_dirty or self.events
+                    or len(self.figures.changes()[0]))
+
+    def _string(self, out, ops, value) -> int:
+        value = _text(value)
+        string_id = self.strings.get(value)
+        if string_id is None:
+            string_id = self.strings[value] = len(self.strings)
+            data = value.encode("utf-8")
+            out += struct.pack("<BII", STRING, string_id, len(data))
+            out += data
+            ops[0] += 1
+        return string_id
+
+    def _upsert(self, out, ops, handle, fields):
+        figures = self.figures
+        # String definitions go before the operation that uses them
+        type_id = self._string(out, ops, figures.names[figures.type[handle]]) if fields & (TYPE | IMAGE) else 0
+        color_id = self._string(out, ops, figures.names[figures.color[handle]]) if fields & COLOR else 0
+        out += struct.pack("<BIB", UPSERT, handle, fields)
+        if fields & TYPE:
+            out += struct.pack("<I", type_id)
+        if fields & X:
+            out += figures.x[handle].astype("<f4").tobytes()
+        if fields & Y:
+            out += figures.y[handle].astype("<f4").tobytes()
+        if fields & COLOR:
+            out += struct.pack("<I", color_id)
+        if fields & SIZE:
+            out += figures.size[handle].astype("<f4").tobytes()
+        if fields & IMAGE:
+            out += struct.pack("<I", type_id)
+        ops[0] += 1
+
+    def _encode(self, full):
+        out = bytearray(HEADER.size)
+        ops = [0]
+        figures = self.figures
+        if full or self.cleared:
+            out.append(CLEAR)
+            ops[0] += 1
+            handles, fields = figures.figures()
+            fields |= CREATED
+        else:
+            handles, fields = figures.changes()
+        # Figures that only moved (the bulk of an animation) are encoded together
+        moved = fields == X | Y
+        if moved.any():
+            block = np.empty(int(moved.sum()), dtype=MOVE)
+            block["op"] = UPSERT
+            block["handle"] = handles[moved]
+            block["fields"] = X | Y
+            block["x"] = figures.x[handles[moved]]
+            block["y"] = figures.y[handles[moved]]
+            out += block.tobytes()
+            ops[0] += len(block)
+            handles, fields = handles[~moved], fields[~moved]
+        for handle, mask in zip(handles.tolist(), fields.tolist()):
+            self._upsert(out, ops, handle, mask)
+        if self.background is not None and (full or self.background_dirty):
+            kind, value = self.background
+            string_id = self._string(out, ops, value)
+            out += struct.pack("<BBI", BACKGROUND, kind, string_id)
+            ops[0] += 1
+        if full or self.highlight_dirty:
+            out += struct.pack("<BI", HIGHLIGHT, self.highlight)
+            ops[0] += 1
+        if not full:
+            for newline, value in self.events:
+                if newline is None:
+                    string_id = self._string(out, ops, value)
+                    out += struct.pack("<BI", SOUND, string_id)
+                else:
+                    data = value.encode("utf-8")
+                    out += struct.pack("<BBI", TEXT, newline, len(data))
+                    out += data
+                ops[0] += 1
+        self.frame += 1
+        HEADER.pack_into(out, 0, VERSION, self.frame, ops[0])
+        return bytes(out)
+
+    def _reset(self):
+        self.figures.clear_changes()
+        self.cleared = self.background_dirty = self.highlight_dirty = False
+        self.events = []
+
+    def flush(self):
+        """
+        Encodes the changes since the previous frame.
+
+        Returns:
+            bytes | None: The frame message, or None if nothing changed
+        """
+        if not self.changed:
+            return None
+        message = self._encode(full=False)
+        self._reset()
+        return message
+
+    def snapshot(self) -> bytes:
+        """
+        Encodes the whole scene (as a CLEAR followed by every figure); pending changes
+        are included, so the next flush() only sends later changes and events.
+        """
+        events = self.events
+        self.strings = {}
+        message = self._encode(full=True)
+        self._reset()
+        self.events = events
+        return message
@@ -0,0 +1,249 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+
+from app.compilador.maquina_virtual.classes_auxiliares import ErroExecucao, OrcamentoExcedido
+from app.compilador.maquina_virtual.hospedeiro import Hospedeiro, SUSPENDER
+from app.compilador.maquina_virtual.maquina_virtual import MaquinaVirtual
+from app.services.timer_wheel import TimerWheel
+
+
+class Session(Hospedeiro):
+    """
+    A patient's chair session: one compiled program running on its own MaquinaVirtual,
+    driven by a SessionScheduler.
+
+    The session is the host of its program. ESPERE(t) (milliseconds), ESPERE_SENTAR and
+    ESPERE_LEVANTAR suspend the program (a timer in the scheduler's wheel or a posture
+    change reported with set_posture() resumes it); the stopwatch commands use the
+    scheduler's monotonic clock; every other command, and the stopwatch readings, are
+    passed to on_command(session, name, args), whose result is the command's result.
+
+    Attributes:
+        id (int): Session identifier
+        state (str): "ready", "running", "waiting", "finished" or "cancelled"
+        seated (bool): Last posture reported with set_posture()
+        result (dict | None): Outcome of the run, once finished (see wait())
+    """
+
+    def __init__(self, scheduler, session_id, program, on_command=None, budget=None):
+        self.scheduler = scheduler
+        self.id = session_id
+        self.on_command = on_command
+        self.state = "ready"
+        self.seated = False
+        self.awaited_posture = None
+        self.timer = None
+        self.stopwatch_start = None
+        self.stopwatch_elapsed = 0.0
+        self.result = None
+        self.done = asyncio.get_running_loop().create_future()
+        self.vm = MaquinaVirtual(program, self, budget)
+
+    # Host commands
+
+    def comando(self, nome, argumentos):
+        if self.on_command is not None:
+            return self.on_command(self, nome, argumentos)
+        return None
+
+    def ESPERE(self, t):
+        if t <= 0:
+            return None
+        self.state = "waiting"
+        self.timer = self.scheduler.wheel.call_later(t / 1000, self._wake)
+        return SUSPENDER
+
+    def ESPERE_SENTAR(self):
+        return self._wait_posture(True)
+
+    def ESPERE_LEVANTAR(self):
+        return self._wait_posture(False)
+
+    def INICIE_CRONOMETRO(self):
+        self.stopwatch_start = self.scheduler.clock()
+        self.stopwatch_elapsed = 0.0
+        return None
+
+    def PARE_CRONOMETRO(self):
+        if self.stopwatch_start is not None:
+            self.stopwatch_elapsed += self.scheduler.clock() - self.stopwatch_start
+            self.stopwatch_start = None
+        return None
+
+    def CONSULTE_CRONOMETRO(self):
+        elapsed = self.stopwatch_elapsed
+        if self.stopwatch_start is not None:
+            elapsed += self.scheduler.clock() - self.stopwatch_start
+        milliseconds = round(elapsed * 1000)
+        self.comando("CONSULTE_CRONOMETRO", (milliseconds,))
+        return milliseconds
+
+    def _wait_posture(self, seated):
+        if self.seated == seated:
+            return None
+        self.state = "waiting"
+        self.awaited_posture = seated
+        return SUSPENDER
+
+    # Scheduling
+
+    def set_posture(self, seated: bool):
+        """
+        Reports a posture change from the chair sensors (resumes ESPERE_SENTAR/ESPERE_LEVANTAR).
+        """
+        self.seated = seated
+        if self.state == "waiting" and self.awaited_posture == seated:
+            self.awaited_posture = None
+            self._wake()
+
+    def _wake(self):
+        self.timer = None
+        if self.state == "waiting":
+            self.state = "ready"
+            self.scheduler._schedule(self)
+
+    def _run_slice(self):
+        """
+        Runs the program until it waits, finishes or uses up the scheduler's slice of steps.
+        """
+        if self.state != "ready":
+            return
+        self.state = "running"
+        try:
+            finished = self.vm.executar(self.scheduler.slice_steps)
+        except OrcamentoExcedido as e:
+            self._finish({"status": "budget_exceeded", "resource": e.recurso, "message": str(e),
+                          "line": e.linha, "steps": e.passos})
+        except ErroExecucao as e:
+            self._finish({"status": "error", "message": str(e), "line": e.linha, "steps": self.vm.passos})
+        except Exception as e:
+            self._finish({"status": "error", "message": f"Internal error: {str(e)}", "line": None,
+                          "steps": self.vm.passos})
+        else:
+            if finished:
+                self._finish({"status": "finished", "variables": self.vm.valores(), "steps": self.vm.passos})
+            elif self.state == "running":
+                # Slice used up: back to the end of the ready queue
+                self.state = "ready"
+                self.scheduler._schedule(self)
+
+    def _finish(self, result):
+        self.state = "finished" if result["status"] != "cancelled" else "cancelled"
+        self.result = result
+        self.scheduler.sessions.pop(self.id, None)
+        if not self.done.done():
+            self.done.set_result(result)
+
+    def cancel(self):
+        """
+        Stops the session (its result gets status "cancelled").
+        """
+        if self.state in ("finished", "cancelled"):
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self._finish({"status": "cancelled", "steps": self.vm.passos})
+
+    async def wait(self):
+        """
+        Waits for the end of the session.
+
+        Returns:
+            dict: status ("finished", "error", "budget_exceeded" or "cancelled") and
+            steps; "variables" when finished; "message" and "line" on errors; "resource"
+            when the budget was exceeded
+        """
+        return await asyncio.shield(self.done)
+
+
+class SessionScheduler:
+    """
+    Runs many sessions concurrently as cooperative tasks of a single asyncio task.
+
+    Ready sessions wait in a FIFO queue and run for at most `slice_steps` steps at a
+    time; the scheduler runs sessions for up to `quantum` seconds before yielding to the
+    event loop. Waiting sessions cost nothing: their ESPERE timers live in a
+    hierarchical timer wheel (one asyncio timer for the whole wheel, armed for the next
+    expiry), and posture waits are resumed by set_posture().
+
+    Attributes:
+        wheel (TimerWheel): Timers of the sessions' ESPERE
+        sessions (dict): Active sessions by id
+    """
+
+    def __init__(self, slice_steps=1000, quantum=0.002, resolution=0.001, clock=time.monotonic):
+        self.slice_steps = slice_steps
+        self.quantum = quantum
+        self.clock = clock
+        self.wheel = TimerWheel(resolution, clock=clock)
+        self.sessions = {}
+        self.ready = deque()
+        self.ids = itertools.count(1)
+        self.task = None
+        self.wakeup = None
+
+    def start(self, program, on_command=None, budget=None) -> Session:
+        """
+        Starts a session running a program (must be called from the event loop).
+
+        Args:
+            program: ProgramaCompilado to run
+            on_command: Called as on_command(session, name, args) for the display and
+                device commands the program issues
+            budget: Orcamento (steps, time and memory limits) of the run
+
+        Returns:
+            Session: The new session
+        """
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        session = Session(self, next(self.ids), program, on_command, budget)
+        self.sessions[session.id] = session
+        self._schedule(session)
+        return session
+
+    def _schedule(self, session):
+        self.ready.append(session)
+        self.wakeup.set()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        ready = self.ready
+        while True:
+            self.wheel.advance()
+            deadline = self.clock() + self.quantum
+            while ready and self.clock() < deadline:
+                ready.popleft()._run_slice()
+            if ready:
+                await asyncio.sleep(0)
+                continue
+            # Idle until the next timer or a new ready session
+            self.wakeup.clear()
+            handle = None
+            when = self.wheel.next_deadline()
+            if when is not None:
+                handle = loop.call_later(max(when - self.clock(), 0), self.wakeup.set)
+            await self.wakeup.wait()
+            if handle is not None:
+                handle.cancel()
+
+    async def close(self):
+        """
+        Cancels every active session and stops the scheduler.
+        """
+        for session in list(self.sessions.values()):
+            session.cancel()
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+scheduler = SessionScheduler()
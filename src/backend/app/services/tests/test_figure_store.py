@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+from app.compilador.maquina_virtual.classes_auxiliares import ErroExecucao
+from app.compilador.maquina_virtual.hospedeiro import Hospedeiro
+from app.compilador.maquina_virtual.maquina_virtual import MaquinaVirtual
+from app.controllers.session_controller import compile_program
+from app.services.figure_store import FigureStore, X, Y, CREATED, ALL_FIGURE
+from app.services.render_stream import RenderStream
+
+
+class SceneHost(Hospedeiro):
+    """Host that applies every command to a RenderStream."""
+
+    def __init__(self):
+        self.stream = RenderStream()
+
+    def comando(self, nome, argumentos):
+        return self.stream.apply(self, nome, argumentos)
+
+def run(source_code):
+    host = SceneHost()
+    MaquinaVirtual(compile_program(source_code), host).executar()
+    return host.stream
+
+
+def test_create_returns_sequential_handles():
+    store = FigureStore(capacity=2)
+    handles = [store.create("circulo", i, i, "azul", 1) for i in range(5)]
+    assert handles == [1, 2, 3, 4, 5]
+    assert len(store) == 5
+    assert store.get(4) == {"type": "circulo", "x": 3.0, "y": 3.0, "color": "azul", "size": 1.0}
+
+def test_removed_handles_are_reused():
+    store = FigureStore()
+    for i in range(4):
+        store.create("circulo", i, i, "azul", 1)
+    assert store.remove(2) and store.remove(3)
+    assert not store.remove(3)
+    assert store.create_image("gato.png", 0, 0) == 3
+    assert store.create("quadrado", 0, 0, "verde", 2) == 2
+    assert store.create("quadrado", 0, 0, "verde", 2) == 5
+    assert store.get(3) == {"image": "gato.png", "x": 0.0, "y": 0.0}
+
+def test_clear_restarts_handles():
+    store = FigureStore()
+    store.create("circulo", 0, 0, "azul", 1)
+    store.create("circulo", 0, 0, "azul", 1)
+    store.move(2, 5, 5)
+    store.clear()
+    assert len(store) == 0 and 2 not in store
+    assert store.create("circulo", 1, 1, "azul", 1) == 1
+    assert store.get(1)["x"] == 1.0
+
+def test_queued_moves_do_not_apply_to_reused_handles():
+    store = FigureStore()
+    store.create("circulo", 0, 0, "azul", 1)
+    store.remove(1)
+    store.move(1, 10, 10)
+    assert store.create("circulo", 0, 0, "azul", 1) == 1
+    assert store.get(1)["x"] == 0.0
+
+def test_moves_add_up_in_bulk():
+    store = FigureStore()
+    for i in range(3):
+        store.create("circulo", 0, 0, "azul", 1)
+    store.clear_changes()
+    store.move(1, 1, 2)
+    store.move(1, 1, 2)
+    store.move(3, 0, 0)
+    store.move_many(np.array([2, 2, 99]), 1.5, -1)
+    handles, masks = store.changes()
+    assert handles.tolist() == [1, 2] and masks.tolist() == [X | Y, X | Y]
+    assert (store.get(1)["x"], store.get(1)["y"]) == (2.0, 4.0)
+    assert (store.get(2)["x"], store.get(2)["y"]) == (3.0, -2.0)
+
+def test_set_many():
+    store = FigureStore()
+    store.create("circulo", 0, 0, "azul", 1)
+    store.create_image("gato.png", 0, 0)
+    store.clear_changes()
+    store.set_many([1, 2, 7], x=[5, 6, 7], color="verde")
+    handles, masks = store.changes()
+    assert masks.tolist() == [X | 0x08, X]
+    assert store.get(1)["color"] == "verde" and store.get(2)["x"] == 6.0
+
+def test_unknown_handles_are_ignored():
+    store = FigureStore()
+    store.create("circulo", 0, 0, "azul", 1)
+    store.clear_changes()
+    store.move(0, 1, 1)
+    store.move(10 ** 20, 1, 1)
+    assert not store.redefine(2, "quadrado", 0, 0, "verde", 1)
+    assert not store.redefine_image(-1, "gato.png", 0, 0)
+    assert store.changes()[0].tolist() == []
+
+@pytest.mark.parametrize("value", [1.5, "1", True, None])
+def test_invalid_handles_are_errors(value):
+    store = FigureStore()
+    store.create("circulo", 0, 0, "azul", 1)
+    with pytest.raises(ErroExecucao):
+        store.move(value, 1, 1)
+    with pytest.raises(ErroExecucao):
+        store.redefine(value, "quadrado", 0, 0, "verde", 1)
+
+def test_integral_float_handles():
+    store = FigureStore()
+    store.create("circulo", 0, 0, "azul", 1)
+    store.move(1.0, 2, 3)
+    assert store.get(1.0)["x"] == 2.0
+
+def test_figure_limit():
+    store = FigureStore(max_figures=3)
+    for _ in range(3):
+        store.create("circulo", 0, 0, "azul", 1)
+    with pytest.raises(ErroExecucao):
+        store.create("circulo", 0, 0, "azul", 1)
+    store.remove(2)
+    assert store.create("circulo", 0, 0, "azul", 1) == 2
+
+def test_program_commands():
+    stream = run('"p"\nCRIE_FIGURA("circulo", 0, 0, "azul", 5)\nCRIE_FIGURA("circulo", 0, 0, "azul", 5)\n'
+                 'REPITA (10) {\n  MOVA(2, 1, 0)\n}\nMOVA(10 ^ 20, 1, 1)\nDESTAQUE(7)\n'
+                 'LIMPE()\nCRIE_IMAGEM("gato.png", 3, 4)\n')
+    assert len(stream.figures) == 1
+    assert stream.figures.get(1) == {"image": "gato.png", "x": 3.0, "y": 4.0}
+    assert stream.highlight == 0
+
+@pytest.mark.parametrize("command", ["DESTAQUE(3 / 2)", "MOVA(3 / 2, 1, 1)",
+                                     'REDEFINA_FIGURA(3 / 2, "circulo", 0, 0, "azul", 1)'])
+def test_invalid_handle_is_reported_at_program_line(command):
+    with pytest.raises(ErroExecucao) as erro:
+        run(f'"p"\nCRIE_FIGURA("circulo", 0, 0, "azul", 5)\n{command}\n')
+    assert erro.value.linha == 3
+    assert "Referência de figura inválida" in str(erro.value)
+
+def test_snapshot_after_clear_sends_created_figures():
+    stream = RenderStream()
+    stream.apply(None, "CRIE_FIGURA", ("circulo", 0, 0, "azul", 5))
+    stream.apply(None, "LIMPE", ())
+    stream.apply(None, "CRIE_FIGURA", ("quadrado", 1, 1, "verde", 2))
+    handles, masks = stream.figures.figures()
+    assert handles.tolist() == [1] and masks.tolist() == [ALL_FIGURE]
+    assert stream.figures.changes()[1].tolist() == [ALL_FIGURE | CREATED]
+    assert stream.flush() is not None and not stream.changed
@@ -0,0 +1,144 @@
+import struct
+
+import pytest
+
+from app.services.render_stream import RenderStream, HEADER, VERSION
+
+# UPSERT fields, in wire order: (mask, name, struct format)
+FIELDS = ((0x10, "type", "I"), (0x01, "x", "f"), (0x02, "y", "f"), (0x08, "color", "I"),
+          (0x04, "size", "f"), (0x20, "image", "I"))
+
+
+def decode(message, strings):
+    """
+    Decodes a frame message into (frame, operations); STRING operations update `strings`
+    (the client's table) and the string ids of the other operations are resolved with it.
+    """
+    version, frame, count = HEADER.unpack_from(message)
+    assert version == VERSION
+    offset = HEADER.size
+    operations = []
+    for _ in range(count):
+        op = message[offset]
+        offset += 1
+        if op == 0:
+            string_id, length = struct.unpack_from("<II", message, offset)
+            offset += 8
+            strings[string_id] = message[offset:offset + length].decode("utf-8")
+            offset += length
+            operations.append(("STRING", strings[string_id]))
+        elif op == 1:
+            handle, mask = struct.unpack_from("<IB", message, offset)
+            offset += 5
+            fields = {}
+            for bit, name, fmt in FIELDS:
+                if mask & bit:
+                    (value,) = struct.unpack_from("<" + fmt, message, offset)
+                    offset += 4
+                    fields[name] = strings[value] if fmt == "I" else value
+            operations.append(("UPSERT", handle, bool(mask & 0x40), fields))
+        elif op == 2:
+            operations.append(("CLEAR",))
+        elif op == 3:
+            kind, string_id = struct.unpack_from("<BI", message, offset)
+            offset += 5
+            operations.append(("BACKGROUND", kind, strings[string_id]))
+        elif op == 4:
+            (handle,) = struct.unpack_from("<I", message, offset)
+            offset += 4
+            operations.append(("HIGHLIGHT", handle))
+        elif op == 5:
+            newline, length = struct.unpack_from("<BI", message, offset)
+            offset += 5
+            operations.append(("TEXT", bool(newline), message[offset:offset + length].decode("utf-8")))
+            offset += length
+        elif op == 6:
+            (string_id,) = struct.unpack_from("<I", message, offset)
+            offset += 4
+            operations.append(("SOUND", strings[string_id]))
+        else:
+            pytest.fail(f"unknown operation {op}")
+    assert offset == len(message)
+    return frame, operations
+
+def apply(stream, *commands):
+    return [stream.apply(None, name, args) for name, *args in commands]
+
+
+def test_first_frame():
+    stream = RenderStream()
+    apply(stream, ("INICIE_COM_COR", "branco"), ("CRIE_FIGURA", "circulo", 10, 20, "azul", 5),
+          ("CRIE_IMAGEM", "gato.png", 1, 2), ("ESCREVA", "olá"), ("TOQUE", "sino"), ("ESCREVA_LINHA", True))
+    strings = {}
+    frame, operations = decode(stream.flush(), strings)
+    assert frame == 1
+    assert operations == [
+        ("STRING", "circulo"), ("STRING", "azul"),
+        ("UPSERT", 1, True, {"type": "circulo", "x": 10.0, "y": 20.0, "color": "azul", "size": 5.0}),
+        ("STRING", "gato.png"),
+        ("UPSERT", 2, True, {"x": 1.0, "y": 2.0, "image": "gato.png"}),
+        ("STRING", "branco"), ("BACKGROUND", 0, "branco"),
+        ("TEXT", False, "olá"), ("STRING", "sino"), ("SOUND", "sino"), ("TEXT", True, "verdadeiro"),
+    ]
+    assert stream.flush() is None
+
+def test_moves_are_coalesced():
+    stream = RenderStream()
+    first, second = apply(stream, ("CRIE_FIGURA", "quadrado", 0, 0, "verde", 1), ("CRIE_FIGURA", "quadrado", 5, 5, "verde", 1))
+    stream.flush()
+    for _ in range(100):
+        apply(stream, ("MOVA", first, 1, 0.5))
+    apply(stream, ("MOVA", second, 0, -1), ("MOVA", 99, 1, 1))
+    _, operations = decode(stream.flush(), {})
+    assert operations == [("UPSERT", first, False, {"x": 100.0, "y": 50.0}),
+                          ("UPSERT", second, False, {"x": 5.0, "y": 4.0})]
+
+def test_changed_fields_only():
+    stream = RenderStream()
+    (handle,) = apply(stream, ("CRIE_FIGURA", "circulo", 0, 0, "azul", 5))
+    strings = {}
+    decode(stream.flush(), strings)
+    apply(stream, ("REDEFINA_FIGURA", handle, "circulo", 3, 0, "azul", 8), ("DESTAQUE", handle))
+    _, operations = decode(stream.flush(), strings)
+    # The strings already sent are not sent again
+    assert operations == [("UPSERT", handle, False, {"type": "circulo", "x": 3.0, "y": 0.0, "color": "azul", "size": 8.0}),
+                          ("HIGHLIGHT", handle)]
+    apply(stream, ("REDEFINA_IMAGEM", handle, "gato.png", 3, 0))
+    _, operations = decode(stream.flush(), strings)
+    assert operations == [("STRING", "gato.png"), ("UPSERT", handle, True, {"x": 3.0, "y": 0.0, "image": "gato.png"})]
+
+def test_clear_sends_the_figures_created_after_it():
+    stream = RenderStream()
+    apply(stream, ("CRIE_FIGURA", "circulo", 0, 0, "azul", 5), ("CRIE_FIGURA", "circulo", 1, 1, "azul", 5), ("DESTAQUE", 2))
+    strings = {}
+    decode(stream.flush(), strings)
+    apply(stream, ("LIMPE",), ("CRIE_FIGURA", "circulo", 7, 7, "azul", 5))
+    _, operations = decode(stream.flush(), strings)
+    assert operations == [("CLEAR",),
+                          ("UPSERT", 1, True, {"type": "circulo", "x": 7.0, "y": 7.0, "color": "azul", "size": 5.0}),
+                          ("HIGHLIGHT", 0)]
+
+def test_snapshot_for_a_new_client():
+    stream = RenderStream()
+    apply(stream, ("INICIE_COM_IMAGEM", "fundo.png"), ("CRIE_FIGURA", "circulo", 0, 0, "azul", 5), ("DESTAQUE", 1))
+    decode(stream.flush(), {})
+    apply(stream, ("MOVA", 1, 2, 2), ("ESCREVA", "texto"))
+    # The snapshot starts a new string table and holds the whole scene; the events
+    # stay for the next frame
+    strings = {}
+    _, operations = decode(stream.snapshot(), strings)
+    assert operations == [("CLEAR",), ("STRING", "circulo"), ("STRING", "azul"),
+                          ("UPSERT", 1, True, {"type": "circulo", "x": 2.0, "y": 2.0, "color": "azul", "size": 5.0}),
+                          ("STRING", "fundo.png"), ("BACKGROUND", 1, "fundo.png"), ("HIGHLIGHT", 1)]
+    frame, operations = decode(stream.flush(), strings)
+    assert frame == 3 and operations == [("TEXT", False, "texto")]
+
+def test_handles_and_counts_beyond_16_bits():
+    stream = RenderStream()
+    for _ in range(stream.figures.max_figures):
+        stream.figures.create("ponto", 0, 0, "preto", 1)
+    stream.flush()
+    stream.figures.move_many(range(1, (1 << 16) + 1), 1, 0)
+    _, operations = decode(stream.flush(), {})
+    assert len(operations) == 1 << 16
+    assert operations[-1] == ("UPSERT", 1 << 16, False, {"x": 1.0, "y": 0.0})
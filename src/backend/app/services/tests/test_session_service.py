@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+from app.compilador.maquina_virtual.classes_auxiliares import Orcamento
+from app.controllers.session_controller import compile_program
+from app.services.session_service import SessionScheduler
+
+
+def run(test):
+    """Runs test(scheduler) in a new event loop, closing the scheduler at the end."""
+    async def main():
+        scheduler = SessionScheduler(slice_steps=50)
+        try:
+            return await test(scheduler)
+        finally:
+            await scheduler.close()
+    return asyncio.run(main())
+
+def recorder(log):
+    def on_command(session, name, args):
+        log.append((session.id, name, args))
+    return on_command
+
+
+def test_runs_to_completion():
+    async def test(scheduler):
+        log = []
+        session = scheduler.start(compile_program('"p"\nx : 0\nREPITA (100) {\n  x : x + 1\n}\nESCREVA(x)\n'),
+                                  on_command=recorder(log))
+        result = await session.wait()
+        assert result["status"] == "finished" and result["variables"] == {"x": 100}
+        assert result["steps"] == 202
+        assert log == [(session.id, "ESCREVA", (100,))]
+        assert session.state == "finished" and session.id not in scheduler.sessions
+    run(test)
+
+def test_sessions_interleave_by_slices():
+    async def test(scheduler):
+        log = []
+        program = compile_program('"p"\nREPITA (60) {\n  ESCREVA(1)\n}\n')
+        first = scheduler.start(program, on_command=recorder(log))
+        second = scheduler.start(program, on_command=recorder(log))
+        await asyncio.gather(first.wait(), second.wait())
+        order = [session_id for session_id, _, _ in log]
+        # Slices of 50 steps: 25 commands of one session, then 25 of the other
+        assert order[:50] == [first.id] * 25 + [second.id] * 25
+        assert order.count(first.id) == order.count(second.id) == 60
+    run(test)
+
+def test_espere_suspends_and_resumes():
+    async def test(scheduler):
+        log = []
+        session = scheduler.start(compile_program('"p"\nESCREVA(1)\nESPERE(30)\nESCREVA(2)\n'),
+                                  on_command=recorder(log))
+        start = time.monotonic()
+        await asyncio.sleep(0.01)
+        assert session.state == "waiting" and [args for _, _, args in log] == [(1,)]
+        result = await session.wait()
+        assert result["status"] == "finished" and [args for _, _, args in log] == [(1,), (2,)]
+        assert time.monotonic() - start >= 0.03
+    run(test)
+
+def test_set_posture_resumes_posture_waits():
+    async def test(scheduler):
+        log = []
+        session = scheduler.start(compile_program('"p"\nESPERE_SENTAR()\nESCREVA(1)\nESPERE_LEVANTAR()\nESCREVA(2)\n'),
+                                  on_command=recorder(log))
+        await asyncio.sleep(0.01)
+        assert session.state == "waiting" and log == []
+        session.set_posture(False)   # not the awaited posture
+        await asyncio.sleep(0.01)
+        assert session.state == "waiting"
+        session.set_posture(True)
+        await asyncio.sleep(0.01)
+        assert session.state == "waiting" and [args for _, _, args in log] == [(1,)]
+        session.set_posture(False)
+        assert (await session.wait())["status"] == "finished"
+        assert [args for _, _, args in log] == [(1,), (2,)]
+    run(test)
+
+def test_posture_already_reported_does_not_wait():
+    async def test(scheduler):
+        session = scheduler.start(compile_program('"p"\nESPERE_SENTAR()\nx : 1\n'))
+        session.set_posture(True)
+        assert (await session.wait())["status"] == "finished"
+    run(test)
+
+def test_budget_exceeded():
+    async def test(scheduler):
+        session = scheduler.start(compile_program('"p"\nENQUANTO (verdadeiro) {\n  x : 1\n}\n'),
+                                  budget=Orcamento(passos=500))
+        result = await session.wait()
+        assert result["status"] == "budget_exceeded" and result["resource"] == "passos"
+        assert result["steps"] == 501 and result["line"] == 2
+    run(test)
+
+def test_runtime_error():
+    async def test(scheduler):
+        session = scheduler.start(compile_program('"p"\nx : 0\ny : 1 / x\n'))
+        result = await session.wait()
+        assert result["status"] == "error" and result["line"] == 3
+    run(test)
+
+def test_cancel_waiting_session():
+    async def test(scheduler):
+        session = scheduler.start(compile_program('"p"\nESPERE(60000)\nx : 1\n'))
+        await asyncio.sleep(0.01)
+        assert session.timer is not None
+        session.cancel()
+        assert (await session.wait())["status"] == "cancelled"
+        assert session.state == "cancelled" and session.timer is None
+        assert len(scheduler.wheel) == 0
+        # Cancelling again, or after the end, changes nothing
+        session.cancel()
+        assert session.result["status"] == "cancelled"
+    run(test)
+
+def test_close_cancels_active_sessions():
+    async def test(scheduler):
+        session = scheduler.start(compile_program('"p"\nESPERE_SENTAR()\n'))
+        await asyncio.sleep(0)
+        await scheduler.close()
+        assert (await session.wait())["status"] == "cancelled"
+    run(test)
+
+def test_stopwatch_uses_scheduler_clock():
+    now = [100.0]
+
+    async def test(scheduler):
+        log = []
+        session = scheduler.start(compile_program('"p"\nINICIE_CRONOMETRO()\nESPERE_SENTAR()\nPARE_CRONOMETRO()\n'
+                                                  'ESPERE_LEVANTAR()\nCONSULTE_CRONOMETRO()\n'),
+                                  on_command=recorder(log))
+        await asyncio.sleep(0)
+        now[0] += 1.5
+        session.set_posture(True)
+        await asyncio.sleep(0)
+        now[0] += 10
+        session.set_posture(False)
+        await session.wait()
+        assert log == [(session.id, "CONSULTE_CRONOMETRO", (1500,))]
+
+    async def main():
+        scheduler = SessionScheduler(clock=lambda: now[0])
+        try:
+            await test(scheduler)
+        finally:
+            await scheduler.close()
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+import random
+
+from app.services.timer_wheel import TimerWheel
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def make_wheel(**kwargs):
+    clock = FakeClock()
+    return TimerWheel(resolution=0.001, clock=clock, **kwargs), clock
+
+
+def test_timers_fire_in_expiry_order():
+    wheel, clock = make_wheel()
+    fired = []
+    for delay in (0.5, 0.002, 3.0, 0.2, 70.0, 0.002):
+        wheel.call_later(delay, fired.append, delay)
+    clock.now += 100
+    assert wheel.advance() == 6
+    assert fired == [0.002, 0.002, 0.2, 0.5, 3.0, 70.0]
+    assert len(wheel) == 0
+
+def test_timers_never_fire_early():
+    wheel, clock = make_wheel()
+    fired = []
+    wheel.call_later(0.0105, fired.append, "a")
+    clock.now += 0.010
+    wheel.advance()
+    assert fired == []
+    clock.now += 0.001
+    wheel.advance()
+    assert fired == ["a"]
+
+def test_due_timers_fire_within_one_tick():
+    wheel, clock = make_wheel()
+    fired = []
+    wheel.advance()
+    wheel.call_later(-5, fired.append, "late")
+    wheel.advance()
+    assert fired == []
+    clock.now += 0.001
+    wheel.advance()
+    assert fired == ["late"]
+
+def test_cancel():
+    wheel, clock = make_wheel()
+    fired = []
+    keep = wheel.call_later(0.001, fired.append, "keep")
+    near = wheel.call_later(0.001, fired.append, "near")
+    far = wheel.call_later(10.0, fired.append, "far")
+    near.cancel()
+    far.cancel()
+    far.cancel()
+    assert len(wheel) == 1
+    clock.now += 20
+    wheel.advance()
+    keep.cancel()
+    assert fired == ["keep"] and len(wheel) == 0
+
+def test_next_deadline():
+    wheel, clock = make_wheel()
+    assert wheel.next_deadline() is None
+    fired = []
+    due = clock.now + 0.0305
+    wheel.call_later(0.0305, fired.append, "a")
+    # Sleeping until each deadline reaches the timer without firing it early or late
+    for _ in range(10):
+        deadline = wheel.next_deadline()
+        assert deadline <= due + 0.001
+        clock.now = max(clock.now, deadline)
+        wheel.advance()
+        if fired:
+            break
+    assert fired == ["a"]
+    assert due <= clock.now <= due + 0.001
+    assert wheel.next_deadline() is None
+
+def test_random_schedule_matches_sorted_order():
+    generator = random.Random(7)
+    for bits, levels in ((2, 2), (3, 3), (6, 4)):
+        wheel, clock = make_wheel(bits=bits, levels=levels)
+        due = {}
+        fired = []
+        timers = {}
+        for key in range(500):
+            delay = generator.choice([generator.uniform(0, 0.05), generator.uniform(0, 5), generator.uniform(0, 60)])
+            due[key] = clock.now + delay
+            timers[key] = wheel.call_later(delay, fired.append, key)
+        for key in generator.sample(range(500), 100):
+            timers[key].cancel()
+            del due[key]
+        while len(wheel):
+            clock.now += generator.choice([0.0007, 0.01, 3])
+            before = len(fired)
+            wheel.advance()
+            for key in fired[before:]:
+                assert due[key] <= clock.now
+            for key in set(due) - set(fired):
+                assert due[key] > clock.now - 0.001
+        assert sorted(fired) == sorted(due)
+        # In expiry order (timers of the same tick may fire in any order)
+        assert all(due[b] > due[a] - 0.001 for a, b in zip(fired, fired[1:]))
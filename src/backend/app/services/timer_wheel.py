@@ -0,0 +1,192 @@
+import time
+
+
+class Timer:
+    """
+    A timer registered in a TimerWheel.
+
+    Attributes:
+        tick (int): Absolute tick at which the timer expires
+        callback: Function called (with args) when the timer expires
+        args (tuple): Arguments of the callback
+        wheel (TimerWheel): Wheel where the timer is registered
+        bucket (dict | None): Wheel slot holding the timer (None once fired or cancelled)
+        level (int): Wheel level of the slot (-1 for the overflow list)
+    """
+    __slots__ = ("tick", "callback", "args", "wheel", "bucket", "level")
+
+    def __init__(self, tick, callback, args, wheel):
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self.wheel = wheel
+        self.bucket = None
+        self.level = -1
+
+    def cancel(self):
+        """
+        Cancels the timer (does nothing if it already fired).
+        """
+        if self.bucket is not None:
+            del self.bucket[self]
+            self.bucket = None
+            self.wheel.count -= 1
+            if self.level == 0:
+                self.wheel.pending -= 1
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel.
+
+    Level 0 has one slot per tick; each slot of level n covers a full turn of level
+    n - 1. A timer is stored in the lowest level whose span contains its expiry, so
+    adding and cancelling a timer are O(1). When level 0 completes a turn, the timers
+    of the current slot of level 1 are redistributed into level 0 (and so on upwards),
+    which keeps the cost of advancing the clock proportional to the number of ticks
+    with timers, not to the number of timers. Timers beyond the top level wait in an
+    overflow list, re-examined on every turn of the top level.
+
+    The wheel does not run by itself: advance(now) fires every timer due up to `now`,
+    and next_deadline() tells the caller when to advance it again. Times are read from
+    a monotonic clock.
+
+    Attributes:
+        resolution (float): Tick length in seconds (timers fire at most one tick late)
+        origin (float): Clock time of tick 0
+        current (int): Next tick to be processed
+    """
+
+    def __init__(self, resolution=0.001, bits=6, levels=4, clock=time.monotonic):
+        self.resolution = resolution
+        self.bits = bits
+        self.size = 1 << bits
+        self.mask = self.size - 1
+        self.clock = clock
+        self.origin = clock()
+        self.current = 0
+        self.levels = [[{} for _ in range(self.size)] for _ in range(levels)]
+        self.overflow = {}
+        self.pending = 0        # timers in level 0
+        self.count = 0          # timers in the wheel
+
+    def __len__(self):
+        return self.count
+
+    def call_later(self, delay, callback, *args):
+        """
+        Schedules callback(*args) to run `delay` seconds from now.
+
+        Args:
+            delay (float): Delay in seconds (timers already due, such as negative delays,
+                fire within one tick, on the first advance past the current tick)
+            callback: Function to call
+
+        Returns:
+            Timer: Handle that can cancel the timer
+        """
+        return self.call_at(self.clock() + delay, callback, *args)
+
+    def call_at(self, when, callback, *args):
+        """
+        Schedules callback(*args) to run at clock time `when` (a time already past
+        is treated as the next tick to be processed).
+
+        Returns:
+            Timer: Handle that can cancel the timer
+        """
+        # Rounded up: a timer never fires before its time
+        tick = -int((self.origin - when) // self.resolution)
+        timer = Timer(max(tick, self.current), callback, args, self)
+        self._insert(timer)
+        self.count += 1
+        return timer
+
+    def _insert(self, timer):
+        delta = timer.tick - self.current
+        for level, slots in enumerate(self.levels):
+            if delta < 1 << (self.bits * (level + 1)):
+                bucket = slots[(timer.tick >> (self.bits * level)) & self.mask]
+                if level == 0:
+                    self.pending += 1
+                break
+        else:
+            bucket = self.overflow
+            level = -1
+        bucket[timer] = None
+        timer.bucket = bucket
+        timer.level = level
+
+    def _cascade(self):
+        """
+        Moves the timers of the current slot of each upper level one level down,
+        starting from the top-most level that completed a turn.
+        """
+        level = 1
+        while level < len(self.levels) and (self.current >> (self.bits * level)) & self.mask == 0:
+            level += 1
+        if level == len(self.levels):
+            timers = list(self.overflow)
+            self.overflow.clear()
+            level -= 1
+        else:
+            timers = []
+        for upper in range(level, 0, -1):
+            bucket = self.levels[upper][(self.current >> (self.bits * upper)) & self.mask]
+            timers.extend(bucket)
+            bucket.clear()
+        for timer in timers:
+            self._insert(timer)
+
+    def advance(self, now=None):
+        """
+        Fires, in expiry order, every timer due up to clock time `now`.
+
+        Returns:
+            int: Number of timers fired
+        """
+        now = self.clock() if now is None else now
+        target = int((now - self.origin) // self.resolution)
+        fired = 0
+        level0 = self.levels[0]
+        if not self.count:
+            self.current = max(self.current, target + 1)
+        while self.current <= target:
+            index = self.current & self.mask
+            if index == 0:
+                self._cascade()
+            elif not self.pending:
+                # Nothing in level 0: skip to the end of the turn
+                self.current = min(target + 1, (self.current | self.mask) + 1)
+                continue
+            bucket = level0[index]
+            while bucket:
+                timer = next(iter(bucket))
+                del bucket[timer]
+                timer.bucket = None
+                self.pending -= 1
+                self.count -= 1
+                fired += 1
+                timer.callback(*timer.args)
+            self.current += 1
+        return fired
+
+    def next_deadline(self):
+        """
+        Clock time at which advance() should be called next: the expiry of the next
+        timer in level 0 or, if level 0 is empty, the end of its turn (when upper levels
+        cascade). None if the wheel is empty.
+        """
+        if not self.count:
+            return None
+        if not self.current & self.mask:
+            # Start of a turn: upper levels cascade on this very tick
+            return self.origin + self.current * self.resolution
+        tick = (self.current | self.mask) + 1
+        if self.pending:
+            level0 = self.levels[0]
+            for candidate in range(self.current, tick):
+                if level0[candidate & self.mask]:
+                    tick = candidate
+                    break
+        return self.origin + tick * self.resolution
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""
+Representação compacta (struct-of-arrays) da sequência de tokens.
+
+Em vez de um objeto `Token` por token, o `TokenBuffer` guarda colunas em `array`:
+o código inteiro do tipo, os deslocamentos de início e fim no código-fonte original
+e a linha. O valor de cada token só é materializado (como fatia do código-fonte)
+quando é acessado, e identificadores/palavras reservadas são internados.
+
+Classes:
+    TokenBuffer: Colunas de tokens de um código-fonte.
+    TokenView: Visão compatível com `Token` de uma posição do buffer.
+"""
+
+import sys
+from array import array
+
+# Tipos de token, na ordem dos seus códigos inteiros
+TOKEN_KINDS = (
+    'EOF', 'ID', 'NUMBER', 'TXT', 'DQUOTE',
+    'ASSIGN', 'LPAR', 'RPAR', 'LBLOCK', 'RBLOCK', 'COMMA',
+    'OPSUM', 'OPMUL', 'OPPOW', 'OPREL',
+    'SE', 'SENAO', 'ENQUANTO', 'REPITA', 'ALT', 'NAO',
+    'FUNC_IN', 'FUNC_OUT'
+)
+
+KIND_CODES = {kind: code for code, kind in enumerate(TOKEN_KINDS)}
+
+EOF = KIND_CODES['EOF']
+TXT = KIND_CODES['TXT']
+
+
+class TokenBuffer:
+    """
+    Sequência de tokens armazenada em colunas.
+
+    Atributos:
+        source (str | bytes | mmap.mmap): Código-fonte original ao qual os deslocamentos
+            se referem. Fontes binárias são ASCII e só são decodificadas no acesso ao valor.
+        kinds (array): Código do tipo de cada token (índice em TOKEN_KINDS).
+        starts (array): Deslocamento inicial de cada token no código-fonte.
+        ends (array): Deslocamento final (exclusivo) de cada token no código-fonte.
+        lines (array): Linha de cada token.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+
+    def append(self, kind, start, end, line):
+        """
+        Acrescenta um token ao final do buffer.
+
+        Args:
+            kind (int): Código do tipo do token.
+            start (int): Deslocamento inicial no código-fonte.
+            end (int): Deslocamento final (exclusivo) no código-fonte.
+            line (int): Linha do token.
+        """
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def kind(self, index):
+        """Retorna o tipo (str) do token na posição `index`."""
+        return TOKEN_KINDS[self.kinds[index]]
+
+    def value(self, index):
+        """
+        Materializa o valor do token na posição `index`.
+
+        Returns:
+            str: Fatia do código-fonte correspondente ao token ("EOF" para o token final).
+        """
+        kind = self.kinds[index]
+        if kind == EOF:
+            return "EOF"
+        text = self.source[self.starts[index]:self.ends[index]]
+        if not isinstance(text, str):
+            text = text.decode('ascii')
+        if kind == TXT:
+            return text
+        return sys.intern(text)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("índice de token fora do buffer")
+        return TokenView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield TokenView(self, index)
+
+
+class TokenView:
+    """
+    Visão de um token do `TokenBuffer` com a mesma interface de `Token`
+    (atributos `tipo`, `valor` e `linha`), além do código inteiro do tipo (`codigo`).
+    """
+
+    __slots__ = ('buffer', 'index')
+
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def codigo(self):
+        return self.buffer.kinds[self.index]
+
+    @property
+    def tipo(self):
+        return TOKEN_KINDS[self.buffer.kinds[self.index]]
+
+    @property
+    def valor(self):
+        return self.buffer.value(self.index)
+
+    @property
+    def linha(self):
+        return self.buffer.lines[self.index]
+
+    def __repr__(self):
+        return f"({self.tipo} {self.valor} {self.linha})"
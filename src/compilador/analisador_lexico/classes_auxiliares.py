@@ -6,8 +6,15 @@ class LexicalException(Exception):
 	Exception raised for errors in the lexical analysis process.
 	Attributes:
 		message -- explanation of the error
+		linha -- line where the error was found (None if unknown)
 	"""
-	pass
+
+	def __init__(self, message, linha=None):
+		super().__init__(message)
+		self.linha = linha
+
+	def __reduce__(self):
+		return self.__class__, (str(self), self.linha)
 
 
 class Token:
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+Análise léxica paralela de códigos-fonte muito grandes.
+
+O código-fonte é dividido em trechos em quebras de linha seguras (fora de strings
+literais e de comentários de bloco), localizadas por uma pré-varredura que só reconhece
+strings e comentários. Cada trecho é analisado em um processo separado e os buffers
+resultantes são concatenados com deslocamentos e linhas corrigidos, produzindo as
+mesmas colunas que `AnalisadorLexico.getTokenBuffer()` produziria.
+
+Funções:
+    tokenize_parallel: Gera o TokenBuffer de um código-fonte usando vários processos.
+    safe_cuts: Calcula as posições de corte seguras para a divisão em trechos.
+"""
+
+import os
+import re
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+from analisador_lexico import AnalisadorLexico
+from buffer_tokens import TokenBuffer
+
+# Construções dentro das quais uma quebra de linha não é uma fronteira de tokens.
+# Usa os mesmos padrões do analisador para que as duas varreduras concordem.
+_OPAQUE = '|'.join(AnalisadorLexico.PATTERNS[name] for name in ('STRING', 'BLOCK_COMMENT', 'LINE_COMMENT'))
+OPAQUE_REGEX = re.compile(_OPAQUE)
+BYTES_OPAQUE_REGEX = re.compile(_OPAQUE.encode('ascii'))
+
+# Abaixo deste tamanho o custo de distribuir os trechos supera o ganho
+MIN_CHUNK_SIZE = 256 * 1024
+
+
+def safe_cuts(source, chunks):
+    """
+    Calcula até `chunks - 1` posições de corte seguras no código-fonte.
+
+    Cada corte fica logo após uma quebra de linha que não está dentro de uma string
+    literal nem de um comentário de bloco, de modo que nenhum token o atravessa.
+
+    Args:
+        source (str | bytes): Código-fonte a ser dividido.
+        chunks (int): Quantidade desejada de trechos.
+
+    Returns:
+        list[int]: Posições de corte em ordem crescente, sem repetições.
+    """
+    unicode = isinstance(source, str)
+    regex = OPAQUE_REGEX if unicode else BYTES_OPAQUE_REGEX
+    newline = '\n' if unicode else b'\n'
+
+    span_starts, span_ends = [], []
+    for match in regex.finditer(source):
+        span_starts.append(match.start())
+        span_ends.append(match.end())
+
+    cuts = []
+    length = len(source)
+    for index in range(1, chunks):
+        pos = max(length * index // chunks, cuts[-1] if cuts else 0)
+        while True:
+            pos = source.find(newline, pos)
+            if pos == -1:
+                return cuts
+            span = bisect_right(span_starts, pos) - 1
+            if span >= 0 and pos < span_ends[span]:
+                pos = span_ends[span]
+                continue
+            break
+        if pos + 1 < length and (not cuts or pos + 1 > cuts[-1]):
+            cuts.append(pos + 1)
+    return cuts
+
+
+def _lex_chunk(task):
+    """
+    Analisa um trecho em um processo de trabalho.
+
+    Args:
+        task (tuple): (trecho, deslocamento do trecho no código-fonte, linha inicial).
+
+    Returns:
+        tuple[array, array, array, array]: Colunas de tipos, inícios, fins e linhas,
+        já com deslocamentos absolutos.
+    """
+    chunk, offset, line = task
+    buffer = TokenBuffer(chunk)
+    for kind, start, end, token_line in AnalisadorLexico(chunk)._scan(0, line):
+        buffer.append(kind, start + offset, end + offset, token_line)
+    return buffer.kinds, buffer.starts, buffer.ends, buffer.lines
+
+
+def tokenize_parallel(source, processes=None, executor=None, min_chunk_size=MIN_CHUNK_SIZE):
+    """
+    Gera o TokenBuffer de um código-fonte dividindo a análise entre processos.
+
+    O resultado é idêntico ao de `AnalisadorLexico(source).getTokenBuffer()`, inclusive
+    no erro levantado: os trechos são combinados em ordem e o primeiro erro encontrado
+    é o mesmo que a análise serial encontraria.
+
+    Args:
+        source (str | bytes): Código-fonte a ser analisado.
+        processes (int, opcional): Quantidade de processos; por padrão, o número de CPUs.
+        executor (concurrent.futures.Executor, opcional): Pool já existente a reutilizar.
+        min_chunk_size (int): Tamanho mínimo de cada trecho; fontes menores que isso são
+            analisadas serialmente.
+
+    Returns:
+        TokenBuffer: Tokens do código-fonte.
+    Raises:
+        LexicalException: Caso encontre símbolos inválidos ou strings não terminadas.
+    """
+    processes = processes or os.cpu_count() or 1
+    chunks = min(processes, len(source) // max(min_chunk_size, 1))
+    if chunks < 2:
+        return AnalisadorLexico(source).getTokenBuffer()
+
+    newline = '\n' if isinstance(source, str) else b'\n'
+    bounds = [0] + safe_cuts(source, chunks) + [len(source)]
+    tasks = []
+    line = 1
+    for start, end in zip(bounds, bounds[1:]):
+        chunk = source[start:end]
+        tasks.append((chunk, start, line))
+        line += chunk.count(newline)
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=min(processes, len(tasks))) as pool:
+            results = list(pool.map(_lex_chunk, tasks))
+    else:
+        results = list(executor.map(_lex_chunk, tasks))
+
+    buffer = TokenBuffer(source)
+    last = len(results) - 1
+    for index, (kinds, starts, ends, lines) in enumerate(results):
+        # Só o EOF do último trecho pertence ao fluxo final
+        stop = len(kinds) if index == last else len(kinds) - 1
+        buffer.kinds += kinds[:stop]
+        buffer.starts += starts[:stop]
+        buffer.ends += ends[:stop]
+        buffer.lines += lines[:stop]
+    return buffer
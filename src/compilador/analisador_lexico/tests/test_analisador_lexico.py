@@ -1,4 +1,5 @@
 from analisador_lexico import AnalisadorLexico, Token
+from lexico_paralelo import tokenize_parallel
 
 
 def load_file(file_name):
@@ -175,3 +176,116 @@ def test_operacoes_show():
     ]
 
     verify_tokens(tokens, tokens_esperados)
+
+
+def test_marcadores_de_comentario_dentro_de_string():
+    codigo = 'url : "http://exemplo/*x*/"\nfim : 1 // comentario\n'
+    analisador = AnalisadorLexico(codigo)
+
+    tokens = [(t.tipo, t.valor, t.linha) for t in analisador.getTokens()]
+
+    assert tokens == [
+        ("ID", "url", 1),
+        ("ASSIGN", ":", 1),
+        ("DQUOTE", "\"", 1),
+        ("TXT", "http://exemplo/*x*/", 1),
+        ("DQUOTE", "\"", 1),
+        ("ID", "fim", 2),
+        ("ASSIGN", ":", 2),
+        ("NUMBER", "1", 2),
+        ("EOF", "EOF", 3)
+    ]
+
+
+def test_iter_tokens_sob_demanda():
+    codigo = load_file("blocos.show")
+    analisador = AnalisadorLexico(codigo)
+
+    fluxo = analisador.iter_tokens()
+    primeiros = [next(fluxo) for _ in range(3)]
+
+    assert [(t.tipo, t.linha) for t in primeiros] == [("DQUOTE", 1), ("TXT", 1), ("DQUOTE", 3)]
+    assert [repr(t) for t in primeiros + list(fluxo)] == [repr(t) for t in analisador.getTokens()]
+
+
+def test_token_buffer_equivale_a_lista_de_tokens():
+    codigo = load_file("blocos.show")
+    analisador = AnalisadorLexico(codigo)
+
+    buffer = analisador.getTokenBuffer()
+    tokens = analisador.getTokens()
+
+    assert len(buffer) == len(tokens)
+    assert [repr(t) for t in buffer] == [repr(t) for t in tokens]
+    assert buffer[3].valor is buffer[8].valor  # identificadores internados
+    assert buffer[-1].tipo == "EOF"
+
+
+def test_relex_edicao_incremental():
+    codigo = load_file("blocos.show")
+    buffer = AnalisadorLexico(codigo).getTokenBuffer()
+
+    edicoes = [
+        (codigo.index("99"), 2, "100"),        # troca um número
+        (codigo.index("idoso :"), 0, "\n\n"),  # insere linhas no meio
+        (codigo.index("Idoso\""), 0, "\" x \""),  # altera fronteiras de string
+        (0, 0, "// cabecalho\n"),              # edição no início
+        (len(codigo), 0, "\nfim : 1"),         # edição no fim
+    ]
+    for offset, removidos, inseridos in edicoes:
+        editado = codigo[:offset] + inseridos + codigo[offset + removidos:]
+
+        novo = AnalisadorLexico.relex(buffer, offset, removidos, inseridos)
+
+        assert [repr(t) for t in novo] == [repr(t) for t in AnalisadorLexico(editado).getTokens()]
+
+
+def test_from_file_mapeado_em_memoria(tmp_path):
+    for nome in ["atribuicao.show", "blocos.show", "comentarios.show", "operacoes.show"]:
+        esperado = [repr(t) for t in AnalisadorLexico(load_file(nome)).getTokens()]
+
+        analisador = AnalisadorLexico.from_file(f"arquivos_teste/{nome}")
+
+        assert [repr(t) for t in analisador.getTokenBuffer()] == esperado
+        assert [repr(t) for t in analisador.iter_tokens()] == esperado
+
+    vazio = tmp_path / "vazio.show"
+    vazio.write_bytes(b"")
+    assert [repr(t) for t in AnalisadorLexico.from_file(vazio).getTokens()] == ["(EOF EOF 1)"]
+
+
+def test_tokenize_parallel_identico_ao_serial():
+    codigo = "\n".join(load_file(nome) for nome in ["blocos.show", "comentarios.show", "operacoes.show"]) * 20
+    serial = AnalisadorLexico(codigo).getTokenBuffer()
+
+    paralelo = tokenize_parallel(codigo, processes=4, min_chunk_size=1)
+
+    assert paralelo.kinds == serial.kinds
+    assert paralelo.starts == serial.starts
+    assert paralelo.ends == serial.ends
+    assert paralelo.lines == serial.lines
+
+
+def test_modo_diagnostico_registra_todos_os_erros():
+    codigo = 'x : 1 @ 2\ny : "abc\nz : ²a\n'
+    analisador = AnalisadorLexico(codigo, recover=True)
+
+    tokens = [(t.tipo, t.valor, t.linha) for t in analisador.getTokens()]
+
+    assert [(str(erro), erro.linha) for erro in analisador.errors] == [
+        ("Símbolo inválido na linha 1: @", 1),
+        ("String não terminada na linha 2", 2),
+        ("Símbolo inválido na linha 3: ²", 3),
+    ]
+    assert tokens == [
+        ("ID", "x", 1),
+        ("ASSIGN", ":", 1),
+        ("NUMBER", "1", 1),
+        ("NUMBER", "2", 1),
+        ("ID", "y", 2),
+        ("ASSIGN", ":", 2),
+        ("ID", "z", 3),
+        ("ASSIGN", ":", 3),
+        ("ID", "a", 3),
+        ("EOF", "EOF", 4)
+    ]